@@ -0,0 +1,54 @@
+import asyncio
+import threading
+
+
+def log_display(msg):
+    print(f"[ASYNC] {msg}")
+
+
+class AsyncRuntime:
+    """
+    Event loop único em uma thread dedicada. Threads da GUI e dos módulos
+    submetem corrotinas aqui e esperam o resultado; com 'async_brain' ligado,
+    as conexões HTTP do Brain (Groq, Ollama) ficam multiplexadas neste loop em
+    vez de cada thread bloquear no seu próprio socket.
+    """
+    def __init__(self, name: str = "aeon-async"):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def in_loop_thread(self) -> bool:
+        return threading.current_thread() is self._thread
+
+    def submit(self, coro):
+        """Agenda a corrotina no loop; retorna um concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout: float = None):
+        """Executa a corrotina no loop e bloqueia a thread atual até o resultado."""
+        if self.in_loop_thread():
+            coro.close()
+            raise RuntimeError("run() chamado de dentro do próprio loop; use 'await'.")
+        return self.submit(coro).result(timeout)
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+_runtime = None
+_runtime_lock = threading.Lock()
+
+
+def get_runtime() -> AsyncRuntime:
+    """Runtime compartilhado pelo processo (criado no primeiro uso)."""
+    global _runtime
+    with _runtime_lock:
+        if _runtime is None:
+            _runtime = AsyncRuntime()
+            log_display("Event loop do Brain iniciado.")
+        return _runtime
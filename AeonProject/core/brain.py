@@ -1,18 +1,132 @@
 import ollama
-from groq import Groq
-import base64
-from PIL import Image
-from io import BytesIO
-import datetime
+import httpx
+from groq import Groq, AsyncGroq, DefaultHttpxClient, DefaultAsyncHttpxClient
+import asyncio
+import contextlib
+import contextvars
+import json
+import re
+import socket
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor, wait, as_completed
+
+from core.circuit_breaker import CircuitBreaker
+from core.response_cache import ResponseCache
+from core.prompt_builder import PromptBuilder, estimate_tokens
+from core.local_model_keeper import LocalModelKeeper
+from core.async_runtime import get_runtime
+from core.brain_scheduler import BrainScheduler, INTERACTIVE
+from core.vision_pipeline import PreparedImage, VisionProfiles, PROMPT_PT, PROMPT_EN, TRANSLATE_SYSTEM
+from core.vision_cache import VisionCache
+from core.metrics import MetricsRegistry, current_request, classify_error
 
 def log_display(msg):
     print(f"[BRAIN] {msg}")
 
+_SENTENCE_END = re.compile(r'([.!?…:;]+["\')\]]*)(\s+)|(\n+)')
+
+def iter_sentences(chunks, min_chars: int = 20):
+    """
+    Agrupa pedaços de texto em frases completas, para o TTS começar a falar
+    na primeira frase em vez de esperar a resposta inteira.
+    Frases muito curtas (ex: "Sim.") são juntadas à próxima.
+    """
+    buffer = ""
+    try:
+        for chunk in chunks:
+            buffer += chunk
+            while True:
+                cut = None
+                for m in _SENTENCE_END.finditer(buffer):
+                    if m.end() >= min_chars:
+                        cut = m.end()
+                        break
+                if cut is None:
+                    break
+                sentence, buffer = buffer[:cut].strip(), buffer[cut:]
+                if sentence:
+                    yield sentence
+        if buffer.strip():
+            yield buffer.strip()
+    finally:
+        # Fechar o agrupador fecha a fonte (ex: pensar_stream interrompido)
+        close = getattr(chunks, "close", None)
+        if close:
+            close()
+
+_hedge_local = threading.local()   # Tentativa do hedge em curso na thread atual
+
+class _HedgeAbort:
+    """
+    Conexões abertas por uma tentativa do hedge. abort() derruba os sockets:
+    fechar o gerador só age entre tokens, e o perdedor pode estar parado
+    esperando o primeiro token (ou os cabeçalhos) por segundos.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._streams = []
+        self.aborted = False
+
+    def trace(self, name, info):
+        # Extensão 'trace' do httpcore: entrega o stream de rede assim que o TCP conecta
+        if name == "connection.connect_tcp.complete" and info.get("return_value") is not None:
+            self.attach(info["return_value"])
+
+    def attach(self, stream):
+        with self._lock:
+            self._streams.append(stream)
+            aborted = self.aborted
+        if aborted:
+            self._derrubar(stream)  # Conectou depois do cancelamento
+
+    def abort(self):
+        with self._lock:
+            self.aborted = True
+            streams = list(self._streams)
+        for stream in streams:
+            self._derrubar(stream)
+
+    @staticmethod
+    def _derrubar(stream):
+        # shutdown acorda a thread bloqueada no recv (close() do cliente não acorda)
+        sock = stream.get_extra_info("socket")
+        if sock is None:
+            return
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+def _anotar_erro_http(response):
+    """
+    Event hook do httpx nos clientes Groq: cada resposta de erro conta como
+    falha do modelo no pedido atual, inclusive as que o SDK repete sozinho.
+    """
+    medida = current_request()
+    if response.status_code < 400 or medida is None:
+        return
+    try:
+        model = json.loads(response.request.content or b"{}").get("model", "")
+    except (ValueError, AttributeError):
+        model = ""
+    medida.add_failure("groq", model, classify_error(f"Error code: {response.status_code}"))
+
+async def _aanotar_erro_http(response):
+    _anotar_erro_http(response)
+
+def _rastrear_hedge(request):
+    """Event hook do httpx: requisições feitas por uma tentativa do hedge levam o trace dela."""
+    abort = getattr(_hedge_local, "abort", None)
+    if abort is not None:
+        request.extensions["trace"] = abort.trace
+
 class AeonBrain:
     """
     O cérebro do Aeon. Gerencia a interação com os modelos de linguagem.
     """
-    def __init__(self, config, installer=None):
+    def __init__(self, config, installer=None, status_manager=None):
         # Aceita tanto ConfigManager quanto dict
         if hasattr(config, "get_system_data"):
             self.config = config.system_data
@@ -22,10 +136,60 @@ class AeonBrain:
             self.config_manager = None
             
         self.installer = installer
+        self.status_manager = status_manager
         self.client = None
         self.online = False
         self.local_ready = False
         self.available_models = []
+        self.last_cloud_error = None
+        # Hedge: duas threads por pedido simultâneo; sem vaga, o pedido segue sem hedge
+        self._hedge_pool = None
+        self._hedge_vagas = threading.BoundedSemaphore(max(1, int(self.config.get("brain_max_concurrency", 4))))
+        self._hedge_http = None
+        self._hedge_ollama = None
+        # Clientes assíncronos (pool de conexões persistente) e semáforo, um conjunto por
+        # event loop: objetos asyncio só valem no loop que os criou
+        self._aloops = weakref.WeakKeyDictionary()
+        self._aloops_lock = threading.Lock()
+        # Endpoints alternativos (ex: tests/fake_llm_server.py para rodar sem rede)
+        self.groq_base_url = self.config.get("groq_base_url") or None
+        self.ollama_host = self.config.get("ollama_host") or None
+        self.ollama = ollama.Client(host=self.ollama_host) if self.ollama_host else ollama
+        # Métricas por pedido: backend, modelo, tokens, TTFT, latência, fallback e cache
+        self.metrics = MetricsRegistry(window=int(self.config.get("metrics_window", 500)))
+        self.response_cache = self._init_response_cache()
+        self.prompt_builder = PromptBuilder(self.config.get("prompt_budgets"))
+        self.vision_profiles = VisionProfiles(self.config.get("vision_profiles"))
+        self.last_vision_timings = {}
+        self.last_vision_ok = True      # A última análise veio completa (visão + tradução)?
+        self.vision_cache = None
+        if self.config.get("vision_cache", True):
+            self.vision_cache = VisionCache(
+                max_entries=int(self.config.get("vision_cache_max_entries", 32)),
+                max_distance=int(self.config.get("vision_cache_max_distance", 2)),
+                ttl_s=float(self.config.get("vision_cache_ttl_s", 600)),
+            )
+
+        # Fila de prioridade: o usuário não espera atrás de gerações longas em segundo plano
+        self.scheduler = None
+        if self.config.get("brain_scheduler", True):
+            self.scheduler = BrainScheduler(
+                workers=int(self.config.get("brain_workers", 3)),
+                priorities=self.config.get("scheduler_priorities"),
+                source_limits=self.config.get("scheduler_source_limits"),
+                cloud_rpm=int(self.config.get("groq_rpm", 30)),
+                cloud_available=self._nuvem_disponivel,
+            )
+
+        # Disjuntor da nuvem: com o Groq fora, os comandos vão direto ao local
+        # e só a sonda em segundo plano paga o custo de reconectar.
+        self.cloud_breaker = CircuitBreaker(
+            "Groq",
+            probe=self._conectar_nuvem,
+            base_delay=float(self.config.get("cloud_retry_base_s", 5)),
+            max_delay=float(self.config.get("cloud_retry_max_s", 300)),
+            on_state_change=self._on_cloud_breaker_change,
+        )
         
         self.groq_api_key = self.config.get("GROQ_KEY")
         
@@ -59,7 +223,7 @@ class AeonBrain:
         else:
             # Tenta verificar Ollama diretamente se não houver installer
             try:
-                models_info = ollama.list()
+                models_info = self.ollama.list()
                 # Captura lista de modelos instalados para usar fallback se necessário
                 if 'models' in models_info:
                     self.available_models = []
@@ -73,8 +237,129 @@ class AeonBrain:
                 log_display(f"Ollama não detectado (Verifique se o app está aberto): {e}")
                 self.local_ready = False
 
+        if self.status_manager:
+            self.status_manager.update_local_status(self.local_ready)
+
+        # Mantém os modelos locais carregados enquanto o Aeon está em uso
+        self.local_keeper = None
+        if self.local_ready and self.config.get("local_keepalive", True):
+            self.local_keeper = LocalModelKeeper(
+                self.ollama,
+                [self._select_local_model(), self.config.get("model_vis_local", "moondream")],
+                ping_interval_s=float(self.config.get("local_keepalive_ping_s", 240)),
+                idle_unload_s=float(self.config.get("local_idle_unload_s", 900)),
+                on_state_change=self._on_local_models_change,
+                error_retry_base_s=float(self.config.get("local_retry_base_s", 30)),
+                error_retry_max_s=float(self.config.get("local_retry_max_s", 600)),
+            )
+            self.local_keeper.start()
+
+        self.metrics.add_collector("scheduler", self.get_scheduler_metrics)
+        self.metrics.add_collector("response_cache", self.get_cache_stats)
+        self.metrics.add_collector("vision_cache", self.get_vision_cache_stats)
+        if self.config.get("metrics_port"):
+            # Endpoint opcional no formato do Prometheus (/metrics) e em JSON (/metrics.json)
+            self.metrics.serve(int(self.config.get("metrics_port")), self.config.get("metrics_host", "127.0.0.1"))
+
     def reconectar(self):
-        """Tenta (re)conectar ao serviço de nuvem (Groq)."""
+        """Tenta (re)conectar ao serviço de nuvem (Groq) e atualiza o disjuntor."""
+        if self._conectar_nuvem():
+            self.cloud_breaker.record_success()
+            return True
+        if self.groq_api_key:
+            self.cloud_breaker.record_failure(self.last_cloud_error)
+        return False
+
+    def _nuvem_disponivel(self) -> bool:
+        """Nuvem utilizável agora? Não bloqueia: com o circuito aberto, responde False na hora."""
+        return bool(self.client and self.online and self.cloud_breaker.allow_request())
+
+    def _falha_nuvem(self, error, model: str = None, medida=None, tentativa: bool = True):
+        """
+        Marca a nuvem como offline e abre o disjuntor (a sonda cuida da volta).
+        A tentativa conta como erro do modelo (tentativa=False quando o próprio
+        pedido já fica registrado no Groq, ex: stream interrompido no meio).
+        """
+        self.online = False
+        self.last_cloud_error = str(error)
+        self.cloud_breaker.record_failure(error)
+        # Erros com resposta HTTP já foram contados pelo hook (_anotar_erro_http), um por tentativa do SDK
+        if tentativa and getattr(error, "status_code", None) is None:
+            self._anotar_falha("groq", model or self.config.get("model_txt_cloud", "llama-3.3-70b-versatile"), error, medida)
+        self._anotar_fallback(error, medida)
+
+    def _on_cloud_breaker_change(self, state, retry_in):
+        if self.status_manager:
+            self.status_manager.update_cloud_breaker(state, retry_in)
+            self.status_manager.update_cloud_status(state == CircuitBreaker.CLOSED and self.online)
+
+    def _on_local_models_change(self, states):
+        if self.status_manager:
+            self.status_manager.update_local_models(states)
+
+    def _atividade_local(self) -> dict:
+        """Registra atividade no keeper e devolve o keep_alive para as chamadas ao Ollama."""
+        if not self.local_keeper:
+            return {}
+        self.local_keeper.touch()
+        return {"keep_alive": self.local_keeper.keep_alive_value()}
+
+    # --- Métricas ---
+    def _anotar(self, backend: str, model: str, system_prompt: str = "", prompt: str = "", resposta: str = "", uso=None, medida=None):
+        """Registra no pedido (o atual, se não for dado) quem respondeu e os tokens (estimados se o backend não informar)."""
+        medida = medida or current_request()
+        if medida is None:
+            return
+        medida.set_backend(backend, model)
+        if uso and any(uso):
+            medida.set_usage(*uso)
+        else:
+            medida.set_usage(estimate_tokens(system_prompt) + estimate_tokens(prompt), estimate_tokens(resposta or ""), estimated=True)
+
+    def _anotar_falha(self, backend: str, model: str, error, medida=None):
+        """Chamada que falhou (mesmo que outro backend responda depois) entra como erro de backend/modelo."""
+        medida = medida or current_request()
+        if medida is not None:
+            medida.add_failure(backend, model, classify_error(error))
+
+    def _anotar_fallback(self, error=None, medida=None):
+        """Motivo de a nuvem não ter respondido este pedido."""
+        medida = medida or current_request()
+        if medida is None:
+            return
+        if error is not None:
+            medida.set_fallback(classify_error(error))
+        elif not self.groq_api_key:
+            medida.set_fallback("sem_chave")
+        elif not self.cloud_breaker.allow_request():
+            medida.set_fallback("circuito_aberto")
+        else:
+            medida.set_fallback("offline")
+
+    @staticmethod
+    def _uso_groq(comp):
+        usage = getattr(comp, "usage", None)
+        if usage is None:
+            return None
+        return getattr(usage, "prompt_tokens", 0), getattr(usage, "completion_tokens", 0)
+
+    @staticmethod
+    def _uso_ollama(r):
+        try:
+            return r.get("prompt_eval_count") or 0, r.get("eval_count") or 0
+        except AttributeError:
+            return None
+
+    async def _amedido(self, medida, coro):
+        """Executa a corrotina no loop do runtime com 'medida' como pedido atual."""
+        with self.metrics.bind(medida):
+            return await coro
+
+    def get_llm_metrics(self) -> dict:
+        return self.metrics.summary()
+
+    def _conectar_nuvem(self) -> bool:
+        """Cria o cliente Groq e testa a conexão (também usado pela sonda do disjuntor)."""
         # Atualiza a chave da memória caso tenha mudado
         if self.config_manager:
              self.groq_api_key = self.config_manager.get_system_data("GROQ_KEY")
@@ -91,7 +376,9 @@ class AeonBrain:
         log_display(f"Conectando com chave: {masked}")
         
         try: 
-            self.client = Groq(api_key=self.groq_api_key)
+            self.client = Groq(api_key=self.groq_api_key, base_url=self.groq_base_url,
+                               http_client=DefaultHttpxClient(event_hooks={"request": [self._contar_chamada_nuvem],
+                                                                           "response": [_anotar_erro_http]}))
             # Teste rápido de conexão
             self.client.models.list()
             self.online = True
@@ -99,6 +386,7 @@ class AeonBrain:
             return True
         except Exception as e:
             self.online = False
+            self.last_cloud_error = str(e)
             err_msg = str(e)
             if "401" in err_msg:
                  log_display("❌ ERRO 401: Chave expirada. Gere uma nova em https://console.groq.com/keys")
@@ -106,131 +394,800 @@ class AeonBrain:
                 log_display(f"Falha ao conectar na Nuvem: {e}")
             return False
 
-    def pensar(self, prompt: str, historico_txt: str = "", user_prefs: dict = {}, system_override: str = None, capabilities: str = "", long_term_context: str = "") -> str:
+    def _contar_chamada_nuvem(self, request):
+        """Event hook do httpx nos clientes Groq: cada requisição de chat (inclusive as repetidas pelo SDK) gasta cota."""
+        scheduler = getattr(self, "scheduler", None)
+        if scheduler and request.url.path.endswith("/chat/completions"):
+            scheduler.note_cloud_call()
+
+    async def _acontar_chamada_nuvem(self, request):
+        self._contar_chamada_nuvem(request)
+
+    def _build_system_prompt(self, historico_txt: str = "", user_prefs: dict = None, system_override: str = None, capabilities: str = "", long_term_context: str = "") -> str:
+        """Monta o prompt de sistema usado por todos os backends (dentro do orçamento de tokens)."""
+        if system_override:
+            return system_override
+        return self.prompt_builder.build(historico_txt, user_prefs, capabilities, long_term_context, budget=self._prompt_budget())
+
+    def _prompt_budget(self) -> int:
+        """Orçamento do modelo que vai atender primeiro ('prompt_budgets' no system.json)."""
+        if self._nuvem_disponivel():
+            return self.prompt_builder.budget_for(self.config.get("model_txt_cloud", "llama-3.3-70b-versatile"))
+        return self.prompt_builder.budget_for(self._select_local_model())
+
+    def _select_local_model(self) -> str:
+        """Lógica de Seleção de Modelo (Auto-Fallback)."""
+        target_model = self.config.get("model_txt_local", "llama3.2")
+
+        # Se temos lista de modelos e o desejado não está nela exata
+        if self.available_models and target_model not in self.available_models:
+            # Tenta achar um parecido (ex: llama3.2 acha llama3.2:latest)
+            match = next((m for m in self.available_models if target_model in m), None)
+            if match:
+                target_model = match
+            else:
+                # Se não achar nada, usa o primeiro que tiver (melhor que falhar)
+                target_model = self.available_models[0]
+                log_display(f"Modelo padrão não achado. Usando disponível: {target_model}")
+        return target_model
+
+    def _cloud_messages(self, system_prompt: str, prompt: str) -> list:
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": f"Pergunta atual: {prompt}"}
+        ]
+
+    def _local_messages(self, system_prompt: str, prompt: str) -> list:
+        return [
+            {'role': 'system', 'content': system_prompt},
+            {'role': 'user', 'content': prompt}
+        ]
+
+    def pensar(self, prompt: str, historico_txt: str = "", user_prefs: dict = {}, system_override: str = None, capabilities: str = "", long_term_context: str = "", origem: str = INTERACTIVE) -> str:
         """
         Processa um prompt com Auto-Healing de conexão.
+        Respostas repetidas (mesmo prompt e mesmo contexto) saem do cache.
+        'origem' define a prioridade na fila (interativo > web > singularity/dev).
         """
-        # CORREÇÃO: Se estiver marcado como offline, tenta reconectar uma vez antes de desistir
-        if not self.online and self.groq_api_key:
-            self.reconectar()
-
-        if system_override:
-            system_prompt = system_override
-        else:
-            prefs_str = "\n".join([f"- {k}: {v}" for k, v in user_prefs.items()]) if user_prefs else "Nenhuma preferência definida."
-            
-            system_prompt = f"""Você é Aeon, um assistente focado em respostas precisas e factuais.
-Data: {datetime.datetime.now().strftime('%d/%m/%Y %H:%M')}
-Responda SEMPRE em Português do Brasil, de forma concisa e prestativa.
-Se você não souber uma informação, admita. Não invente dados.
+        with self.metrics.track("texto", origem) as medida:
+            if self.scheduler and not self.scheduler.in_worker():
+                resposta = self.scheduler.run(
+                    self._pensar, prompt, historico_txt, user_prefs, system_override, capabilities, long_term_context, origem,
+                    origem=origem, supersede=origem == INTERACTIVE
+                )
+                if resposta is None:
+                    medida.ok = False
+                    medida.set_fallback("cancelado")  # Substituído na fila por um comando mais novo
+                return resposta if resposta is not None else ""
+            return self._pensar(prompt, historico_txt, user_prefs, system_override, capabilities, long_term_context, origem)
 
-CAPACIDADES DO SISTEMA:
-Você possui controle total sobre o hardware (CÂMERA, MICROFONE) e o sistema operacional Windows através de seus módulos técnicos. Se o usuário pedir para ver algo ou ligar a câmera, utilize o módulo de Gestos.
-{capabilities}
+    def _pensar(self, prompt: str, historico_txt: str = "", user_prefs: dict = {}, system_override: str = None, capabilities: str = "", long_term_context: str = "", origem: str = INTERACTIVE) -> str:
+        with self.metrics.track("texto", reuse=True) as medida:
+            medida.dequeued()
+            if self._usar_async():
+                # O loop do runtime tem outro contexto: o pedido vai junto explicitamente
+                return get_runtime().run(self._amedido(medida, self.apensar(prompt, historico_txt, user_prefs, system_override, capabilities, long_term_context, origem)))
 
-MEMÓRIAS RELEVANTES DO PASSADO:
-{"Nenhuma memória relevante encontrada." if not long_term_context else long_term_context}
+            contexto, cached = self._consultar_cache(prompt, historico_txt, user_prefs, system_override, capabilities, long_term_context, origem=origem)
+            if cached is not None:
+                return cached
 
-HISTÓRICO RECENTE:
-{historico_txt}
+            system_prompt = self._build_system_prompt(historico_txt, user_prefs, system_override, capabilities, long_term_context)
+            resposta, ok = self._gerar(system_prompt, prompt)
+            medida.ok = ok
+            if ok and contexto is not None:
+                self.response_cache.put(prompt, contexto, resposta, medida.model)
+            return resposta
 
-Preferências do usuário:
-{prefs_str}"""
+    def _gerar(self, system_prompt: str, prompt: str):
+        """Cascata de backends. Retorna (texto, ok); ok=False para mensagens de erro."""
+        # Hedging opcional: corre nuvem e local e fica com a primeira resposta
+        mode, delay = self._hedge_config()
+        if mode in ("delay", "race") and self.local_ready and self._nuvem_disponivel():
+            if self._hedge_vagas.acquire(blocking=False):
+                try:
+                    result = self._pensar_hedged(system_prompt, prompt, mode, delay)
+                finally:
+                    self._hedge_vagas.release()
+                if result:
+                    return result, True
+                # Os dois já falharam no hedge: repetir a cascata só dobraria a espera
+                return "Desculpe, estou sem conexão e sem um cérebro local funcional.", False
+            # Hedge enfileirado atrás de outros não corta cauda nenhuma
+            log_display("Hedge: pool ocupado, pedido segue pela cascata normal.")
 
         # Prioridade 1: Nuvem (Groq)
-        if self.client and self.online:
+        if self._nuvem_disponivel():
             try:
                 log_display("Pensando com Groq Cloud...")
+                model = self.config.get("model_txt_cloud", "llama-3.3-70b-versatile")
                 comp = self.client.chat.completions.create(
-                    model=self.config.get("model_txt_cloud", "llama-3.3-70b-versatile"),
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": f"Pergunta atual: {prompt}"}
-                    ],
+                    model=model,
+                    messages=self._cloud_messages(system_prompt, prompt),
                     temperature=0.6, max_tokens=400
                 )
-                return comp.choices[0].message.content
+                resposta = comp.choices[0].message.content
+                self._anotar("groq", model, system_prompt, prompt, resposta, self._uso_groq(comp))
+                return resposta, True
             except Exception as e:
                 log_display(f"ERRO GROQ (Caindo para local): {e}")
-                self.online = False # Marca como offline para forçar reconexão futura
+                self._falha_nuvem(e) # Abre o disjuntor; a sonda reconecta em segundo plano
+        else:
+            self._anotar_fallback()
 
         # Prioridade 2: Local (Ollama)
         if self.local_ready:
-            # Lógica de Seleção de Modelo (Auto-Fallback)
-            target_model = self.config.get("model_txt_local", "llama3.2")
-            
-            # Se temos lista de modelos e o desejado não está nela exata
-            if self.available_models and target_model not in self.available_models:
-                # Tenta achar um parecido (ex: llama3.2 acha llama3.2:latest)
-                match = next((m for m in self.available_models if target_model in m), None)
-                if match:
-                    target_model = match
-                else:
-                    # Se não achar nada, usa o primeiro que tiver (melhor que falhar)
-                    target_model = self.available_models[0]
-                    log_display(f"Modelo padrão não achado. Usando disponível: {target_model}")
-
+            target_model = self._select_local_model()
             log_display(f"Pensando com Ollama Local ({target_model})...")
             try:
-                r = ollama.chat(
+                r = self.ollama.chat(
                     model=target_model,
-                    messages=[
-                        {'role': 'system', 'content': system_prompt},
-                        {'role': 'user', 'content': prompt}
-                    ]
+                    messages=self._local_messages(system_prompt, prompt),
+                    **self._atividade_local()
                 )
-                return r['message']['content']
+                resposta = r['message']['content']
+                self._anotar("ollama", target_model, system_prompt, prompt, resposta, self._uso_ollama(r))
+                return resposta, True
             except Exception as e:
+                self._anotar_falha("ollama", target_model, e)
                 if "not found" in str(e) or "404" in str(e):
                     log_display(f"❌ Modelo não instalado! Rode 'python configurar_cerebro.py' para baixar.")
-                    return "Meu cérebro local não está instalado. Rode o configurador."
+                    return "Meu cérebro local não está instalado. Rode o configurador.", False
                 else:
                     log_display(f"ERRO Ollama: {e}")
         
-        return "Desculpe, estou sem conexão e sem um cérebro local funcional."
+        return "Desculpe, estou sem conexão e sem um cérebro local funcional.", False
 
-    def ver(self, raw_image_bytes: bytes) -> str:
+    def _stream_nuvem(self, system_prompt: str, prompt: str, uso: dict = None, client=None, medida=None):
         """
-        Processa uma imagem.
+        Gera tokens do Groq. Fechar o gerador encerra a conexão HTTP. 'uso' recebe os tokens informados no fim.
+        'medida': pedido do stream (um gerador não pode deixá-lo como atual entre os yields).
         """
-        if not self.online and self.groq_api_key:
-            self.reconectar()
+        with self.metrics.bind(medida) if medida else contextlib.nullcontext():
+            stream = (client or self.client).chat.completions.create(
+                model=self.config.get("model_txt_cloud", "llama-3.3-70b-versatile"),
+                messages=self._cloud_messages(system_prompt, prompt),
+                temperature=0.6, max_tokens=400, stream=True
+            )
+        try:
+            for chunk in stream:
+                x_groq = getattr(chunk, "x_groq", None)
+                if uso is not None and x_groq is not None and getattr(x_groq, "usage", None):
+                    uso["groq"] = (x_groq.usage.prompt_tokens, x_groq.usage.completion_tokens)
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    yield delta
+        finally:
+            close = getattr(stream, "close", None)
+            if close:
+                close()
+
+    def _stream_local(self, system_prompt: str, prompt: str, uso: dict = None, client=None):
+        """Gera tokens do Ollama. Fechar o gerador encerra a conexão HTTP. 'uso' recebe os tokens do último pedaço."""
+        target_model = self._select_local_model()
+        log_display(f"Pensando com Ollama Local ({target_model}, stream)...")
+        for part in (client or self.ollama).chat(model=target_model, messages=self._local_messages(system_prompt, prompt), stream=True, **self._atividade_local()):
+            if uso is not None and part.get("done"):
+                uso["ollama"] = self._uso_ollama(part)
+            delta = part['message']['content']
+            if delta:
+                yield delta
 
+    def pensar_stream(self, prompt: str, historico_txt: str = "", user_prefs: dict = {}, system_override: str = None, capabilities: str = "", long_term_context: str = ""):
+        """
+        Versão em streaming de pensar(): gera pedaços de texto conforme chegam.
+        Mesma ordem de backends (Groq -> Ollama). Se a nuvem falhar antes do
+        primeiro token, cai para o local; depois do primeiro token não há como
+        "desfalar", então o stream apenas termina.
+        Passa pela fila do scheduler como pedido interativo: ocupa um worker
+        enquanto gera, conta na cota da nuvem e cancela comandos mais velhos na fila.
+        """
+        medida = self.metrics.begin("stream", INTERACTIVE)
         try:
-            pil_img = Image.open(BytesIO(raw_image_bytes))
-            pil_img.thumbnail((1024, 1024))
-            buf = BytesIO()
-            pil_img.save(buf, format="JPEG", quality=70)
-            optimized_bytes = buf.getvalue()
-        except:
-            optimized_bytes = raw_image_bytes
-
-        if self.client and self.online:
+            if self.scheduler and not self.scheduler.in_worker():
+                with self.scheduler.slot(INTERACTIVE, supersede=True) as admitido:
+                    if not admitido:
+                        medida.ok = False
+                        medida.set_fallback("cancelado")  # Substituído na fila por um comando mais novo
+                        return
+                    medida.dequeued()
+                    yield from self._pensar_stream(prompt, historico_txt, user_prefs, system_override, capabilities, long_term_context, medida)
+            else:
+                yield from self._pensar_stream(prompt, historico_txt, user_prefs, system_override, capabilities, long_term_context, medida)
+        finally:
+            self.metrics.finish(medida)
+
+    def _pensar_stream(self, prompt, historico_txt, user_prefs, system_override, capabilities, long_term_context, medida):
+        """Corpo de pensar_stream(), já com a vaga no scheduler."""
+        contexto, cached = self._consultar_cache(prompt, historico_txt, user_prefs, system_override, capabilities, long_term_context, medida)
+        if cached is not None:
+            medida.first_token()
+            yield cached
+            return
+
+        system_prompt = self._build_system_prompt(historico_txt, user_prefs, system_override, capabilities, long_term_context)
+        parts, uso = [], {}
+
+        # Prioridade 1: Nuvem (Groq)
+        if self._nuvem_disponivel():
+            model = self.config.get("model_txt_cloud", "llama-3.3-70b-versatile")
             try:
-                log_display("Analisando imagem com Groq Vision...")
-                b64 = base64.b64encode(optimized_bytes).decode('utf-8')
-                comp = self.client.chat.completions.create(
-                    model=self.config.get("model_vis_cloud", "llama-3.2-11b-vision-preview"),
-                    messages=[{"role": "user", "content": [
-                        {"type": "text", "text": "Descreva esta imagem em Português do Brasil de forma concisa."},
-                        {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{b64}"}}
-                    ]}],
-                    temperature=0.1, max_tokens=300
-                )
-                return comp.choices[0].message.content
+                log_display("Pensando com Groq Cloud (stream)...")
+                for delta in self._stream_nuvem(system_prompt, prompt, uso, medida=medida):
+                    medida.first_token()
+                    parts.append(delta)
+                    yield delta
+                self._guardar_no_cache(prompt, contexto, parts, model)
+                self._anotar("groq", model, system_prompt, prompt, "".join(parts), uso.get("groq"), medida)
+                return
             except Exception as e:
-                log_display(f"Erro Vision Cloud: {e}")
-                self.online = False
-        
+                if parts:
+                    # Caiu no meio: o pedido fica com o Groq, como resposta incompleta (erro)
+                    log_display(f"ERRO GROQ stream (resposta interrompida): {e}")
+                    self._falha_nuvem(e, model, medida, tentativa=False)
+                    medida.ok = False
+                    self._anotar("groq", model, system_prompt, prompt, "".join(parts), medida=medida)
+                    return
+                log_display(f"ERRO GROQ stream (Caindo para local): {e}")
+                self._falha_nuvem(e, model, medida)
+        else:
+            self._anotar_fallback(medida=medida)
+
+        # Prioridade 2: Local (Ollama)
         if self.local_ready:
-            log_display("Analisando imagem com Moondream Local...")
             try:
-                res = ollama.chat(
-                    model=self.config.get("model_vis_local", "moondream"),
-                    messages=[{'role': 'user', 'content': 'Descreva esta imagem.', 'images': [raw_image_bytes]}]
-                )
-                return self.pensar(f"Traduza: {res['message']['content']}", "")
+                for delta in self._stream_local(system_prompt, prompt, uso):
+                    medida.first_token()
+                    parts.append(delta)
+                    yield delta
+                self._guardar_no_cache(prompt, contexto, parts, self._select_local_model())
+                self._anotar("ollama", self._select_local_model(), system_prompt, prompt, "".join(parts), uso.get("ollama"), medida)
+                return
             except Exception as e:
-                log_display(f"Erro Vision Local: {e}")
-            
-        return "Não consegui analisar a imagem."
\ No newline at end of file
+                self._anotar_falha("ollama", self._select_local_model(), e, medida)
+                if "not found" in str(e) or "404" in str(e):
+                    log_display(f"❌ Modelo não instalado! Rode 'python configurar_cerebro.py' para baixar.")
+                    medida.ok = False
+                    yield "Meu cérebro local não está instalado. Rode o configurador."
+                    return
+                log_display(f"ERRO Ollama: {e}")
+
+        medida.ok = False
+        yield "Desculpe, estou sem conexão e sem um cérebro local funcional."
+
+    # --- Cache de respostas ---
+    def _init_response_cache(self):
+        """Cria o cache de respostas (bagagem/response_cache.json) se habilitado no system.json."""
+        if not self.config_manager or not self.config.get("response_cache", True):
+            return None
+        try:
+            return ResponseCache(
+                self.config_manager.storage_path,
+                max_entries=int(self.config.get("response_cache_max_entries", 500)),
+                ttl_s=float(self.config.get("response_cache_ttl_s", 86400)),
+                semantic_threshold=float(self.config.get("response_cache_semantic_threshold", 0.93)),
+            )
+        except Exception as e:
+            log_display(f"Cache de respostas indisponível: {e}")
+            return None
+
+    def _consultar_cache(self, prompt, historico_txt, user_prefs, system_override, capabilities, long_term_context, medida=None, origem: str = INTERACTIVE):
+        """
+        Registra atividade e consulta o cache. Retorna (contexto|None, resposta_em_cache|None);
+        contexto None = este pedido não usa o cache (nem para ler, nem para gravar).
+        """
+        if self.local_keeper:
+            self.local_keeper.touch()  # Usuário ativo: mantém o fallback local quente
+        medida = medida or current_request()
+        if not self.response_cache:
+            return None, None
+        if origem != INTERACTIVE or system_override:
+            # Tarefas de fundo (web, dev, singularity) e prompts com sistema próprio (ex: tradução) sempre geram de novo
+            if medida:
+                medida.cache = "bypass"
+            return None, None
+        contexto = self._cache_context(historico_txt, user_prefs, system_override, capabilities, long_term_context)
+        cached = self.response_cache.get(prompt, contexto, self._modelo_principal())
+        if cached is not None:
+            log_display("Resposta servida do cache.")
+            if medida:
+                medida.cache = "hit"
+                medida.set_backend("cache")
+            return contexto, cached
+        if medida:
+            medida.cache = "bypass" if ResponseCache.should_bypass(prompt) else "miss"
+        return contexto, None
+
+    def _modelo_principal(self) -> str:
+        """Modelo que atenderia o pedido agora: a resposta em cache tem que ser dele."""
+        if self._nuvem_disponivel():
+            return self.config.get("model_txt_cloud", "llama-3.3-70b-versatile")
+        return self._select_local_model()
+
+    def _cache_context(self, historico_txt, user_prefs, system_override, capabilities, long_term_context) -> str:
+        """
+        Hash das entradas estáveis do prompt de sistema. Data/hora, histórico e
+        memórias (recuperadas pelo próprio prompt; a resposta anterior vira memória)
+        mudam a cada turno e ficam de fora, senão nenhuma pergunta repetida acertaria.
+        """
+        return ResponseCache.context_hash(
+            prefs=user_prefs, override=system_override, capabilities=capabilities,
+        )
+
+    def _guardar_no_cache(self, prompt: str, contexto: str, parts: list, model: str):
+        if contexto is not None and parts:
+            self.response_cache.put(prompt, contexto, "".join(parts), model)
+
+    def get_scheduler_metrics(self) -> dict:
+        return self.scheduler.get_metrics() if self.scheduler else {}
+
+    def get_cache_stats(self) -> dict:
+        return self.response_cache.stats() if self.response_cache else {}
+
+    # --- Hedging (nuvem x local) ---
+    def _hedge_config(self):
+        """Lê 'hedge_mode' (off | delay | race) e 'hedge_delay_s' do system.json."""
+        mode = str(self.config.get("hedge_mode", "off")).lower()
+        delay = float(self.config.get("hedge_delay_s", 1.5))
+        return mode, delay
+
+    def _clientes_hedge(self):
+        """
+        Clientes só do hedge: sem keep-alive (cada tentativa abre a própria
+        conexão, que pode ser derrubada) e sem retry (o outro backend é o plano B).
+        """
+        if self._hedge_http is None:
+            hooks = {"request": [_rastrear_hedge]}
+            limits = httpx.Limits(max_keepalive_connections=0)
+            self._hedge_http = DefaultHttpxClient(event_hooks={"request": [_rastrear_hedge, self._contar_chamada_nuvem],
+                                                               "response": [_anotar_erro_http]}, limits=limits)
+            self._hedge_ollama = ollama.Client(host=self.ollama_host, event_hooks=hooks, limits=limits)
+        return self.client.with_options(http_client=self._hedge_http, max_retries=0), self._hedge_ollama
+
+    def _consumir(self, backend: str, gerador, cancel: threading.Event, abort: _HedgeAbort):
+        """Junta o stream de um backend; se o outro venceu, a conexão já foi derrubada por abort."""
+        _hedge_local.abort = abort
+        parts = []
+        try:
+            for delta in gerador:
+                if cancel.is_set():
+                    break
+                parts.append(delta)
+        except Exception as e:
+            if cancel.is_set():
+                pass    # Erro causado pelo próprio cancelamento (socket derrubado)
+            elif backend == "nuvem":
+                log_display(f"ERRO GROQ (hedge): {e}")
+                self._falha_nuvem(e)
+                return None
+            else:
+                log_display(f"ERRO Ollama (hedge): {e}")
+                self._anotar_falha("ollama", self._select_local_model(), e)
+                return None
+        finally:
+            _hedge_local.abort = None
+            gerador.close()
+        if cancel.is_set():
+            log_display(f"Hedge: {backend} cancelado (perdeu a corrida).")
+            return None
+        return "".join(parts) or None
+
+    def _anotar_hedge(self, vencedor: str, system_prompt: str, prompt: str, resposta: str):
+        """Métricas do hedge: tokens estimados (os streams concorrentes não informam uso)."""
+        if vencedor == "nuvem":
+            self._anotar("groq", self.config.get("model_txt_cloud", "llama-3.3-70b-versatile"), system_prompt, prompt, resposta)
+            return
+        self._anotar("ollama", self._select_local_model(), system_prompt, prompt, resposta)
+        medida = current_request()
+        if medida:
+            medida.set_fallback("hedge")    # A nuvem perdeu a corrida
+
+    def _pensar_hedged(self, system_prompt: str, prompt: str, mode: str, delay: float):
+        """
+        Dispara a nuvem e, se ela não responder em `delay` segundos (ou já de
+        saída, no modo 'race'), dispara também o local. A primeira resposta
+        boa vence e a conexão da outra é derrubada na hora.
+        """
+        if self._hedge_pool is None:
+            vagas = max(1, int(self.config.get("brain_max_concurrency", 4)))
+            self._hedge_pool = ThreadPoolExecutor(max_workers=vagas * 2, thread_name_prefix="aeon-hedge")
+
+        nuvem, local = self._clientes_hedge()
+        cancel = threading.Event()
+        aborts = {"nuvem": _HedgeAbort(), "local": _HedgeAbort()}
+        start = time.perf_counter()
+        futures = {
+            # Cópia do contexto: as falhas e o fallback caem no pedido atual (métricas)
+            self._hedge_pool.submit(contextvars.copy_context().run, self._consumir, "nuvem", self._stream_nuvem(system_prompt, prompt, client=nuvem), cancel, aborts["nuvem"]): "nuvem"
+        }
+
+        if mode != "race":
+            done, _ = wait(futures, timeout=delay)
+            for fut in done:
+                if fut.result():
+                    log_display(f"Hedge: nuvem respondeu em {time.perf_counter() - start:.2f}s (local não foi acionado).")
+                    self._anotar_hedge("nuvem", system_prompt, prompt, fut.result())
+                    return fut.result()
+            log_display(f"Hedge: nuvem sem resposta em {delay:.1f}s, acionando local.")
+        futures[self._hedge_pool.submit(contextvars.copy_context().run, self._consumir, "local", self._stream_local(system_prompt, prompt, client=local), cancel, aborts["local"])] = "local"
+
+        for fut in as_completed(futures):
+            result = fut.result()
+            if result:
+                vencedor = futures[fut]
+                cancel.set()
+                for backend, abort in aborts.items():
+                    if backend != vencedor:
+                        abort.abort()
+                log_display(f"Hedge: {vencedor} venceu em {time.perf_counter() - start:.2f}s.")
+                self._anotar_hedge(vencedor, system_prompt, prompt, result)
+                return result
+        return None
+
+    # --- Visão ---
+    def _vision_cloud_args(self, prepared: PreparedImage) -> dict:
+        model = self.config.get("model_vis_cloud", "llama-3.2-11b-vision-preview")
+        b64 = prepared.b64_for_profile(self.vision_profiles.profile_for(model))
+        return dict(
+            model=model,
+            messages=[{"role": "user", "content": [
+                {"type": "text", "text": PROMPT_PT},
+                {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{b64}"}}
+            ]}],
+            temperature=0.1, max_tokens=300
+        )
+
+    def _vision_local_args(self, prepared: PreparedImage, profile: dict) -> dict:
+        return dict(
+            model=self.config.get("model_vis_local", "moondream"),
+            messages=[{'role': 'user', 'content': PROMPT_PT if profile["pt_native"] else PROMPT_EN,
+                       'images': [prepared.for_profile(profile)]}],
+            **self._atividade_local()
+        )
+
+    def _fim_visao(self, prepared: PreparedImage, resposta: str, ok: bool = True):
+        self.last_vision_timings = dict(prepared.timings)
+        log_display(f"Visão: {prepared.summary()}")
+        return resposta, ok
+
+    def _traduzir(self, descricao: str):
+        """
+        Tradução curta da descrição de um modelo só em inglês. Vai direto aos
+        modelos (sem o cache de respostas); se falhar, devolve (inglês, False)
+        para a descrição não entrar no cache de visão.
+        """
+        with self.metrics.track("traducao", "visao") as medida:
+            traducao, ok = self._gerar(TRANSLATE_SYSTEM, descricao)
+            medida.ok = ok
+        if not ok:
+            log_display("Tradução indisponível: descrição fica em inglês.")
+            return descricao, False
+        return traducao, True
+
+    async def _atraduzir(self, descricao: str):
+        """Versão assíncrona de _traduzir()."""
+        with self.metrics.track("traducao", "visao") as medida:
+            async with self._limite():
+                traducao, ok = await self._agerar(TRANSLATE_SYSTEM, descricao)
+            medida.ok = ok
+        if not ok:
+            log_display("Tradução indisponível: descrição fica em inglês.")
+            return descricao, False
+        return traducao, True
+
+    def _preparar_imagem(self, imagem) -> PreparedImage:
+        """Decodifica e reduz a imagem uma vez, até a maior resolução dos modelos de visão."""
+        base_side = self.vision_profiles.max_side([
+            self.config.get("model_vis_cloud", "llama-3.2-11b-vision-preview"),
+            self.config.get("model_vis_local", "moondream"),
+        ])
+        return PreparedImage(imagem, base_side=base_side)
+
+    def _visao_em_cache(self, prepared: PreparedImage, consultar: bool = True):
+        """Hash perceptual do quadro e análise anterior, se o quadro for quase idêntico."""
+        if not self.vision_cache or prepared.image is None:
+            return None, None
+        with prepared.timed("hash"):
+            # Hash sobre uma cópia reduzida: barato mesmo para capturas 4K
+            image_hash = self.vision_cache.hash_image(prepared.downscaled(512))
+        cached = self.vision_cache.lookup(image_hash) if consultar else None
+        if cached:
+            log_display(f"Visão: quadro sem mudanças, análise reaproveitada ({prepared.summary()}).")
+        return image_hash, cached
+
+    def get_vision_cache_stats(self) -> dict:
+        return self.vision_cache.stats() if self.vision_cache else {}
+
+    def ver(self, imagem, origem: str = "visao", cache: bool = True, quadro_inteiro: bool = True) -> str:
+        """
+        Processa uma imagem (bytes, PIL.Image ou array NumPy).
+        Quadros quase idênticos ao último analisado saem do cache sem entrar na fila
+        (cache=False força uma nova análise). quadro_inteiro=False (recorte, ex: só
+        o que mudou) entra no cache mas não substitui a última leitura da tela.
+        """
+        with self.metrics.track("visao", origem) as medida:
+            prepared = self._preparar_imagem(imagem)
+            image_hash, cached = self._visao_em_cache(prepared, consultar=cache)
+            if cached:
+                medida.cache = "hit"
+                medida.set_backend("cache")
+                self.last_vision_ok = True
+                return cached
+            medida.cache = "off" if image_hash is None else ("miss" if cache else "bypass")
+
+            if self.scheduler and not self.scheduler.in_worker():
+                resultado = self.scheduler.run(self._ver, prepared, origem=origem)
+            else:
+                resultado = self._ver(prepared)
+            if resultado is None:
+                medida.ok = False
+                self.last_vision_ok = False
+                return ""
+            resposta, ok = resultado
+            medida.ok = ok
+            self.last_vision_ok = ok
+            if ok and image_hash is not None:
+                self.vision_cache.store(image_hash, resposta, last_frame=quadro_inteiro)
+            return resposta
+
+    def _ver(self, prepared: PreparedImage):
+        """Cascata de visão. Retorna (texto, ok)."""
+        with self.metrics.track("visao", reuse=True) as medida:
+            medida.dequeued()
+            if self._usar_async():
+                return get_runtime().run(self._amedido(medida, self._aver(prepared)))
+
+            if self._nuvem_disponivel():
+                try:
+                    log_display("Analisando imagem com Groq Vision...")
+                    args = self._vision_cloud_args(prepared)
+                    with prepared.timed("nuvem"):
+                        comp = self.client.chat.completions.create(**args)
+                    resposta = comp.choices[0].message.content
+                    self._anotar("groq", args["model"], PROMPT_PT, "", resposta, self._uso_groq(comp))
+                    return self._fim_visao(prepared, resposta)
+                except Exception as e:
+                    log_display(f"Erro Vision Cloud: {e}")
+                    self._falha_nuvem(e, self.config.get("model_vis_cloud", "llama-3.2-11b-vision-preview"))
+            else:
+                self._anotar_fallback()
+
+            if self.local_ready:
+                model = self.config.get("model_vis_local", "moondream")
+                profile = self.vision_profiles.profile_for(model)
+                log_display(f"Analisando imagem com {model} Local...")
+                try:
+                    args = self._vision_local_args(prepared, profile)
+                    with prepared.timed("local"):
+                        res = self.ollama.chat(**args)
+                    descricao = res['message']['content']
+                    self._anotar("ollama", model, args["messages"][0]["content"], "", descricao, self._uso_ollama(res))
+                    ok = True
+                    if not profile["pt_native"]:
+                        # Modelo só em inglês: tradução curta, sem o prompt de sistema completo
+                        with prepared.timed("traducao"):
+                            descricao, ok = self._traduzir(descricao)
+                    return self._fim_visao(prepared, descricao, ok)
+                except Exception as e:
+                    log_display(f"Erro Vision Local: {e}")
+                    self._anotar_falha("ollama", model, e)
+
+            medida.ok = False
+            return "Não consegui analisar a imagem.", False
+
+    # --- API assíncrona (um event loop, conexões em pool) ---
+    def _usar_async(self) -> bool:
+        """
+        'async_brain' no system.json; nunca a partir do próprio loop (evita deadlock).
+        Desligado (padrão), pensar()/ver() nos workers do scheduler bloqueiam cada um
+        no seu socket; só ligado as chamadas síncronas se juntam no loop do runtime.
+        """
+        return bool(self.config.get("async_brain", False)) and not get_runtime().in_loop_thread()
+
+    def _estado_async(self) -> dict:
+        """Clientes e semáforo do loop em execução (apensar/aver podem vir de qualquer loop)."""
+        loop = asyncio.get_running_loop()
+        with self._aloops_lock:
+            estado = self._aloops.get(loop)
+            if estado is None:
+                estado = self._aloops[loop] = {"groq": None, "ollama": None, "limite": None}
+            return estado
+
+    def _acloud(self):
+        """AsyncGroq reaproveitado entre chamadas no mesmo loop (recriado quando a chave muda)."""
+        estado = self._estado_async()
+        if estado["groq"] is None or estado["groq"].api_key != self.groq_api_key:
+            estado["groq"] = AsyncGroq(api_key=self.groq_api_key, base_url=self.groq_base_url,
+                                       http_client=DefaultAsyncHttpxClient(event_hooks={"request": [self._acontar_chamada_nuvem],
+                                                                                        "response": [_aanotar_erro_http]}))
+        return estado["groq"]
+
+    def _alocal_client(self):
+        estado = self._estado_async()
+        if estado["ollama"] is None:
+            estado["ollama"] = ollama.AsyncClient(host=self.ollama_host)
+        return estado["ollama"]
+
+    def _limite(self) -> asyncio.Semaphore:
+        """Máximo de chamadas simultâneas aos backends por loop ('brain_max_concurrency')."""
+        estado = self._estado_async()
+        if estado["limite"] is None:
+            estado["limite"] = asyncio.Semaphore(int(self.config.get("brain_max_concurrency", 4)))
+        return estado["limite"]
+
+    async def apensar(self, prompt: str, historico_txt: str = "", user_prefs: dict = {}, system_override: str = None, capabilities: str = "", long_term_context: str = "", origem: str = INTERACTIVE) -> str:
+        """Versão assíncrona de pensar(): mesma cascata, cache e hedging."""
+        with self.metrics.track("texto", reuse=True) as medida:
+            contexto, cached = self._consultar_cache(prompt, historico_txt, user_prefs, system_override, capabilities, long_term_context, origem=origem)
+            if cached is not None:
+                return cached
+
+            system_prompt = self._build_system_prompt(historico_txt, user_prefs, system_override, capabilities, long_term_context)
+            async with self._limite():
+                resposta, ok = await self._agerar(system_prompt, prompt)
+            medida.ok = ok
+            if ok and contexto is not None:
+                self.response_cache.put(prompt, contexto, resposta, medida.model)
+            return resposta
+
+    async def _anuvem(self, system_prompt: str, prompt: str, uso: dict = None) -> str:
+        comp = await self._acloud().chat.completions.create(
+            model=self.config.get("model_txt_cloud", "llama-3.3-70b-versatile"),
+            messages=self._cloud_messages(system_prompt, prompt),
+            temperature=0.6, max_tokens=400
+        )
+        if uso is not None:
+            uso["groq"] = self._uso_groq(comp)
+        return comp.choices[0].message.content
+
+    async def _alocal(self, system_prompt: str, prompt: str, uso: dict = None) -> str:
+        target_model = self._select_local_model()
+        log_display(f"Pensando com Ollama Local ({target_model}, async)...")
+        r = await self._alocal_client().chat(
+            model=target_model,
+            messages=self._local_messages(system_prompt, prompt),
+            **self._atividade_local()
+        )
+        if uso is not None:
+            uso["ollama"] = self._uso_ollama(r)
+        return r['message']['content']
+
+    async def _agerar(self, system_prompt: str, prompt: str):
+        """Cascata assíncrona. Retorna (texto, ok) como _gerar()."""
+        mode, delay = self._hedge_config()
+        if mode in ("delay", "race") and self.local_ready and self._nuvem_disponivel():
+            result = await self._apensar_hedged(system_prompt, prompt, mode, delay)
+            if result:
+                return result, True
+            return "Desculpe, estou sem conexão e sem um cérebro local funcional.", False
+
+        uso = {}
+        if self._nuvem_disponivel():
+            try:
+                log_display("Pensando com Groq Cloud (async)...")
+                resposta = await self._anuvem(system_prompt, prompt, uso)
+                self._anotar("groq", self.config.get("model_txt_cloud", "llama-3.3-70b-versatile"), system_prompt, prompt, resposta, uso.get("groq"))
+                return resposta, True
+            except Exception as e:
+                log_display(f"ERRO GROQ (Caindo para local): {e}")
+                self._falha_nuvem(e)
+        else:
+            self._anotar_fallback()
+
+        if self.local_ready:
+            try:
+                resposta = await self._alocal(system_prompt, prompt, uso)
+                self._anotar("ollama", self._select_local_model(), system_prompt, prompt, resposta, uso.get("ollama"))
+                return resposta, True
+            except Exception as e:
+                self._anotar_falha("ollama", self._select_local_model(), e)
+                if "not found" in str(e) or "404" in str(e):
+                    log_display(f"❌ Modelo não instalado! Rode 'python configurar_cerebro.py' para baixar.")
+                    return "Meu cérebro local não está instalado. Rode o configurador.", False
+                log_display(f"ERRO Ollama: {e}")
+
+        return "Desculpe, estou sem conexão e sem um cérebro local funcional.", False
+
+    def _resultado_hedge(self, task, backend: str):
+        """Texto da tarefa concluída, ou None (registrando a falha)."""
+        if task.cancelled():
+            return None
+        error = task.exception()
+        if error is None:
+            return task.result() or None
+        if backend == "nuvem":
+            log_display(f"ERRO GROQ (hedge): {error}")
+            self._falha_nuvem(error)
+        else:
+            log_display(f"ERRO Ollama (hedge): {error}")
+            self._anotar_falha("ollama", self._select_local_model(), error)
+        return None
+
+    async def _apensar_hedged(self, system_prompt: str, prompt: str, mode: str, delay: float):
+        """Hedging assíncrono: a tarefa perdedora é cancelada (a requisição HTTP é abortada)."""
+        start = time.perf_counter()
+        tasks = {asyncio.ensure_future(self._anuvem(system_prompt, prompt)): "nuvem"}
+
+        if mode != "race":
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            for task in done:
+                result = self._resultado_hedge(task, "nuvem")
+                if result:
+                    log_display(f"Hedge: nuvem respondeu em {time.perf_counter() - start:.2f}s (local não foi acionado).")
+                    self._anotar_hedge("nuvem", system_prompt, prompt, result)
+                    return result
+            log_display(f"Hedge: nuvem sem resposta em {delay:.1f}s, acionando local.")
+        tasks[asyncio.ensure_future(self._alocal(system_prompt, prompt))] = "local"
+
+        pending = {t for t in tasks if not t.done()}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                result = self._resultado_hedge(task, tasks[task])
+                if result:
+                    for other in pending:
+                        other.cancel()
+                    log_display(f"Hedge: {tasks[task]} venceu em {time.perf_counter() - start:.2f}s.")
+                    self._anotar_hedge(tasks[task], system_prompt, prompt, result)
+                    return result
+        return None
+
+    async def aver(self, imagem, cache: bool = True, quadro_inteiro: bool = True) -> str:
+        """Versão assíncrona de ver()."""
+        with self.metrics.track("visao", "visao") as medida:
+            prepared = self._preparar_imagem(imagem)
+            image_hash, cached = self._visao_em_cache(prepared, consultar=cache)
+            if cached:
+                medida.cache = "hit"
+                medida.set_backend("cache")
+                self.last_vision_ok = True
+                return cached
+            medida.cache = "off" if image_hash is None else ("miss" if cache else "bypass")
+            resposta, ok = await self._aver(prepared)
+            medida.ok = ok
+            self.last_vision_ok = ok
+            if ok and image_hash is not None:
+                self.vision_cache.store(image_hash, resposta, last_frame=quadro_inteiro)
+            return resposta
+
+    async def _aver(self, prepared: PreparedImage):
+        model = self.config.get("model_vis_local", "moondream")
+        profile = self.vision_profiles.profile_for(model)
+        descricao = None
+
+        async with self._limite():
+            if self._nuvem_disponivel():
+                try:
+                    log_display("Analisando imagem com Groq Vision (async)...")
+                    args = self._vision_cloud_args(prepared)
+                    with prepared.timed("nuvem"):
+                        comp = await self._acloud().chat.completions.create(**args)
+                    resposta = comp.choices[0].message.content
+                    self._anotar("groq", args["model"], PROMPT_PT, "", resposta, self._uso_groq(comp))
+                    return self._fim_visao(prepared, resposta)
+                except Exception as e:
+                    log_display(f"Erro Vision Cloud: {e}")
+                    self._falha_nuvem(e, self.config.get("model_vis_cloud", "llama-3.2-11b-vision-preview"))
+            else:
+                self._anotar_fallback()
+
+            if self.local_ready:
+                log_display(f"Analisando imagem com {model} Local (async)...")
+                try:
+                    args = self._vision_local_args(prepared, profile)
+                    with prepared.timed("local"):
+                        res = await self._alocal_client().chat(**args)
+                    descricao = res['message']['content']
+                    self._anotar("ollama", model, args["messages"][0]["content"], "", descricao, self._uso_ollama(res))
+                except Exception as e:
+                    log_display(f"Erro Vision Local: {e}")
+                    self._anotar_falha("ollama", model, e)
+
+        if not descricao:
+            return "Não consegui analisar a imagem.", False
+        # A tradução pega o semáforo de novo: fica fora do bloco acima
+        ok = True
+        if not profile["pt_native"]:
+            with prepared.timed("traducao"):
+                descricao, ok = await self._atraduzir(descricao)
+        return self._fim_visao(prepared, descricao, ok)
@@ -0,0 +1,261 @@
+import contextvars
+import heapq
+from contextlib import contextmanager
+import itertools
+import threading
+import time
+from collections import defaultdict, deque
+
+
+def log_display(msg):
+    print(f"[SCHEDULER] {msg}")
+
+
+INTERACTIVE = "interativo"
+
+DEFAULT_PRIORITIES = {   # Menor = mais urgente
+    INTERACTIVE: 0,
+    "visao": 1,
+    "web": 1,
+    "singularity": 5,
+    "dev": 5,
+}
+
+DEFAULT_SOURCE_LIMITS = {  # Execuções simultâneas por origem
+    "singularity": 1,
+    "dev": 1,
+}
+
+
+class BrainTicket:
+    """Um pedido ao Brain na fila. wait() devolve a resposta (None se cancelado)."""
+    def __init__(self, fn, args, kwargs, origem: str, priority: int):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.origem = origem
+        self.priority = priority
+        self.context = contextvars.copy_context()   # Contexto de quem pediu (ex: métricas do pedido)
+        self.enqueued_at = time.perf_counter()
+        self.started_at = None
+        self.cancelled = False
+        self.result = None
+        self.error = None
+        self._started = threading.Event()   # Saiu da fila (começou ou foi cancelado)
+        self._done = threading.Event()
+
+    def cancel(self) -> bool:
+        """Cancela se ainda não começou (uma chamada em andamento vai até o fim)."""
+        if self.started_at is not None or self._done.is_set():
+            return False
+        self.cancelled = True
+        self._started.set()
+        self._done.set()
+        return True
+
+    def wait_started(self, timeout: float = None) -> bool:
+        """Espera sair da fila. True se começou a executar, False se cancelado."""
+        self._started.wait(timeout)
+        return self.started_at is not None and not self.cancelled
+
+    def wait(self, timeout: float = None):
+        self._done.wait(timeout)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class BrainScheduler:
+    """
+    Fila de prioridade na frente do Brain.
+    - Comandos interativos passam na frente de DevFactory/Singularity/Web.
+    - Limite de execuções simultâneas por origem (ex: 1 geração de código por vez),
+      de modo que sempre sobra worker para o usuário.
+    - Cota da nuvem: conta as chamadas ao Groq no último minuto (o Brain avisa em
+      note_cloud_call quando a requisição sai de fato) e segura os pedidos de
+      segundo plano quando restar só a reserva do interativo.
+    - Um novo comando interativo cancela os interativos ainda na fila.
+    """
+    def __init__(self, workers: int = 3, priorities: dict = None, source_limits: dict = None,
+                 cloud_rpm: int = 30, cloud_reserve: float = 0.2, cloud_available=None):
+        self.priorities = dict(DEFAULT_PRIORITIES)
+        self.priorities.update(priorities or {})
+        self.source_limits = dict(DEFAULT_SOURCE_LIMITS)
+        self.source_limits.update(source_limits or {})
+        self.cloud_rpm = cloud_rpm
+        self.cloud_reserve = cloud_reserve
+        self.cloud_available = cloud_available or (lambda: False)
+
+        self._queue = []                 # heap (prioridade, seq, ticket)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._cloud_calls = deque()      # instantes das chamadas à nuvem (janela de 60s)
+        self._local = threading.local()
+        self._stop = False
+
+        self.running = defaultdict(int)
+        self.completed = defaultdict(int)
+        self.cancelled = defaultdict(int)
+        self.wait_times = defaultdict(lambda: deque(maxlen=200))
+
+        self._workers = [
+            threading.Thread(target=self._worker, name=f"brain-worker-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for t in self._workers:
+            t.start()
+
+    # --- API ---
+    def priority_for(self, origem: str) -> int:
+        return int(self.priorities.get(origem, 5))
+
+    def in_worker(self) -> bool:
+        """True dentro de um worker (chamadas aninhadas, ex: ver -> pensar, executam direto)."""
+        return getattr(self._local, "active", False)
+
+    def submit(self, fn, *args, origem: str = INTERACTIVE, supersede: bool = False, **kwargs) -> BrainTicket:
+        ticket = BrainTicket(fn, args, kwargs, origem, self.priority_for(origem))
+        with self._cond:
+            if supersede:
+                self._cancel_locked(origem)
+            heapq.heappush(self._queue, (ticket.priority, next(self._seq), ticket))
+            self._cond.notify()
+        return ticket
+
+    def run(self, fn, *args, origem: str = INTERACTIVE, supersede: bool = False, **kwargs):
+        """Enfileira e espera a resposta."""
+        return self.submit(fn, *args, origem=origem, supersede=supersede, **kwargs).wait()
+
+    @contextmanager
+    def slot(self, origem: str = INTERACTIVE, supersede: bool = False):
+        """
+        Vaga num worker para trabalho que roda na thread de quem pede (ex: o
+        stream do Brain, consumido aos pedaços pelo TTS). Passa pela fila como
+        qualquer pedido (prioridade, limite por origem, cota da nuvem, supersede)
+        e segura o worker até o bloco terminar. O bloco recebe False se o
+        pedido foi cancelado na fila.
+        """
+        release = threading.Event()
+        ticket = self.submit(release.wait, origem=origem, supersede=supersede)
+        try:
+            yield ticket.wait_started()
+        finally:
+            release.set()
+            ticket.wait()   # Worker liberado e contabilizado antes de seguir
+
+    def note_cloud_call(self):
+        """Registra uma requisição ao Groq na janela de 60s. Cache, local e slot sem nuvem não gastam cota."""
+        with self._cond:
+            self._cloud_calls.append(time.time())
+
+    def cancel(self, origem: str = None) -> int:
+        """Cancela os pedidos na fila (de uma origem, ou todos). Retorna quantos."""
+        with self._cond:
+            return self._cancel_locked(origem)
+
+    def stop(self):
+        with self._cond:
+            self._stop = True
+            self._cancel_locked(None)
+            self._cond.notify_all()
+
+    def get_metrics(self) -> dict:
+        with self._cond:
+            depth = defaultdict(int)
+            for _, _, ticket in self._queue:
+                if not ticket.cancelled:
+                    depth[ticket.origem] += 1
+            self._prune_cloud_calls(time.time())
+            waits = {}
+            for origem, samples in self.wait_times.items():
+                ordered = sorted(samples)
+                if ordered:
+                    waits[origem] = {
+                        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 1),
+                        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 1),
+                        "max_ms": round(ordered[-1] * 1000, 1),
+                    }
+            return {
+                "queue_depth": sum(depth.values()),
+                "queue_by_source": dict(depth),
+                "running": {k: v for k, v in self.running.items() if v},
+                "completed": dict(self.completed),
+                "cancelled": dict(self.cancelled),
+                "wait_times": waits,
+                "cloud_calls_last_min": len(self._cloud_calls),
+                "cloud_rpm": self.cloud_rpm,
+            }
+
+    # --- Internos (com _cond) ---
+    def _cancel_locked(self, origem) -> int:
+        count = 0
+        for _, _, ticket in self._queue:
+            if (origem is None or ticket.origem == origem) and ticket.cancel():
+                self.cancelled[ticket.origem] += 1
+                count += 1
+        if count:
+            log_display(f"{count} pedido(s) '{origem or 'todos'}' cancelado(s) na fila.")
+        return count
+
+    def _prune_cloud_calls(self, now):
+        while self._cloud_calls and now - self._cloud_calls[0] > 60:
+            self._cloud_calls.popleft()
+
+    def _cloud_allows(self, ticket, now) -> bool:
+        """Interativo sempre passa; segundo plano respeita a reserva da cota por minuto."""
+        if not self.cloud_rpm or ticket.priority <= self.priority_for(INTERACTIVE):
+            return True
+        if not self.cloud_available():
+            return True
+        self._prune_cloud_calls(now)
+        return len(self._cloud_calls) < self.cloud_rpm * (1 - self.cloud_reserve)
+
+    def _pick(self):
+        """Retorna (ticket, espera_sugerida). Percorre a fila em ordem de prioridade."""
+        now = time.time()
+        retry_in = None
+        for entry in sorted(self._queue):
+            ticket = entry[2]
+            if ticket.cancelled:
+                self._queue.remove(entry)
+                continue
+            limit = self.source_limits.get(ticket.origem)
+            if limit is not None and self.running[ticket.origem] >= limit:
+                continue
+            if not self._cloud_allows(ticket, now):
+                # Libera quando a chamada mais antiga sair da janela de 60s
+                wait = 60 - (now - self._cloud_calls[0]) if self._cloud_calls else 1.0
+                retry_in = wait if retry_in is None else min(retry_in, wait)
+                continue
+            self._queue.remove(entry)
+            heapq.heapify(self._queue)
+            return ticket, None
+        return None, retry_in
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._stop:
+                        return
+                    ticket, retry_in = self._pick()
+                    if ticket:
+                        break
+                    self._cond.wait(timeout=max(0.05, retry_in) if retry_in else None)
+                ticket.started_at = time.perf_counter()
+                ticket._started.set()
+                self.running[ticket.origem] += 1
+                self.wait_times[ticket.origem].append(ticket.started_at - ticket.enqueued_at)
+
+            self._local.active = True
+            try:
+                ticket.result = ticket.context.run(ticket.fn, *ticket.args, **ticket.kwargs)
+            except Exception as e:
+                ticket.error = e
+            finally:
+                self._local.active = False
+                with self._cond:
+                    self.running[ticket.origem] -= 1
+                    self.completed[ticket.origem] += 1
+                    self._cond.notify_all()
+                ticket._done.set()
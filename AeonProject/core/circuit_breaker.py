@@ -0,0 +1,139 @@
+import random
+import threading
+import time
+
+
+def log_display(msg):
+    print(f"[BREAKER] {msg}")
+
+
+class CircuitBreaker:
+    """
+    Disjuntor para um backend remoto (ex: Groq).
+
+    FECHADO   -> requisições passam normalmente.
+    ABERTO    -> requisições são recusadas na hora (o chamador vai direto ao
+                 fallback); uma thread de sonda tenta o backend em segundo
+                 plano com backoff exponencial.
+    SEMIABERTO -> a sonda está testando o backend; se passar, volta a FECHADO.
+
+    Assim, com a nuvem fora do ar, nenhum comando do usuário paga o timeout
+    de reconexão: só a sonda paga.
+    """
+    CLOSED = "FECHADO"
+    OPEN = "ABERTO"
+    HALF_OPEN = "SEMIABERTO"
+
+    def __init__(self, name: str, probe=None, failure_threshold: int = 1,
+                 base_delay: float = 5.0, max_delay: float = 300.0, on_state_change=None):
+        self.name = name
+        self.probe = probe                      # Callable -> bool (True = backend saudável)
+        self.failure_threshold = max(1, failure_threshold)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.on_state_change = on_state_change  # Callable(estado, segundos_para_nova_tentativa)
+
+        self.state = self.CLOSED
+        self.failures = 0
+        self.current_delay = base_delay
+        self.next_attempt_at = 0.0
+        self.last_error = None
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._probe_thread = None
+
+    # --- API usada pelo chamador ---
+    def allow_request(self) -> bool:
+        """True se o backend pode ser usado agora (nunca bloqueia)."""
+        return self.state == self.CLOSED
+
+    def record_success(self):
+        with self._lock:
+            changed = self.state != self.CLOSED
+            self.state = self.CLOSED
+            self.failures = 0
+            self.current_delay = self.base_delay
+            self.last_error = None
+        if changed:
+            log_display(f"{self.name}: recuperado, circuito FECHADO.")
+            self._notify()
+
+    def record_failure(self, error=None):
+        with self._lock:
+            self.failures += 1
+            self.last_error = str(error) if error else self.last_error
+            if self.state == self.OPEN or self.failures < self.failure_threshold:
+                return
+            self.state = self.OPEN
+            self.next_attempt_at = time.time() + self.current_delay
+        log_display(f"{self.name}: circuito ABERTO. Nova tentativa em {self.current_delay:.0f}s.")
+        self._notify()
+        self._start_probe()
+
+    def retry_in(self) -> float:
+        """Segundos até a próxima sonda (0 se fechado)."""
+        if self.state == self.CLOSED:
+            return 0.0
+        return max(0.0, self.next_attempt_at - time.time())
+
+    def get_status(self) -> dict:
+        return {
+            "name": self.name,
+            "state": self.state,
+            "failures": self.failures,
+            "retry_in": round(self.retry_in(), 1),
+            "last_error": self.last_error,
+        }
+
+    def stop(self):
+        """Encerra a sonda em segundo plano (shutdown)."""
+        self._stop.set()
+
+    # --- Sonda em segundo plano ---
+    def _notify(self):
+        if self.on_state_change:
+            try:
+                self.on_state_change(self.state, self.retry_in())
+            except Exception as e:
+                log_display(f"Erro no callback de estado: {e}")
+
+    def _start_probe(self):
+        if self.probe is None:
+            return
+        with self._lock:
+            if self._probe_thread and self._probe_thread.is_alive():
+                return
+            self._probe_thread = threading.Thread(target=self._probe_loop, name=f"breaker-{self.name}", daemon=True)
+            self._probe_thread.start()
+
+    def _probe_loop(self):
+        while not self._stop.is_set():
+            if self._stop.wait(self.retry_in()):
+                return
+            with self._lock:
+                if self.state == self.CLOSED:
+                    return  # Alguém (ex: reconexão manual) já fechou o circuito
+                self.state = self.HALF_OPEN
+            self._notify()
+
+            try:
+                healthy = bool(self.probe())
+            except Exception as e:
+                healthy = False
+                self.last_error = str(e)
+
+            if healthy:
+                self.record_success()
+                return
+
+            with self._lock:
+                if self.state == self.CLOSED:
+                    return
+                # Backoff exponencial com jitter para não sincronizar tentativas
+                self.current_delay = min(self.max_delay, self.current_delay * 2)
+                wait = self.current_delay * random.uniform(0.8, 1.2)
+                self.state = self.OPEN
+                self.next_attempt_at = time.time() + wait
+            log_display(f"{self.name}: sonda falhou. Próxima em {wait:.0f}s.")
+            self._notify()
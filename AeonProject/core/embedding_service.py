@@ -0,0 +1,265 @@
+import atexit
+import hashlib
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from pathlib import Path
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+def log_display(msg):
+    print(f"[EMBEDDINGS] {msg}")
+
+
+def _percentile(ordered, pct):
+    if not ordered:
+        return None
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct))], 1)
+
+
+class EmbeddingService:
+    """
+    Serviço de embeddings do processo inteiro (memória vetorial, roteador de
+    intenções, cache de respostas). O mesmo texto é calculado uma vez só:
+    - Cache LRU chaveado pelo sha1 do texto (vetores float32)
+    - Pedidos simultâneos de várias threads viram um único lote no modelo; quem
+      pede um texto que já está sendo calculado espera o mesmo resultado
+    - Opcionalmente persiste o cache em disco (.npz), só reaproveitado com o mesmo modelo
+    O modelo é registrado por quem o carrega (set_model), ex: a VectorMemory.
+    """
+    def __init__(self, max_entries: int = 5000, max_batch: int = 64, batch_window_ms: float = 0.0,
+                 cache_path=None, stats_window: int = 200):
+        self.max_entries = max_entries
+        self.max_batch = max(1, max_batch)
+        self.batch_window_ms = batch_window_ms     # Espera extra para juntar lotes (0 = só o que chegou durante o lote anterior)
+        self.cache_path = Path(cache_path) if cache_path else None
+
+        self.model = None
+        self.model_name = None
+        self._cache = OrderedDict()     # sha1 -> vetor
+        self._cache_model = None        # Modelo que gerou os vetores do cache
+        self._queue = OrderedDict()     # sha1 -> texto, esperando o próximo lote
+        self._futures = {}              # sha1 -> Future (na fila ou no lote em cálculo)
+        self._cond = threading.Condition()
+        self._worker = None
+        self._closing = False
+        self._dirty = False
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.batches = 0
+        self.encoded = 0
+        self.errors = 0
+        self._recent = deque(maxlen=stats_window)    # (tamanho do lote, ms)
+
+        if self.cache_path:
+            self.load()
+            atexit.register(self.save)
+
+    # --- Modelo ---
+    def set_model(self, model, model_name: str):
+        """Registra a função de embedding (lista de textos -> vetores). Troca de modelo esvazia o cache."""
+        with self._cond:
+            replaced = self.model is not None and self.model is not model
+            self.model = model
+            self.model_name = model_name
+            if self._cache_model != model_name or replaced:
+                if self._cache:
+                    log_display(f"Cache de outro modelo ({self._cache_model}) descartado.")
+                self._cache.clear()
+                self._cache_model = model_name
+
+    @property
+    def is_ready(self) -> bool:
+        return self.model is not None
+
+    @staticmethod
+    def _key(text: str) -> str:
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    # --- API ---
+    def encode(self, texts, timeout: float = None):
+        """Vetores (n, dim) float32 na ordem de 'texts'. Bloqueia até o lote que os contém terminar."""
+        texts = list(texts)
+        keys = [self._key(text) for text in texts]
+        found, waiting = {}, {}
+        with self._cond:
+            if self.model is None:
+                raise RuntimeError("modelo de embedding não carregado")
+            if self._closing:
+                raise RuntimeError("serviço de embeddings encerrado")
+            for key, text in zip(keys, texts):
+                if key in found or key in waiting:
+                    continue
+                vector = self._cache.get(key)
+                if vector is not None:
+                    self._cache.move_to_end(key)
+                    self.hits += 1
+                    found[key] = vector
+                    continue
+                future = self._futures.get(key)
+                if future is not None:
+                    self.coalesced += 1
+                else:
+                    self.misses += 1
+                    future = self._futures[key] = Future()
+                    self._queue[key] = text
+                waiting[key] = future
+            if self._queue:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._work_loop, name="embedding-service", daemon=True)
+                    self._worker.start()
+                self._cond.notify_all()
+
+        end = None if timeout is None else time.monotonic() + timeout
+        for key, future in waiting.items():
+            found[key] = future.result(None if end is None else max(0.0, end - time.monotonic()))
+        if not keys:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.stack([found[key] for key in keys])
+
+    def _work_loop(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._closing:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                if self.batch_window_ms > 0:
+                    deadline = time.monotonic() + self.batch_window_ms / 1000.0
+                    while len(self._queue) < self.max_batch and not self._closing:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                batch = [self._queue.popitem(last=False) for _ in range(min(self.max_batch, len(self._queue)))]
+                model, model_name = self.model, self.model_name
+            self._encode_batch(batch, model, model_name)
+
+    def _encode_batch(self, batch, model, model_name):
+        start = time.perf_counter()
+        try:
+            vectors = np.asarray(model([text for _, text in batch]), dtype=np.float32)
+            error = None
+        except Exception as e:
+            vectors, error = None, e
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        with self._cond:
+            futures = [self._futures.pop(key) for key, _ in batch]
+            if error is None:
+                self.batches += 1
+                self.encoded += len(batch)
+                self._recent.append((len(batch), elapsed_ms))
+                if model_name == self._cache_model:
+                    for (key, _), vector in zip(batch, vectors):
+                        self._cache[key] = vector
+                        self._cache.move_to_end(key)
+                    while len(self._cache) > self.max_entries:
+                        self._cache.popitem(last=False)
+                    self._dirty = True
+            else:
+                self.errors += 1
+        for i, future in enumerate(futures):
+            if error is None:
+                future.set_result(vectors[i])
+            else:
+                future.set_exception(error)
+
+    def get_stats(self) -> dict:
+        with self._cond:
+            recent = list(self._recent)
+            lookups = self.hits + self.misses + self.coalesced
+            stats = {
+                "model": self.model_name,
+                "cache_size": len(self._cache),
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "hit_rate": round((self.hits + self.coalesced) / lookups, 3) if lookups else 0.0,
+                "batches": self.batches,
+                "encoded": self.encoded,
+                "errors": self.errors,
+                "queue_depth": len(self._queue),
+            }
+        sizes = sorted(size for size, _ in recent)
+        latency = sorted(ms for _, ms in recent)
+        stats.update({
+            "batch_size_avg": round(sum(sizes) / len(sizes), 2) if sizes else None,
+            "batch_size_max": sizes[-1] if sizes else None,
+            "encode_p50_ms": _percentile(latency, 0.5),
+            "encode_p95_ms": _percentile(latency, 0.95),
+        })
+        return stats
+
+    def close(self, timeout: float = 5.0):
+        """Termina os lotes pendentes, para a thread e grava o cache (se persistente)."""
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+            worker = self._worker
+        if worker is not None:
+            worker.join(timeout)
+        self.save()
+
+    # --- Persistência ---
+    def load(self):
+        if not (self.cache_path and self.cache_path.exists() and NUMPY_AVAILABLE):
+            return
+        try:
+            with np.load(self.cache_path, allow_pickle=False) as data:
+                keys, vectors, model_name = data["keys"], data["vectors"], str(data["model"])
+            with self._cond:
+                for key, vector in zip(keys.tolist(), vectors):
+                    self._cache[key] = vector
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+                self._cache_model = model_name
+            log_display(f"{len(self._cache)} embeddings carregados do disco ({model_name}).")
+        except Exception as e:
+            log_display(f"Cache de embeddings ilegível, começando vazio: {e}")
+
+    def save(self):
+        if not (self.cache_path and NUMPY_AVAILABLE):
+            return
+        with self._cond:
+            if not self._dirty or not self._cache:
+                return
+            keys = list(self._cache.keys())
+            vectors = np.stack(list(self._cache.values()))
+            model_name = self._cache_model or ""
+            self._dirty = False
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_path.with_suffix(".tmp.npz")
+            np.savez(tmp, keys=np.asarray(keys), vectors=vectors, model=np.asarray(model_name))
+            tmp.replace(self.cache_path)
+        except Exception as e:
+            log_display(f"Erro ao salvar cache de embeddings: {e}")
+
+
+_service = None
+_service_options = None
+_service_lock = threading.Lock()
+
+
+def get_embedding_service(**options) -> EmbeddingService:
+    """
+    Instância única do processo. As opções só valem na primeira chamada;
+    opções diferentes depois são ignoradas com aviso (sem opções = "a que existir").
+    """
+    global _service, _service_options
+    with _service_lock:
+        if _service is None:
+            _service = EmbeddingService(**options)
+            _service_options = dict(options)
+        elif options and options != _service_options:
+            log_display(f"Serviço de embeddings já criado com {_service_options}; ignorando {options}.")
+        return _service
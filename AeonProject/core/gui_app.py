@@ -11,6 +11,7 @@ from core.module_manager import ModuleManager
 from core.io_handler import IOHandler
 from core.config_manager import ConfigManager
 from core.context_manager import ContextManager
+from core.status_manager import StatusManager
 
 # Tenta importar Brain de forma robusta
 try:
@@ -39,8 +40,9 @@ class AeonGUI(ctk.CTk):
         cfg = getattr(self.config_manager, 'config', {}) 
         self.io_handler = IOHandler(cfg, None)
         
+        self.status_manager = StatusManager()
         try:
-            self.brain = Brain(self.config_manager)
+            self.brain = Brain(self.config_manager, status_manager=self.status_manager)
         except Exception as e:
             print(f"[GUI] Erro ao iniciar Brain: {e}")
             self.brain = None
@@ -56,6 +58,7 @@ class AeonGUI(ctk.CTk):
             "config_manager": self.config_manager,
             "io_handler": self.io_handler,
             "brain": self.brain,
+            "status_manager": self.status_manager,
             "context": self.context_manager,
             "gui": self,
             "workspace": self.workspace_path
@@ -331,6 +334,8 @@ class AeonGUI(ctk.CTk):
     def on_closing(self):
         """Executa limpeza e encerra o programa."""
         self.running = False
+        if getattr(self, "module_manager", None):
+            self.module_manager.shutdown()
         self.cleanup_temp_files()
         self.destroy()
         sys.exit(0)
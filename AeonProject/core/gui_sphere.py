@@ -14,10 +14,11 @@ from core.module_manager import ModuleManager
 from core.io_handler import IOHandler
 from core.config_manager import ConfigManager
 from core.context_manager import ContextManager
+from core.status_manager import StatusManager
 
 # Tenta importar Brain de forma robusta
 try:
-    from core.brain import AeonBrain as Brain
+    from core.brain import AeonBrain as Brain, iter_sentences
 except ImportError:
     try:
         from core.brain import Brain
@@ -47,8 +48,9 @@ class AeonSphere(QMainWindow):
         cfg = getattr(self.config_manager, 'config', {})
         self.io_handler = IOHandler(cfg, None)
         
+        self.status_manager = StatusManager()
         try:
-            self.brain = Brain(self.config_manager)
+            self.brain = Brain(self.config_manager, status_manager=self.status_manager)
         except Exception as e:
             print(f"[SPHERE] Erro ao iniciar Brain: {e}")
             self.brain = None
@@ -64,6 +66,7 @@ class AeonSphere(QMainWindow):
             "config_manager": self.config_manager,
             "io_handler": self.io_handler,
             "brain": self.brain,
+            "status_manager": self.status_manager,
             "context": self.context_manager,
             "gui": self, 
             "workspace": self.workspace_path
@@ -402,6 +405,10 @@ class AeonSphere(QMainWindow):
                 return
 
             if not silent: self.state = "PROCESSING"
+            if self.config_manager.get_system_data("stream_responses", True):
+                self.io_handler.falar_stream(iter_sentences(self._stream_to_display(txt, silent)))
+                return
+
             response = self.module_manager.route_command(txt)
             # Muda estado para IDLE antes de falar para permitir animação de fala
             self.after(0, lambda: setattr(self, 'state', 'IDLE'))
@@ -410,6 +417,28 @@ class AeonSphere(QMainWindow):
             self.io_handler.falar(response)
         except Exception as e:
             print(f"Erro: {e}")
+            # Falha antes da resposta (ex: stream que nem começou) não deixa a esfera presa em PROCESSING
+            if not silent: self.after(0, lambda: setattr(self, 'state', 'IDLE'))
+
+    def _stream_to_display(self, txt, silent=False):
+        """Repassa os pedaços da resposta ao TTS e atualiza o balão progressivamente."""
+        shown = ""
+        stream = None
+        try:
+            stream = self.module_manager.route_command_stream(txt)
+            for chunk in stream:
+                if not shown:
+                    # Primeiro pedaço: sai de PROCESSING para permitir animação de fala
+                    self.after(0, lambda: setattr(self, 'state', 'IDLE'))
+                shown += chunk
+                if not silent: self.after(0, self.show_response, shown)
+                yield chunk
+        finally:
+            if stream is not None:
+                stream.close()
+            if not shown:
+                # Stream vazio ou com erro: nenhum pedaço tirou a esfera de PROCESSING
+                self.after(0, lambda: setattr(self, 'state', 'IDLE'))
 
     def show_response(self, text):
         """Exibe o texto no balão flutuante."""
@@ -0,0 +1,136 @@
+import math
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter
+
+
+# Palavras que não ajudam a achar memórias (inclui o prefixo "Usuário: ... | Aeon: ...")
+STOPWORDS = frozenset(
+    "a o as os um uma uns umas de da do das dos em na no nas nos por pra para com sem e ou "
+    "que se me te lhe eu tu ele ela voce nos vos eles elas meu minha seu sua isso isto esse essa "
+    "este esta aquele aquela ao aos mais muito ja nao sim foi ser ter tem sao estou "
+    "qual quais como quando onde quem usuario aeon".split()
+)
+
+
+def tokenize(text: str):
+    """Minúsculas, sem acentos, só palavras com 2+ caracteres e fora da lista de stopwords."""
+    text = unicodedata.normalize("NFKD", (text or "").lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return [t for t in re.findall(r"\w+", text) if len(t) > 1 and t not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    Índice invertido em memória (termo -> {posição do documento: frequência}) com
+    pontuação BM25. Cresce junto com a memória vetorial: a VectorMemory carrega os
+    documentos já gravados e acrescenta cada lote novo.
+    """
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings = {}
+        self.doc_ids = []
+        self.documents = []
+        self.timestamps = []
+        self.lengths = []
+        self.total_length = 0
+        self._known = set()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.doc_ids)
+
+    def add(self, ids, documents, metadatas=None):
+        metadatas = metadatas or [None] * len(ids)
+        with self._lock:
+            for doc_id, doc, meta in zip(ids, documents, metadatas):
+                if doc_id in self._known:
+                    continue
+                pos = len(self.doc_ids)
+                terms = Counter(tokenize(doc))
+                for term, tf in terms.items():
+                    self.postings.setdefault(term, {})[pos] = tf
+                length = sum(terms.values())
+                self._known.add(doc_id)
+                self.doc_ids.append(doc_id)
+                self.documents.append(doc or "")
+                self.timestamps.append((meta or {}).get("timestamp"))
+                self.lengths.append(length)
+                self.total_length += length
+
+    def _idf(self, df: int, n: int) -> float:
+        return math.log(1.0 + (n - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, k: int):
+        """
+        Top-k [(id, documento, timestamp, score)] com score em [0, 1]: BM25 dividido
+        pelo máximo que a consulta alcançaria com termos inéditos (idf máximo) e tf
+        médio. Termo presente em toda a memória quase não pontua; nome próprio raro sim.
+        """
+        terms = set(tokenize(query))
+        with self._lock:
+            n = len(self.doc_ids)
+            if not terms or not n:
+                return []
+            avgdl = (self.total_length / n) or 1.0
+            scores = {}
+            for term in terms:
+                posting = self.postings.get(term)
+                if not posting:
+                    continue
+                idf = self._idf(len(posting), n)
+                for pos, tf in posting.items():
+                    norm = self.k1 * (1 - self.b + self.b * self.lengths[pos] / avgdl)
+                    scores[pos] = scores.get(pos, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+            ceiling = len(terms) * self._idf(0, n)
+            best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+            return [(self.doc_ids[pos], self.documents[pos], self.timestamps[pos], min(1.0, score / ceiling))
+                    for pos, score in best]
+
+
+class HybridRetriever:
+    """
+    Junta os candidatos da busca vetorial (similaridade de cosseno) e do BM25:
+    score = alpha * vetor + (1 - alpha) * léxico, multiplicado por um peso de
+    recência (meia-vida em dias). Só volta o que passar de 'min_score'.
+    Candidato que só apareceu num dos lados conta 0 no outro.
+    """
+    def __init__(self, alpha: float = 0.6, min_score: float = 0.3,
+                 recency_weight: float = 0.2, half_life_days: float = 30.0):
+        self.alpha = alpha
+        self.min_score = min_score
+        self.recency_weight = recency_weight
+        self.half_life_days = half_life_days
+
+    def _recency(self, timestamp, now) -> float:
+        if not self.recency_weight or not timestamp or self.half_life_days <= 0:
+            return 1.0
+        age_days = max(0.0, now - float(timestamp)) / 86400.0
+        return (1.0 - self.recency_weight) + self.recency_weight * 0.5 ** (age_days / self.half_life_days)
+
+    def rank(self, vector_hits, lexical_hits, n_results: int, now: float = None):
+        """
+        vector_hits / lexical_hits: [(id, documento, timestamp, score)].
+        Retorna até n_results dicts {id, document, score, vector, lexical, timestamp}.
+        """
+        now = time.time() if now is None else now
+        candidates = {}
+        for field, hits in (("vector", vector_hits), ("lexical", lexical_hits)):
+            for doc_id, doc, timestamp, score in hits:
+                entry = candidates.setdefault(doc_id, {"id": doc_id, "document": doc, "timestamp": timestamp,
+                                                       "vector": 0.0, "lexical": 0.0})
+                entry[field] = max(entry[field], float(score))
+                if entry["timestamp"] is None:
+                    entry["timestamp"] = timestamp
+
+        ranked = []
+        for entry in candidates.values():
+            base = self.alpha * max(0.0, entry["vector"]) + (1 - self.alpha) * entry["lexical"]
+            entry["score"] = round(base * self._recency(entry["timestamp"], now), 4)
+            if entry["score"] >= self.min_score:
+                ranked.append(entry)
+        ranked.sort(key=lambda e: e["score"], reverse=True)
+        return ranked[:n_results]
@@ -0,0 +1,100 @@
+import threading
+import time
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+def log_display(msg):
+    print(f"[INTENT] {msg}")
+
+
+class IntentRouter:
+    """
+    Segundo estágio do roteamento: quando nenhum gatilho casa por substring,
+    compara o comando com vetores pré-calculados de cada módulo (gatilhos +
+    metadata['description']) e despacha se a similaridade passar do limiar.
+    Usa a mesma função de embedding da VectorMemory (all-MiniLM-L6-v2).
+    """
+    def __init__(self, embed_fn, threshold: float = 0.6, margin: float = 0.05):
+        self.embed_fn = embed_fn
+        self.threshold = threshold
+        self.margin = margin        # Vantagem mínima sobre o 2º colocado
+        self.matrix = None          # (n_textos, dim) normalizado
+        self.offsets = None         # Início do bloco de cada módulo na matriz
+        self.module_list = []
+        self.version = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _module_texts(module):
+        texts = [t for t in module.triggers if t]
+        desc = getattr(module, "metadata", {}).get("description")
+        if desc:
+            texts.append(desc)
+        return texts
+
+    def _encode(self, texts):
+        vectors = np.asarray(self.embed_fn(texts), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def build(self, modules, version=None):
+        """Calcula a matriz de vetores dos módulos (uma única chamada batch ao modelo)."""
+        if not NUMPY_AVAILABLE or self.embed_fn is None:
+            return False
+
+        start = time.perf_counter()
+        module_list, offsets, texts = [], [], []
+        for module in modules:
+            mod_texts = self._module_texts(module)
+            if not mod_texts:
+                continue
+            module_list.append(module)
+            offsets.append(len(texts))
+            texts.extend(mod_texts)
+
+        if not texts:
+            return False
+
+        matrix = self._encode(texts)
+        with self._lock:
+            self.matrix = matrix
+            self.offsets = np.asarray(offsets, dtype=np.intp)
+            self.module_list = module_list
+            self.version = version
+        log_display(f"Índice de intenções: {len(module_list)} módulos, {len(texts)} frases em {(time.perf_counter() - start) * 1000:.0f}ms")
+        return True
+
+    def is_stale(self, version) -> bool:
+        return self.matrix is None or self.version != version
+
+    def score(self, command: str):
+        """Retorna [(módulo, score)] ordenado do mais provável ao menos provável."""
+        with self._lock:
+            matrix, offsets, module_list = self.matrix, self.offsets, self.module_list
+        if matrix is None:
+            return []
+
+        query = self._encode([command])[0]
+        sims = matrix @ query
+        # Score do módulo = melhor frase dele (blocos contíguos na matriz)
+        per_module = np.maximum.reduceat(sims, offsets)
+        order = np.argsort(per_module)[::-1]
+        return [(module_list[i], float(per_module[i])) for i in order]
+
+    def route(self, command: str):
+        """Retorna (módulo, score) se houver intenção confiável; senão (None, score)."""
+        ranked = self.score(command)
+        if not ranked:
+            return None, 0.0
+
+        best_module, best_score = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else -1.0
+        if best_score >= self.threshold and best_score - runner_up >= self.margin:
+            return best_module, best_score
+        return None, best_score
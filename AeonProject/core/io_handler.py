@@ -3,6 +3,7 @@ import re
 import asyncio
 import subprocess
 import random
+import queue
 import threading
 import time
 import pygame
@@ -16,6 +17,7 @@ class IOHandler:
     """
     Gerencia áudio com proteção de threads (Lock).
     """
+    LIMITE_FALA = 1000  # Caracteres falados por resposta (o resto só aparece na tela)
     def __init__(self, config: dict, installer=None):
         self.config = config if config else {}
         self.installer = installer
@@ -62,20 +64,11 @@ class IOHandler:
             log_display(f"Erro ao limpar arquivo de áudio temporário: {e}")
             log_display(f"Falha ao parar pygame.mixer: {e}")
 
-    def falar(self, texto: str):
-        if not texto: return
-        self.parar_fala = False
-        
-        # Aumentado limite para permitir explicações mais completas
-        if len(texto) > 1000:
-            texto = texto.split('\n')[0]
+    def _limpar_texto(self, texto: str) -> str:
+        return re.sub(r'[*_#`]', '', texto).replace('\n', ' ').strip()
 
-        clean_text = re.sub(r'[*_#`]', '', texto).replace('\n', ' ').strip()
-        
-        # Se o texto limpo for vazio (ex: primeira linha era só markdown), não faz nada.
-        if not clean_text:
-            return
-            
+    def _sintetizar(self, clean_text: str):
+        """Gera o arquivo de áudio (Edge-TTS, depois Piper). Retorna o caminho ou None."""
         temp_file = os.path.join(self.temp_audio_path, f"fala_{random.randint(1000, 9999)}.mp3")
 
         try:
@@ -85,8 +78,7 @@ class IOHandler:
                 com = edge_tts.Communicate(clean_text, voz)
                 await com.save(temp_file)
             asyncio.run(save_edge_tts())
-            self._tocar_audio(temp_file)
-            return
+            return temp_file
         except Exception as e:
             log_display(f"Falha no edge-tts (Sem internet?): {e}")
 
@@ -94,11 +86,13 @@ class IOHandler:
             try:
                 cmd = f'echo {clean_text} | "{self.installer.piper_exe}" --model "{self.installer.voice_model}" --output_file "{temp_file}"'
                 subprocess.run(cmd, shell=True, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-                self._tocar_audio(temp_file)
-                return
+                return temp_file
             except Exception as e:
                 log_display(f"Falha no Piper: {e}")
 
+        return None
+
+    def _falar_offline(self, clean_text: str):
         try:
             with self.audio_lock:
                 engine = pyttsx3.init()
@@ -108,6 +102,85 @@ class IOHandler:
         except Exception as e:
             log_display(f"Falha no pyttsx3: {e}")
 
+    def falar(self, texto: str):
+        if not texto: return
+        self.parar_fala = False
+        
+        # Aumentado limite para permitir explicações mais completas
+        if len(texto) > self.LIMITE_FALA:
+            texto = texto.split('\n')[0]
+
+        clean_text = self._limpar_texto(texto)
+        
+        # Se o texto limpo for vazio (ex: primeira linha era só markdown), não faz nada.
+        if not clean_text:
+            return
+
+        arquivo = self._sintetizar(clean_text)
+        if arquivo:
+            self._tocar_audio(arquivo)
+        else:
+            self._falar_offline(clean_text)
+
+    def falar_stream(self, frases):
+        """
+        Fala frases conforme chegam (ex: iter_sentences sobre pensar_stream).
+        Uma thread sintetiza a próxima frase enquanto a atual toca, então o
+        primeiro áudio sai assim que a primeira frase fica pronta.
+        Passado LIMITE_FALA, o resto do stream é consumido sem áudio (a tela
+        continua recebendo o texto); calar_boca encerra o stream na hora.
+        """
+        self.parar_fala = False
+        fila = queue.Queue(maxsize=2)
+
+        def produtor():
+            falado = 0
+            try:
+                for frase in frases:
+                    if self.parar_fala:
+                        break
+                    clean_text = self._limpar_texto(frase or "")
+                    if not clean_text or falado >= self.LIMITE_FALA:
+                        continue
+                    if falado + len(clean_text) > self.LIMITE_FALA:
+                        log_display("Resposta longa: o restante fica só no texto.")
+                        if falado:
+                            falado = self.LIMITE_FALA
+                            continue
+                        # Primeira frase já estoura o limite: fala o começo dela
+                        clean_text = clean_text[:self.LIMITE_FALA].rsplit(" ", 1)[0]
+                        falado = self.LIMITE_FALA
+                    else:
+                        falado += len(clean_text)
+                    fila.put((self._sintetizar(clean_text), clean_text))
+            except Exception as e:
+                log_display(f"Erro no stream de fala: {e}")
+            finally:
+                # Fecha já o gerador (conexão HTTP, métricas e histórico), sem esperar o GC
+                close = getattr(frases, "close", None)
+                if close:
+                    try:
+                        close()
+                    except Exception as e:
+                        log_display(f"Erro ao encerrar stream de fala: {e}")
+                fila.put(None)
+
+        threading.Thread(target=produtor, daemon=True).start()
+
+        while True:
+            item = fila.get()
+            if item is None:
+                break
+            arquivo, clean_text = item
+            if self.parar_fala:
+                if arquivo:
+                    threading.Thread(target=self._limpar_seguro, args=(arquivo,), daemon=True).start()
+                continue
+            if arquivo:
+                self._tocar_audio(arquivo)
+            else:
+                self._falar_offline(clean_text)
+
     def calar_boca(self):
         self.parar_fala = True
         try:
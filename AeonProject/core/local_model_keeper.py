@@ -0,0 +1,138 @@
+import threading
+import time
+
+
+def log_display(msg):
+    print(f"[KEEPER] {msg}")
+
+
+class LocalModelKeeper:
+    """
+    Mantém os modelos do Ollama quentes enquanto o Aeon está em uso.
+
+    - No boot, carrega os modelos em segundo plano (o 1º comando não paga o load).
+    - Enquanto houver atividade recente, renova o keep_alive com um ping vazio.
+    - Depois de 'idle_unload_s' sem atividade, descarrega (keep_alive=0) para
+      liberar RAM/VRAM; a próxima atividade recarrega em segundo plano.
+    - Modelo que falhou ao carregar (ERRO) é tentado de novo com espera
+      exponencial (error_retry_base_s, dobrando até error_retry_max_s).
+
+    Estados por modelo: FRIO, AQUECENDO, PRONTO, DESCARREGADO, ERRO.
+    """
+    COLD = "FRIO"
+    WARMING = "AQUECENDO"
+    READY = "PRONTO"
+    UNLOADED = "DESCARREGADO"
+    ERROR = "ERRO"
+
+    def __init__(self, client, models, ping_interval_s: float = 240, idle_unload_s: float = 900,
+                 on_state_change=None, error_retry_base_s: float = 30, error_retry_max_s: float = 600):
+        self.client = client                    # Módulo ollama (ou ollama.Client)
+        self.models = [m for m in dict.fromkeys(models) if m]
+        self.ping_interval_s = ping_interval_s
+        self.idle_unload_s = idle_unload_s
+        self.on_state_change = on_state_change  # Callable(dict modelo -> estado)
+        self.error_retry_base_s = error_retry_base_s
+        self.error_retry_max_s = error_retry_max_s
+
+        self.states = {m: self.COLD for m in self.models}
+        self.load_times = {}                    # modelo -> segundos do último aquecimento
+        self.failures = {}                      # modelo -> falhas seguidas ao aquecer
+        self.retry_at = {}                      # modelo -> quando tentar de novo (estado ERRO)
+        self.last_activity = time.time()
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def keep_alive_value(self) -> str:
+        """Valor de keep_alive para as chamadas normais (sobrevive até o próximo ping)."""
+        return f"{int(self.ping_interval_s * 2)}s"
+
+    # --- API usada pelo Brain ---
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._loop, name="ollama-keeper", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def touch(self):
+        """Registra atividade; se algum modelo foi descarregado (ou a espera do ERRO venceu), acorda o laço para recarregar."""
+        self.last_activity = time.time()
+        if any(s in (self.UNLOADED, self.COLD) or self._retry_due(m) for m, s in self.states.items()):
+            self._wake.set()
+
+    def _retry_due(self, model) -> bool:
+        return self.states.get(model) == self.ERROR and time.time() >= self.retry_at.get(model, 0.0)
+
+    def get_status(self) -> dict:
+        return {
+            "models": dict(self.states),
+            "idle_s": round(time.time() - self.last_activity, 1),
+            "load_times": {m: round(t, 2) for m, t in self.load_times.items()},
+        }
+
+    # --- Laço em segundo plano ---
+    def _set_state(self, model, state):
+        with self._lock:
+            if self.states.get(model) == state:
+                return
+            self.states[model] = state
+            snapshot = dict(self.states)
+        if self.on_state_change:
+            try:
+                self.on_state_change(snapshot)
+            except Exception as e:
+                log_display(f"Erro no callback de estado: {e}")
+
+    def _warm(self, model):
+        self._set_state(model, self.WARMING)
+        start = time.perf_counter()
+        try:
+            # Prompt vazio só carrega o modelo na memória, sem gerar nada
+            self.client.generate(model=model, prompt="", keep_alive=self.keep_alive_value())
+        except Exception as e:
+            failures = self.failures[model] = self.failures.get(model, 0) + 1
+            delay = min(self.error_retry_max_s, self.error_retry_base_s * 2 ** (failures - 1))
+            self.retry_at[model] = time.time() + delay
+            log_display(f"Falha ao aquecer {model}: {e}. Nova tentativa em {delay:.0f}s.")
+            self._set_state(model, self.ERROR)
+            return
+        elapsed = time.perf_counter() - start
+        self.load_times[model] = elapsed
+        self.failures.pop(model, None)
+        self.retry_at.pop(model, None)
+        if self.states.get(model) != self.READY:
+            log_display(f"{model} pronto ({elapsed:.1f}s).")
+        self._set_state(model, self.READY)
+
+    def _unload(self, model):
+        try:
+            self.client.generate(model=model, prompt="", keep_alive=0)
+        except Exception as e:
+            log_display(f"Falha ao descarregar {model}: {e}")
+            return
+        log_display(f"{model} descarregado após {self.idle_unload_s:.0f}s ocioso.")
+        self._set_state(model, self.UNLOADED)
+
+    def tick(self):
+        """Uma rodada: aquece/renova se ativo, descarrega se ocioso."""
+        idle = time.time() - self.last_activity
+        for model in self.models:
+            state = self.states.get(model)
+            if idle < self.idle_unload_s:
+                if state != self.ERROR or self._retry_due(model):
+                    self._warm(model)
+            elif state == self.READY:
+                self._unload(model)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self.tick()
+            self._wake.wait(self.ping_interval_s)
+            self._wake.clear()
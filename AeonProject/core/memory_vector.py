@@ -1,48 +1,307 @@
+import atexit
 import os
-import chromadb
-from chromadb.utils import embedding_functions
+import threading
 import uuid
 import time
+from collections import deque
+
+from core.embedding_service import EmbeddingService, get_embedding_service
+from core.hybrid_retriever import BM25Index, HybridRetriever
+
+
+def log_display(msg):
+    print(f"[VECTOR_MEM] {msg}")
+
 
 class VectorMemory:
     """
     Memória de Longo Prazo usando ChromaDB.
     Transforma conversas em vetores para busca semântica.
+
+    O modelo de embedding (torch + all-MiniLM-L6-v2) e o cliente Chroma só são
+    carregados no primeiro uso, numa thread em segundo plano: o boot não paga
+    por eles. Enquanto carregam, a busca espera até 'deadline_s' e, se não der,
+    segue sem contexto.
+
+    Gravação write-behind: store_interaction só enfileira. Uma thread junta as
+    interações (até 'batch_size' ou 'flush_interval_s'), calcula os embeddings
+    numa única chamada ao modelo e grava tudo num único collection.add.
+
+    backend: "chroma" (bagagem/vector_db) ou "numpy" (bagagem/vector_np, índice em
+    memmap do core.vector_store; migrar com 'python migrar_memoria.py').
+
+    Recuperação híbrida: os vizinhos do embedding e os melhores do BM25 (índice
+    invertido sobre as interações gravadas) são combinados pelo HybridRetriever,
+    com peso de recência e nota mínima. Pode voltar menos que n_results, ou nada.
+
+    Embeddings passam pelo EmbeddingService do processo (cache + lotes): o modelo
+    carregado aqui é registrado nele e a consulta, a gravação e o embed_fn usado
+    pelo roteador/cache de respostas reaproveitam os mesmos vetores.
     """
-    def __init__(self, storage_path):
-        self.db_path = os.path.join(storage_path, "vector_db")
+    MODEL_NAME = "all-MiniLM-L6-v2"
+    COLLECTION = "aeon_long_term_memory"
+
+    def __init__(self, storage_path, deadline_s: float = 1.5, preload: bool = False,
+                 batch_size: int = 16, flush_interval_s: float = 2.0, max_queue: int = 1000,
+                 backend: str = "chroma", quantize: bool = False, retriever: HybridRetriever = None,
+                 candidates: int = 20, embeddings: EmbeddingService = None):
+        self.backend = backend
+        self.quantize = quantize
+        self.db_path = os.path.join(storage_path, "vector_np" if backend == "numpy" else "vector_db")
+        self.deadline_s = deadline_s
+        self.client = None
+        self.collection = None
+        self.embedding_model = None     # SentenceTransformerEmbeddingFunction, quando carregado
+        self.load_error = None
+        self.load_ms = None
+        self.embeddings = embeddings or get_embedding_service()
+        self.lexical = BM25Index()
+        self.retriever = retriever or HybridRetriever()
+        self.candidates = candidates     # Candidatos por lado (vetor e BM25) antes da fusão
+
+        self._ready = threading.Event()
+        self._start_lock = threading.Lock()
+        self._thread = None
+
+        # Fila de gravação (write-behind)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval_s = flush_interval_s
+        self._queue = deque(maxlen=max_queue)   # (texto, timestamp); cheia = descarta as mais antigas
+        self._queue_cond = threading.Condition()
+        self._writer = None
+        self._in_flight = 0
+        self._flush_requested = False
+        self._closing = False
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0
+        self.last_batch_ms = None
+
+        # Função de embedding compartilhada (roteador de intenções, cache de respostas)
+        self.embed_fn = self.embed
+        if preload:
+            self.start_loading()
+
+    # --- Carga em segundo plano ---
+    def start_loading(self):
+        """Dispara a carga (uma vez só). Não bloqueia."""
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._load, name="vector-memory-load", daemon=True)
+                self._thread.start()
+
+    def _open(self):
+        """Importa e abre tudo (lento: torch, modelo e SQLite). Retorna (modelo, cliente, coleção)."""
+        if self.backend == "numpy":
+            # Sem Chroma/SQLite: vetores num memmap + log de metadados
+            from core.vector_store import NumpyVectorStore, SentenceTransformerEmbedding
+            model = SentenceTransformerEmbedding(self.MODEL_NAME)
+            model(["aquecimento"])
+            store = NumpyVectorStore(self.db_path, embedding_function=model, model_name=self.MODEL_NAME,
+                                     quantize=self.quantize)
+            return model, None, store
+
+        import chromadb
+        from chromadb.utils import embedding_functions
+
         os.makedirs(self.db_path, exist_ok=True)
-        self.client = chromadb.PersistentClient(path=self.db_path)
-        
         # Usaremos um modelo de embedding leve que roda localmente
         # Nota: Requer 'pip install sentence-transformers'
-        self.embed_fn = embedding_functions.SentenceTransformerEmbeddingFunction(
-            model_name="all-MiniLM-L6-v2"
-        )
-        
-        self.collection = self.client.get_or_create_collection(
-            name="aeon_long_term_memory",
-            embedding_function=self.embed_fn
-        )
+        model = embedding_functions.SentenceTransformerEmbeddingFunction(model_name=self.MODEL_NAME)
+        model(["aquecimento"])  # Garante os pesos na memória antes da primeira busca real
+        client = chromadb.PersistentClient(path=self.db_path)
+        collection = client.get_or_create_collection(name=self.COLLECTION, embedding_function=model)
+        return model, client, collection
+
+    def _load(self):
+        start = time.perf_counter()
+        try:
+            self.embedding_model, self.client, self.collection = self._open()
+            self.embeddings.set_model(self.embedding_model, self.MODEL_NAME)
+            self._load_lexical()
+            self.load_ms = (time.perf_counter() - start) * 1000
+            log_display(f"Memória de longo prazo pronta em {self.load_ms:.0f}ms.")
+        except Exception as e:
+            self.load_error = e
+            log_display(f"Memória de longo prazo indisponível: {e}")
+        finally:
+            self._ready.set()
+
+    def _load_lexical(self):
+        """Índice BM25 com o que já está gravado (lido uma vez, na carga em segundo plano)."""
+        try:
+            stored = self.collection.get(include=["documents", "metadatas"])
+            self.lexical.add(stored["ids"], stored["documents"], stored.get("metadatas"))
+        except Exception as e:
+            log_display(f"Índice léxico indisponível, busca só vetorial: {e}")
+
+    def wait_ready(self, timeout: float = None) -> bool:
+        """Dispara a carga se preciso e espera até 'timeout'. True se a memória está utilizável."""
+        if not self._ready.is_set():
+            self.start_loading()
+            self._ready.wait(timeout)
+        return self.is_ready
+
+    @property
+    def is_ready(self) -> bool:
+        return self._ready.is_set() and self.load_error is None
+
+    def get_status(self) -> dict:
+        if self._thread is None:
+            state = "nao_iniciada"
+        elif not self._ready.is_set():
+            state = "carregando"
+        else:
+            state = "erro" if self.load_error else "pronta"
+        return {
+            "state": state,
+            "load_ms": self.load_ms,
+            "queue_depth": self.queue_depth,
+            "written": self.written,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "last_batch_ms": self.last_batch_ms,
+            "lexical_docs": len(self.lexical),
+        }
+
+    @property
+    def queue_depth(self) -> int:
+        """Interações ainda não gravadas (na fila + no lote em gravação)."""
+        with self._queue_cond:
+            return len(self._queue) + self._in_flight
+
+    # --- API ---
+    def embed(self, input):
+        """Embeddings (interface das embedding functions do Chroma). Falha se o modelo não carregar a tempo."""
+        if not self.wait_ready(self.deadline_s):
+            raise RuntimeError(f"modelo de embedding indisponível: {self.load_error or 'ainda carregando'}")
+        return self.embeddings.encode(input).tolist()
 
     def store_interaction(self, user_input, aeon_response):
-        """Guarda uma interação no banco vetorial."""
+        """Enfileira uma interação para o banco vetorial (não espera embedding nem disco)."""
         text_to_embed = f"Usuário: {user_input} | Aeon: {aeon_response}"
-        self.collection.add(
-            documents=[text_to_embed],
-            ids=[str(uuid.uuid4())],
-            metadatas=[{"timestamp": time.time()}]
-        )
+        with self._queue_cond:
+            if self._closing:
+                return
+            if len(self._queue) == self._queue.maxlen:
+                self.dropped += 1
+            self._queue.append((text_to_embed, time.time()))
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="vector-memory-writer", daemon=True)
+                self._writer.start()
+                atexit.register(self.close)  # Grava o que ficou na fila ao sair
+            self._queue_cond.notify_all()
 
-    def retrieve_relevant(self, query, n_results=3):
-        """Busca as memórias mais parecidas com a pergunta atual."""
+    def _write_loop(self):
+        while True:
+            with self._queue_cond:
+                while not self._queue and not self._closing:
+                    self._queue_cond.wait()
+                if not self._queue:
+                    return
+                # Espera um pouco para juntar um lote (a não ser que peçam flush/close)
+                deadline = time.monotonic() + self.flush_interval_s
+                while (len(self._queue) < self.batch_size and not self._closing and not self._flush_requested):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._queue_cond.wait(remaining)
+                batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+                self._in_flight = len(batch)
+            try:
+                self._write_batch(batch)
+            finally:
+                with self._queue_cond:
+                    self._in_flight = 0
+                    if not self._queue:
+                        self._flush_requested = False
+                    self._queue_cond.notify_all()
+
+    def _write_batch(self, batch):
+        """Um lote: uma chamada ao modelo para todos os textos e um único collection.add."""
+        if not self.wait_ready(None):
+            self.dropped += len(batch)
+            log_display(f"{len(batch)} interação(ões) descartada(s): memória indisponível.")
+            return
+        start = time.perf_counter()
+        documents = [text for text, _ in batch]
+        ids = [str(uuid.uuid4()) for _ in batch]
+        metadatas = [{"timestamp": ts} for _, ts in batch]
         try:
-            results = self.collection.query(
-                query_texts=[query],
-                n_results=n_results
+            embeddings = self.embeddings.encode(documents).tolist()
+            self.collection.add(
+                documents=documents,
+                embeddings=embeddings,
+                ids=ids,
+                metadatas=metadatas
             )
-            if results and results['documents'] and results['documents'][0]:
-                return "\n---\n".join(results['documents'][0])
+            self.lexical.add(ids, documents, metadatas)
+            self.written += len(batch)
+            self.batches += 1
+            self.last_batch_ms = round((time.perf_counter() - start) * 1000, 1)
         except Exception as e:
-            print(f"[VECTOR_MEM] Erro na busca: {e}")
-        return ""
\ No newline at end of file
+            self.dropped += len(batch)
+            log_display(f"Erro ao gravar {len(batch)} interação(ões): {e}")
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Grava já o que está na fila e espera terminar. True se a fila esvaziou."""
+        end = time.monotonic() + timeout
+        with self._queue_cond:
+            if self._writer is None:
+                return True
+            self._flush_requested = True
+            self._queue_cond.notify_all()
+            while self._queue or self._in_flight:
+                remaining = end - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._queue_cond.wait(remaining)
+        return True
+
+    def close(self, timeout: float = 10.0):
+        """Encerramento: grava a fila inteira e para a thread de gravação."""
+        with self._queue_cond:
+            if self._closing:
+                return
+            self._closing = True
+            self._queue_cond.notify_all()
+            writer = self._writer
+        if writer is not None:
+            writer.join(timeout)
+            if self.queue_depth:
+                log_display(f"{self.queue_depth} interação(ões) não gravada(s) ao encerrar.")
+
+    def _similarity(self, distance) -> float:
+        """Distância do backend -> cosseno. Chroma usa L2² (vetores unitários: 2 - 2cos); o numpy, 1 - cos."""
+        if self.backend == "numpy":
+            return 1.0 - distance
+        return 1.0 - distance / 2.0
+
+    def _vector_hits(self, query):
+        results = self.collection.query(query_embeddings=self.embed([query]), n_results=self.candidates)
+        if not results or not results.get('documents') or not results['documents'][0]:
+            return []
+        documents = results['documents'][0]
+        ids = (results.get('ids') or [None])[0] or documents
+        metadatas = (results.get('metadatas') or [None])[0] or [None] * len(documents)
+        distances = (results.get('distances') or [None])[0] or [None] * len(documents)
+        return [(doc_id, doc, (meta or {}).get("timestamp"), self._similarity(dist) if dist is not None else 0.0)
+                for doc_id, doc, meta, dist in zip(ids, documents, metadatas, distances)]
+
+    def search(self, query, n_results=3):
+        """Memórias relevantes já pontuadas: [{id, document, score, vector, lexical, timestamp}]."""
+        if not self.wait_ready(self.deadline_s):
+            if self.load_error is None:
+                log_display("Memória ainda carregando; seguindo sem contexto de longo prazo.")
+            return []
+        try:
+            vector_hits = self._vector_hits(query)
+        except Exception as e:
+            log_display(f"Erro na busca: {e}")
+            vector_hits = []
+        lexical_hits = self.lexical.search(query, self.candidates)
+        return self.retriever.rank(vector_hits, lexical_hits, n_results)
+
+    def retrieve_relevant(self, query, n_results=3):
+        """Busca as memórias mais relevantes para a pergunta atual (vazio se nenhuma passar da nota mínima)."""
+        return "\n---\n".join(hit["document"] for hit in self.search(query, n_results))
@@ -0,0 +1,395 @@
+import contextvars
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def log_display(msg):
+    print(f"[METRICS] {msg}")
+
+
+# Pedido em andamento na thread/tarefa atual. O BrainScheduler copia o contexto
+# para o worker e o asyncio para as tarefas, então o Brain anota o backend,
+# tokens e fallback sem passar o objeto por todas as funções.
+_current = contextvars.ContextVar("aeon_llm_request", default=None)
+
+
+def current_request():
+    """RequestMetrics do pedido em andamento (ou None fora de um pedido medido)."""
+    return _current.get()
+
+
+def classify_error(error) -> str:
+    """Motivo curto de uma falha da nuvem (vira label, então poucos valores)."""
+    msg = str(error).lower()
+    name = type(error).__name__.lower()
+    if "429" in msg or "rate limit" in msg or "ratelimit" in name:
+        return "rate_limit"
+    if "401" in msg or "403" in msg or "authentication" in name or "permission" in name:
+        return "auth"
+    if "timeout" in msg or "timed out" in msg or "timeout" in name:
+        return "timeout"
+    if "connection" in msg or "connect" in name:
+        return "conexao"
+    if any(code in msg for code in ("500", "502", "503", "504")) or "internalserver" in name:
+        return "servidor"
+    return "erro"
+
+
+def _percentile(ordered, pct):
+    if not ordered:
+        return None
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct))], 1)
+
+
+class RequestMetrics:
+    """Um pedido ao Brain: quem respondeu, quanto custou e quanto demorou."""
+    def __init__(self, kind: str, origem: str = ""):
+        self.kind = kind                # texto | stream | visao | traducao
+        self.origem = origem
+        self.backend = "nenhum"         # groq | ollama | cache | nenhum
+        self.model = ""
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.tokens_estimated = False
+        self.ttft_ms = None
+        self.queue_ms = 0.0
+        self.latency_ms = None
+        self.fallback = None            # Por que a nuvem não respondeu (None = não houve)
+        self.failures = []              # Tentativas que falharam antes (ou no lugar) da resposta: (backend, modelo, motivo)
+        self.cache = "off"              # hit | miss | bypass | off
+        self.ok = None
+        self.timestamp = time.time()
+        self._start = time.perf_counter()
+        self._service_start = self._start
+
+    def dequeued(self):
+        """Saiu da fila do scheduler: o que vem depois é tempo de serviço."""
+        now = time.perf_counter()
+        self.queue_ms = (now - self._start) * 1000
+        self._service_start = now
+
+    def set_backend(self, backend: str, model: str = ""):
+        self.backend = backend
+        self.model = model or ""
+
+    def first_token(self):
+        if self.ttft_ms is None:
+            self.ttft_ms = (time.perf_counter() - self._service_start) * 1000
+
+    def set_usage(self, prompt_tokens, completion_tokens, estimated: bool = False):
+        self.prompt_tokens = int(prompt_tokens or 0)
+        self.completion_tokens = int(completion_tokens or 0)
+        self.tokens_estimated = estimated
+
+    def add_failure(self, backend: str, model: str, reason: str):
+        """Uma chamada a 'backend'/'model' falhou (conta como pedido com erro daquele backend)."""
+        self.failures.append((backend, model or "", reason))
+
+    def set_fallback(self, reason: str):
+        if self.fallback is None:           # Guarda o primeiro motivo
+            self.fallback = reason
+
+    def finish(self, ok: bool = None):
+        if self.ok is None:
+            self.ok = bool(ok) if ok is not None else True
+        self.latency_ms = (time.perf_counter() - self._start) * 1000
+
+    @property
+    def service_ms(self) -> float:
+        return max(0.0, (self.latency_ms or 0.0) - self.queue_ms)
+
+    def as_dict(self) -> dict:
+        return {
+            "kind": self.kind,
+            "origem": self.origem,
+            "backend": self.backend,
+            "model": self.model,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "tokens_estimated": self.tokens_estimated,
+            "ttft_ms": round(self.ttft_ms, 1) if self.ttft_ms is not None else None,
+            "queue_ms": round(self.queue_ms, 1),
+            "latency_ms": round(self.latency_ms, 1) if self.latency_ms is not None else None,
+            "fallback": self.fallback,
+            "failures": [{"backend": b, "model": m, "reason": r} for b, m, r in self.failures],
+            "cache": self.cache,
+            "ok": self.ok,
+            "timestamp": self.timestamp,
+        }
+
+
+class MetricsRegistry:
+    """
+    Registro em memória dos pedidos ao Brain.
+    - Contadores acumulados (pedidos, erros, tokens, fallbacks, cache) por backend/modelo
+    - Janela com os últimos 'window' pedidos para latência/TTFT (p50/p95)
+    - Coletores: funções que devolvem dicts numéricos (fila do scheduler, caches)
+    - prometheus_text() / serve(): exposição opcional no formato texto do Prometheus
+    """
+    def __init__(self, window: int = 500):
+        self.recent_requests = deque(maxlen=window)
+        self.requests = defaultdict(int)            # (kind, backend, model, ok) -> n
+        self.failures = defaultdict(int)            # (kind, backend, model, motivo) -> tentativas que falharam
+        self.tokens = defaultdict(int)              # (backend, model, tipo) -> n
+        self.latency_sum = defaultdict(float)       # (backend, model) -> segundos de serviço
+        self.latency_count = defaultdict(int)
+        self.fallbacks = defaultdict(int)           # motivo -> n
+        self.cache = defaultdict(int)               # status -> n
+        self.collectors = {}
+        self._lock = threading.Lock()
+        self._server = None
+
+    # --- Medição ---
+    def begin(self, kind: str, origem: str = "") -> RequestMetrics:
+        return RequestMetrics(kind, origem)
+
+    def finish(self, request: RequestMetrics, ok: bool = None):
+        request.finish(ok)
+        self.record(request)
+
+    @contextmanager
+    def track(self, kind: str, origem: str = "", reuse: bool = False):
+        """
+        Mede o bloco como um pedido. Com reuse=True, um pedido já em andamento
+        (aberto por quem chamou) é reaproveitado em vez de abrir outro.
+        """
+        active = _current.get()
+        if reuse and active is not None:
+            yield active
+            return
+        request = self.begin(kind, origem)
+        token = _current.set(request)
+        try:
+            yield request
+        except BaseException:
+            request.ok = False
+            raise
+        finally:
+            _current.reset(token)
+            self.finish(request)
+
+    @staticmethod
+    @contextmanager
+    def bind(request: RequestMetrics):
+        """Torna 'request' o pedido atual (ex: dentro de uma corrotina no loop do runtime)."""
+        token = _current.set(request)
+        try:
+            yield request
+        finally:
+            _current.reset(token)
+
+    def record(self, request: RequestMetrics):
+        backend, model = request.backend, request.model
+        with self._lock:
+            self.recent_requests.append(request.as_dict())
+            self.requests[(request.kind, backend, model, bool(request.ok))] += 1
+            self.cache[request.cache] += 1
+            if request.fallback:
+                self.fallbacks[request.fallback] += 1
+            for failed_backend, failed_model, reason in request.failures:
+                self.failures[(request.kind, failed_backend, failed_model, reason)] += 1
+            if backend in ("nenhum", "cache"):
+                return
+            self.tokens[(backend, model, "prompt")] += request.prompt_tokens
+            self.tokens[(backend, model, "completion")] += request.completion_tokens
+            self.latency_sum[(backend, model)] += request.service_ms / 1000
+            self.latency_count[(backend, model)] += 1
+
+    def add_collector(self, name: str, fn):
+        """fn() -> dict (valores numéricos viram gauges 'aeon_<name>_<chave>')."""
+        self.collectors[name] = fn
+
+    # --- Leitura ---
+    def recent(self, limit: int = 20) -> list:
+        with self._lock:
+            return list(self.recent_requests)[-limit:]
+
+    def summary(self) -> dict:
+        """Resumo por backend/modelo (latência de serviço, TTFT, tokens) + fallbacks e cache."""
+        with self._lock:
+            window = list(self.recent_requests)
+            requests = dict(self.requests)
+            failures = dict(self.failures)
+            tokens = dict(self.tokens)
+            fallbacks = dict(self.fallbacks)
+            cache = dict(self.cache)
+
+        backends = {}
+        for (kind, backend, model, ok), count in requests.items():
+            key = f"{backend}:{model}" if model else backend
+            entry = backends.setdefault(key, {"requests": 0, "errors": 0, "prompt_tokens": 0, "completion_tokens": 0})
+            entry["requests"] += count
+            entry["errors"] += 0 if ok else count
+        # Tentativas que falharam e caíram para outro backend: chamadas com erro do backend que falhou
+        for (kind, backend, model, reason), count in failures.items():
+            key = f"{backend}:{model}" if model else backend
+            entry = backends.setdefault(key, {"requests": 0, "errors": 0, "prompt_tokens": 0, "completion_tokens": 0})
+            entry["requests"] += count
+            entry["errors"] += count
+        for (backend, model, kind), count in tokens.items():
+            key = f"{backend}:{model}" if model else backend
+            backends.setdefault(key, {"requests": 0, "errors": 0, "prompt_tokens": 0, "completion_tokens": 0})
+            backends[key][f"{kind}_tokens"] += count
+
+        samples = defaultdict(lambda: {"latency": [], "ttft": []})
+        for r in window:
+            key = f"{r['backend']}:{r['model']}" if r["model"] else r["backend"]
+            if r["latency_ms"] is not None:
+                samples[key]["latency"].append(r["latency_ms"] - r["queue_ms"])
+            if r["ttft_ms"] is not None:
+                samples[key]["ttft"].append(r["ttft_ms"])
+        for key, s in samples.items():
+            if key not in backends:
+                continue
+            latency, ttft = sorted(s["latency"]), sorted(s["ttft"])
+            backends[key].update({
+                "latency_p50_ms": _percentile(latency, 0.5),
+                "latency_p95_ms": _percentile(latency, 0.95),
+                "ttft_p50_ms": _percentile(ttft, 0.5),
+                "ttft_p95_ms": _percentile(ttft, 0.95),
+            })
+        return {"backends": backends, "fallbacks": fallbacks, "cache": cache}
+
+    def collect(self) -> dict:
+        result = {}
+        for name, fn in list(self.collectors.items()):
+            try:
+                result[name] = fn() or {}
+            except Exception as e:
+                log_display(f"Coletor '{name}' falhou: {e}")
+        return result
+
+    # --- Prometheus ---
+    @staticmethod
+    def _labels(**labels) -> str:
+        parts = []
+        for k, v in labels.items():
+            value = str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+            parts.append(f'{k}="{value}"')
+        return "{" + ",".join(parts) + "}"
+
+    def prometheus_text(self) -> str:
+        lines = []
+        with self._lock:
+            requests = dict(self.requests)
+            failures = dict(self.failures)
+            tokens = dict(self.tokens)
+            latency_sum = dict(self.latency_sum)
+            latency_count = dict(self.latency_count)
+            fallbacks = dict(self.fallbacks)
+            cache = dict(self.cache)
+            window = list(self.recent_requests)
+
+        lines += ["# HELP aeon_llm_requests_total Pedidos ao Brain.", "# TYPE aeon_llm_requests_total counter"]
+        for (kind, backend, model, ok), n in sorted(requests.items()):
+            status = "ok" if ok else "erro"
+            lines.append(f"aeon_llm_requests_total{self._labels(kind=kind, backend=backend, model=model, status=status)} {n}")
+
+        lines += ["# HELP aeon_llm_backend_errors_total Chamadas a um backend que falharam (inclusive as que caíram para outro).",
+                  "# TYPE aeon_llm_backend_errors_total counter"]
+        for (kind, backend, model, reason), n in sorted(failures.items()):
+            lines.append(f"aeon_llm_backend_errors_total{self._labels(kind=kind, backend=backend, model=model, reason=reason)} {n}")
+
+        lines += ["# HELP aeon_llm_tokens_total Tokens enviados/recebidos.", "# TYPE aeon_llm_tokens_total counter"]
+        for (backend, model, kind), n in sorted(tokens.items()):
+            lines.append(f"aeon_llm_tokens_total{self._labels(backend=backend, model=model, type=kind)} {n}")
+
+        lines += ["# HELP aeon_llm_latency_seconds Tempo de serviço (sem a fila), quantis da janela recente.",
+                  "# TYPE aeon_llm_latency_seconds summary"]
+        samples = defaultdict(lambda: {"latency": [], "ttft": []})
+        for r in window:
+            if r["latency_ms"] is None or r["backend"] in ("nenhum", "cache"):
+                continue
+            samples[(r["backend"], r["model"])]["latency"].append((r["latency_ms"] - r["queue_ms"]) / 1000)
+            if r["ttft_ms"] is not None:
+                samples[(r["backend"], r["model"])]["ttft"].append(r["ttft_ms"] / 1000)
+        for key in sorted(latency_count):
+            backend, model = key
+            ordered = sorted(samples[key]["latency"])
+            for q in (0.5, 0.95):
+                if ordered:
+                    value = ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+                    lines.append(f"aeon_llm_latency_seconds{self._labels(backend=backend, model=model, quantile=q)} {value:.4f}")
+            lines.append(f"aeon_llm_latency_seconds_sum{self._labels(backend=backend, model=model)} {latency_sum[key]:.4f}")
+            lines.append(f"aeon_llm_latency_seconds_count{self._labels(backend=backend, model=model)} {latency_count[key]}")
+
+        lines += ["# HELP aeon_llm_ttft_seconds Tempo até o primeiro token (streams), janela recente.",
+                  "# TYPE aeon_llm_ttft_seconds gauge"]
+        for (backend, model), s in sorted(samples.items()):
+            ordered = sorted(s["ttft"])
+            for q in (0.5, 0.95):
+                if ordered:
+                    value = ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+                    lines.append(f"aeon_llm_ttft_seconds{self._labels(backend=backend, model=model, quantile=q)} {value:.4f}")
+
+        lines += ["# HELP aeon_llm_fallbacks_total Pedidos em que a nuvem não respondeu.", "# TYPE aeon_llm_fallbacks_total counter"]
+        for reason, n in sorted(fallbacks.items()):
+            lines.append(f"aeon_llm_fallbacks_total{self._labels(reason=reason)} {n}")
+
+        lines += ["# HELP aeon_llm_cache_total Consultas ao cache de respostas.", "# TYPE aeon_llm_cache_total counter"]
+        for status, n in sorted(cache.items()):
+            lines.append(f"aeon_llm_cache_total{self._labels(status=status)} {n}")
+
+        for name, data in self.collect().items():
+            for key, value in self._flatten(data):
+                metric = f"aeon_{name}_{key}".replace("-", "_").replace(".", "_").replace(":", "_")
+                lines.append(f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+    @classmethod
+    def _flatten(cls, data: dict, prefix: str = ""):
+        for key, value in data.items():
+            name = f"{prefix}{key}"
+            if isinstance(value, bool):
+                yield name, int(value)
+            elif isinstance(value, (int, float)):
+                yield name, value
+            elif isinstance(value, dict):
+                yield from cls._flatten(value, f"{name}_")
+
+    def serve(self, port: int, host: str = "127.0.0.1"):
+        """Sobe /metrics (Prometheus) e /metrics.json numa thread. Retorna a porta."""
+        if self._server:
+            return self._server.server_address[1]
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split("?")[0]
+                if path == "/metrics":
+                    body, ctype = registry.prometheus_text().encode("utf-8"), "text/plain; version=0.0.4"
+                elif path == "/metrics.json":
+                    payload = dict(registry.summary(), collectors=registry.collect(), recent=registry.recent(50))
+                    body, ctype = json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json"
+                else:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, fmt, *args):
+                pass
+
+        try:
+            self._server = ThreadingHTTPServer((host, port), Handler)
+        except OSError as e:
+            log_display(f"Endpoint de métricas indisponível na porta {port}: {e}")
+            return None
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="aeon-metrics", daemon=True).start()
+        log_display(f"Métricas em http://{host}:{self._server.server_address[1]}/metrics")
+        return self._server.server_address[1]
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
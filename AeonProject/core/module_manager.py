@@ -1,11 +1,19 @@
 import importlib
 import inspect
+import os
 import sys
 import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from modules.base_module import AeonModule
 from core.memory_vector import VectorMemory
+from core.hybrid_retriever import HybridRetriever
+from core.embedding_service import get_embedding_service
+from core.trigger_matcher import TriggerMap, TriggerMatcher
+from core.module_manifest import ModuleManifest, LazyModule
+from core.intent_router import IntentRouter
 
 def log_display(msg):
     print(f"[MOD_MANAGER] {msg}")
@@ -18,9 +26,18 @@ class ModuleManager:
     def __init__(self, core_context):
         self.core_context = core_context
         self.modules = []
-        self.trigger_map = {}
+        self.trigger_matcher = TriggerMatcher()
+        self.matcher_lock = threading.Lock()
+        self.trigger_map = TriggerMap()
         self.module_map = {}
         self.failed_modules = []
+        self.load_lock = threading.RLock()
+        self.load_timings = {}
+        self.module_sources = {}   # "modules.pkg.x_mod" -> instância (ou LazyModule)
+        self.module_mtimes = {}    # "modules.pkg.x_mod" -> mtime do arquivo carregado
+        self.modules_dir = Path(__file__).resolve().parent.parent / "modules"
+        self.fleet_version = 0     # Muda quando módulos entram/saem (não ao materializar)
+        self._capabilities_cache = None
         
         self.focused_module = None
         self.focus_timeout = None
@@ -30,62 +47,455 @@ class ModuleManager:
         self.max_history = 10
         self.history_lock = threading.Lock()
         
-        # Inicializa Memória Vetorial
+        # Inicializa Memória Vetorial e o manifesto de módulos (carga preguiçosa)
+        # O modelo de embedding e o Chroma só abrem no primeiro uso, em segundo plano
         self.vector_memory = None
+        self.embeddings = None
+        self.manifest = None
         config_mgr = self.core_context.get("config_manager")
         if config_mgr:
-            self.vector_memory = VectorMemory(str(config_mgr.storage_path))
+            # Embeddings compartilhados pelo processo (memória, roteador, cache de respostas)
+            self.embeddings = get_embedding_service(
+                max_entries=int(self._config_option("embedding_cache_size", 5000)),
+                max_batch=int(self._config_option("embedding_max_batch", 64)),
+                batch_window_ms=float(self._config_option("embedding_batch_window_ms", 0.0)),
+                cache_path=(config_mgr.storage_path / "embedding_cache.npz"
+                            if self._config_option("embedding_cache_persist", False) else None),
+            )
+            self.vector_memory = VectorMemory(
+                str(config_mgr.storage_path),
+                deadline_s=float(self._config_option("vector_memory_deadline_s", 1.5)),
+                preload=bool(self._config_option("vector_memory_preload", False)),
+                batch_size=int(self._config_option("vector_memory_batch_size", 16)),
+                flush_interval_s=float(self._config_option("vector_memory_flush_s", 2.0)),
+                backend=str(self._config_option("vector_backend", "chroma")),
+                quantize=bool(self._config_option("vector_quantize", False)),
+                retriever=HybridRetriever(
+                    alpha=float(self._config_option("memory_hybrid_alpha", 0.6)),
+                    min_score=float(self._config_option("memory_min_score", 0.3)),
+                    recency_weight=float(self._config_option("memory_recency_weight", 0.2)),
+                    half_life_days=float(self._config_option("memory_recency_half_life_days", 30.0)),
+                ),
+                embeddings=self.embeddings,
+            )
+            self.manifest = ModuleManifest(config_mgr.storage_path)
 
-    def load_modules(self):
-        """Escaneia /modules e carrega tudo."""
-        # CORREÇÃO: Usa resolve() para caminho absoluto
-        modules_dir = Path(__file__).resolve().parent.parent / "modules"
-        log_display(f"Carregando módulos de: {modules_dir}")
+        # Roteador semântico (opcional): 2º estágio quando nenhum gatilho casa
+        self.intent_router = None
+        self.intent_lock = threading.Lock()
+        if self.vector_memory and self._config_option("intent_router", False):
+            self.intent_router = IntentRouter(
+                self.vector_memory.embed_fn,
+                threshold=float(self._config_option("intent_router_threshold", 0.6)),
+            )
+
+        # Busca semântica no cache de respostas reaproveita o mesmo modelo de embedding
+        brain = self.core_context.get("brain")
+        cache = getattr(brain, "response_cache", None)
+        if cache and self.vector_memory and self._config_option("response_cache_semantic", False):
+            cache.embed_fn = self.vector_memory.embed_fn
+
+        # Cache de visão usa 'vision_last_result' do contexto como caminho rápido
+        vision_cache = getattr(brain, "vision_cache", None)
+        if vision_cache is not None:
+            vision_cache.context = self.core_context.get("context")
+
+        # Fila de gravação da memória aparece junto das métricas do Brain
+        metrics = getattr(brain, "metrics", None)
+        if hasattr(metrics, "add_collector"):
+            if self.vector_memory:
+                metrics.add_collector("vector_memory", self.vector_memory.get_status)
+            if self.embeddings:
+                metrics.add_collector("embeddings", self.embeddings.get_stats)
+
+    @property
+    def trigger_map(self):
+        return self._trigger_map
+
+    @trigger_map.setter
+    def trigger_map(self, value):
+        # Qualquer dict atribuído (ex: scan_new_modules, testes) vira TriggerMap
+        self._trigger_map = value if isinstance(value, TriggerMap) else TriggerMap(value)
+        self._matcher_version = -1
 
-        for item in modules_dir.iterdir():
+    def _sync_matcher(self):
+        """Mantém o autômato alinhado ao trigger_map (chamar com matcher_lock)."""
+        tmap = self._trigger_map
+        if self._matcher_version == tmap.version:
+            return self.trigger_matcher
+
+        if self._matcher_version == -1 or tmap.reset:
+            # Mapa novo: reconstrói a partir da ordem atual do dict
+            self.trigger_matcher = TriggerMatcher(tmap.keys())
+        else:
+            # Hot reload: aplica só os gatilhos que entraram/saíram
+            for op, trigger in tmap.ops:
+                if op == "add":
+                    self.trigger_matcher.add(trigger)
+                else:
+                    self.trigger_matcher.remove(trigger)
+            if self.trigger_matcher.tombstones > max(64, len(self.trigger_matcher)):
+                self.trigger_matcher = TriggerMatcher(tmap.keys())
+
+        self.trigger_matcher.compile()
+        tmap.mark_synced()
+        self._matcher_version = tmap.version
+        return self.trigger_matcher
+
+    def match_trigger(self, command_lower: str):
+        """Retorna o gatilho vencedor para o comando (ou None)."""
+        with self.matcher_lock:
+            return self._sync_matcher().longest_match(command_lower)
+
+    def _discover_module_files(self):
+        """Lista (nome_do_módulo, caminho) de todos os *_mod.py em /modules."""
+        found = []
+        for item in sorted(self.modules_dir.iterdir()):
             if item.is_dir() and item.name != "__pycache__":
-                try:
-                    for mod_file in item.glob("*_mod.py"):
-                        module_name = f"modules.{item.name}.{mod_file.stem}"
-                        self._import_and_register(module_name)
-                except Exception as e:
-                    log_display(f"  ✗ Erro ao carregar '{item.name}': {e}")
+                for mod_file in sorted(item.glob("*_mod.py")):
+                    found.append((f"modules.{item.name}.{mod_file.stem}", mod_file))
+        return found
+
+    def _lazy_enabled(self) -> bool:
+        config_mgr = self.core_context.get("config_manager")
+        if self.manifest is None or not config_mgr:
+            return False
+        return bool(config_mgr.get_system_data("lazy_modules", True))
+
+    def shutdown(self):
+        """Encerramento: grava as interações que ainda estão na fila da memória de longo prazo."""
+        if self.vector_memory:
+            self.vector_memory.close()
+        if self.embeddings:
+            self.embeddings.close()
+
+    def _config_option(self, key, default):
+        config_mgr = self.core_context.get("config_manager")
+        if not config_mgr:
+            return default
+        return config_mgr.get_system_data(key, default)
+
+    def load_modules(self, parallel=None):
+        """
+        Escaneia /modules e registra tudo.
+        Com 'lazy_modules' ativo, módulos com entrada válida no manifesto entram
+        só com os gatilhos (LazyModule) e são importados no primeiro uso.
+        Com 'parallel_boot' ativo, os demais são importados/instanciados num
+        pool de threads; o registro continua na ordem de descoberta.
+        """
+        # CORREÇÃO: Usa resolve() para caminho absoluto
+        log_display(f"Carregando módulos de: {self.modules_dir}")
+        lazy = self._lazy_enabled()
+        if parallel is None:
+            parallel = bool(self._config_option("parallel_boot", False))
+        discovered = self._discover_module_files()
+        deferred = 0
+        eager = []
+        boot_start = time.perf_counter()
+
+        for module_name, mod_file in discovered:
+            entry = self.manifest.get_valid(module_name, mod_file) if lazy else None
+            if entry:
+                self._register(LazyModule(self.core_context, module_name, entry), module_name, entry.get("mtime"))
+                deferred += 1
+            else:
+                eager.append((module_name, mod_file))
+
+        if parallel and len(eager) > 1:
+            workers = int(self._config_option("boot_workers", min(8, (os.cpu_count() or 2) + 2)))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="aeon-boot") as pool:
+                futures = [pool.submit(self._build_instance, name) for name, _ in eager]
+                # Resultados consumidos na ordem de descoberta: registro determinístico
+                for (module_name, mod_file), future in zip(eager, futures):
+                    try:
+                        instance, timings = future.result()
+                        self._finish_registration(module_name, mod_file, instance, timings)
+                    except Exception as e:
+                        log_display(f"Erro importando {module_name}: {e}")
+        else:
+            for module_name, mod_file in eager:
+                self._import_and_register(module_name, mod_file)
 
-        log_display(f"Módulos carregados: {len(self.modules)}")
+        if self.manifest is not None:
+            self.manifest.prune(name for name, _ in discovered)
+            self.manifest.save()
 
-    def _import_and_register(self, module_name):
+        with self.matcher_lock:
+            self._sync_matcher()
+        log_display(f"Módulos carregados: {len(self.modules)} ({deferred} sob demanda) em {time.perf_counter() - boot_start:.2f}s")
+        self._log_boot_timings()
+
+    def _log_boot_timings(self, top=5):
+        """Mostra os módulos que mais pesaram no boot."""
+        if not self.load_timings:
+            return
+        ranked = sorted(self.load_timings.items(), key=lambda kv: sum(kv[1].values()), reverse=True)
+        for module_name, t in ranked[:top]:
+            log_display(f"  ⏱ {module_name}: import {t.get('import', 0):.3f}s | init {t.get('init', 0):.3f}s | on_load {t.get('on_load', 0):.3f}s")
+
+    def get_boot_timings(self) -> dict:
+        """Tempos por módulo (segundos): import, init (construtor) e on_load."""
+        return {name: dict(t) for name, t in self.load_timings.items()}
+
+    def _instantiate(self, module_import, class_name=None):
+        """Encontra a subclasse de AeonModule no módulo importado e a instancia."""
+        if class_name:
+            cls = getattr(module_import, class_name, None)
+            if inspect.isclass(cls) and issubclass(cls, AeonModule):
+                return cls(self.core_context)
+
+        for name, obj in inspect.getmembers(module_import):
+            if inspect.isclass(obj) and issubclass(obj, AeonModule) and obj is not AeonModule and obj is not LazyModule:
+                return obj(self.core_context)
+        return None
+
+    def _register(self, module_instance, module_name=None, mtime=None):
+        """Adiciona a instância às estruturas de roteamento."""
+        with self.load_lock:
+            if module_name:
+                self.module_sources[module_name] = module_instance
+                self.module_mtimes[module_name] = mtime
+            self.fleet_version += 1
+            self.modules.append(module_instance)
+            self.module_map[module_instance.name.lower()] = module_instance
+            for trigger in module_instance.triggers:
+                self.trigger_map[trigger.lower()] = module_instance
+
+    def _build_instance(self, module_name):
+        """Importa o módulo e instancia sua classe (seguro para rodar em thread)."""
+        timings = {}
+        start = time.perf_counter()
+        if module_name in sys.modules:
+            module_import = importlib.reload(sys.modules[module_name])
+            log_display(f"  ↻ Módulo '{module_name}' recarregado (Hot Reload).")
+        else:
+            module_import = importlib.import_module(module_name)
+        timings["import"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        module_instance = self._instantiate(module_import)
+        timings["init"] = time.perf_counter() - start
+        return module_instance, timings
+
+    def _finish_registration(self, module_name, mod_file, module_instance, timings):
+        """Valida dependências, roda on_load e registra (sempre na thread do boot)."""
+        self.load_timings[module_name] = timings
+        if module_instance is None:
+            return None
+        if not module_instance.check_dependencies():
+            log_display(f"  ⚠ Dependências falharam para {module_instance.name}")
+            return None
+
+        start = time.perf_counter()
+        loaded = module_instance.on_load()
+        timings["on_load"] = time.perf_counter() - start
+        if not loaded:
+            return None
+
+        self._register(module_instance, module_name, self._file_mtime(mod_file))
+        if self.manifest is not None and mod_file is not None:
+            self.manifest.record(module_name, mod_file, module_instance)
+        log_display(f"  ✓ {module_instance.name} registrado.")
+        return module_instance
+
+    def _import_and_register(self, module_name, mod_file=None):
         """Helper para importar e registrar um único módulo com HOT RELOAD."""
         try:
-            if module_name in sys.modules:
-                module_import = importlib.reload(sys.modules[module_name])
-                log_display(f"  ↻ Módulo '{module_name}' recarregado (Hot Reload).")
-            else:
-                module_import = importlib.import_module(module_name)
-            
-            for name, obj in inspect.getmembers(module_import):
-                if inspect.isclass(obj) and issubclass(obj, AeonModule) and obj is not AeonModule:
-                    module_instance = obj(self.core_context)
-                    if not module_instance.check_dependencies():
-                        log_display(f"  ⚠ Dependências falharam para {module_instance.name}")
-                        return
-
-                    if module_instance.on_load():
-                        self.modules.append(module_instance)
-                        self.module_map[module_instance.name.lower()] = module_instance
-                        for trigger in module_instance.triggers:
-                            self.trigger_map[trigger.lower()] = module_instance
-                        log_display(f"  ✓ {module_instance.name} registrado.")
-                    break
+            module_instance, timings = self._build_instance(module_name)
+            return self._finish_registration(module_name, mod_file, module_instance, timings)
         except Exception as e:
             log_display(f"Erro importando {module_name}: {e}")
+            return None
+
+    def materialize(self, stub):
+        """
+        Troca um LazyModule pela instância real (import + on_load).
+        Retorna a instância, ou None se o módulo não puder ser carregado.
+        """
+        with self.load_lock:
+            current = self.module_map.get(stub.name.lower())
+            if current is not None and current is not stub and not isinstance(current, LazyModule):
+                return current  # Outra thread já carregou
+
+            log_display(f"  ⇣ Carregando sob demanda: {stub.name}")
+            module_instance = None
+            try:
+                if stub.module_name in sys.modules:
+                    module_import = sys.modules[stub.module_name]
+                else:
+                    module_import = importlib.import_module(stub.module_name)
+                module_instance = self._instantiate(module_import, stub.class_name)
+                if module_instance is not None and not module_instance.check_dependencies():
+                    log_display(f"  ⚠ Dependências falharam para {module_instance.name}")
+                    module_instance = None
+                elif module_instance is not None and not module_instance.on_load():
+                    module_instance = None
+            except Exception as e:
+                log_display(f"Erro importando {stub.module_name}: {e}")
+                module_instance = None
+
+            if module_instance is None:
+                self._unregister(stub)
+                self.failed_modules.append(stub.name)
+                if self.manifest is not None:
+                    self.manifest.forget(stub.module_name)
+                    self.manifest.save()
+                return None
+
+            # Substitui o stub mantendo a posição (ordem de registro)
+            idx = next((i for i, m in enumerate(self.modules) if m is stub), None)
+            if idx is None:
+                self.modules.append(module_instance)
+            else:
+                self.modules[idx] = module_instance
+            if self.module_map.get(stub.name.lower()) is stub:
+                del self.module_map[stub.name.lower()]
+            self.module_map[module_instance.name.lower()] = module_instance
+            self.module_sources[stub.module_name] = module_instance
+            # Gatilhos do manifesto podem estar velhos: saem todos os do stub e entram os reais.
+            # Os que eram do stub continuam dele; os novos não tomam gatilho de outro módulo
+            owned = [t for t, m in self.trigger_map.items() if m is stub]
+            for trigger in owned:
+                del self.trigger_map[trigger]
+            for trigger in module_instance.triggers:
+                key = trigger.lower()
+                if key in owned or key not in self.trigger_map:
+                    self.trigger_map[key] = module_instance
+            if self.manifest is not None and stub.file_path:
+                self.manifest.record(stub.module_name, Path(stub.file_path), module_instance)
+                self.manifest.save()
+            log_display(f"  ✓ {module_instance.name} registrado.")
+            return module_instance
+
+    def _unregister(self, module_instance):
+        """Remove a instância (e só os gatilhos dela) das estruturas de roteamento."""
+        with self.load_lock:
+            self.fleet_version += 1
+            self.modules = [m for m in self.modules if m is not module_instance]
+            key = module_instance.name.lower()
+            if self.module_map.get(key) is module_instance:
+                del self.module_map[key]
+            for trigger in [t for t, m in self.trigger_map.items() if m is module_instance]:
+                del self.trigger_map[trigger]
+            for source in [n for n, m in self.module_sources.items() if m is module_instance]:
+                del self.module_sources[source]
+                self.module_mtimes.pop(source, None)
+            if self.focused_module is module_instance:
+                self.release_focus()
+
+    # --- Hot reload de um único módulo ---
+    @staticmethod
+    def _file_mtime(mod_file):
+        try:
+            return Path(mod_file).stat().st_mtime if mod_file else None
+        except OSError:
+            return None
+
+    def _resolve_source(self, path_or_name):
+        """
+        Aceita caminho do *_mod.py ou nome pontuado e devolve (nome, caminho).
+        Caminho fora de /modules devolve (None, None).
+        """
+        text = str(path_or_name)
+        if text.endswith(".py") or os.sep in text or "/" in text:
+            mod_file = Path(text).resolve()
+            try:
+                rel = mod_file.relative_to(Path(self.modules_dir).resolve())
+            except ValueError:
+                log_display(f"Arquivo fora da pasta de módulos, ignorado: {mod_file}")
+                return None, None
+            module_name = "modules." + ".".join(rel.with_suffix("").parts)
+        else:
+            module_name = text
+            mod_file = self.modules_dir.joinpath(*module_name.split(".")[1:]).with_suffix(".py")
+        return module_name, mod_file
+
+    def _sync_after_change(self):
+        with self.matcher_lock:
+            self._sync_matcher()
+        if self.manifest is not None:
+            self.manifest.save()
+
+    def load_module(self, path_or_name):
+        """
+        Carrega UM módulo (por caminho ou 'modules.pkg.x_mod') sem tocar nos outros.
+        Se já estiver carregado, faz reload. Retorna a instância ou None.
+        """
+        module_name, mod_file = self._resolve_source(path_or_name)
+        if module_name is None:
+            return None
+        with self.load_lock:
+            if module_name in self.module_sources:
+                return self.reload_module(module_name)
+            module_instance = self._import_and_register(module_name, mod_file)
+        self._sync_after_change()
+        return module_instance
+
+    def reload_module(self, path_or_name):
+        """Descarrega a instância atual (on_unload) e importa o arquivo de novo."""
+        module_name, mod_file = self._resolve_source(path_or_name)
+        if module_name is None:
+            return None
+        with self.load_lock:
+            self._unload_source(module_name)
+            module_instance = self._import_and_register(module_name, mod_file)
+        self._sync_after_change()
+        return module_instance
+
+    def unload_module(self, path_or_name) -> bool:
+        """Tira UM módulo de operação: on_unload + remoção dos seus gatilhos."""
+        module_name, _ = self._resolve_source(path_or_name)
+        if module_name is None:
+            return False
+        with self.load_lock:
+            removed = self._unload_source(module_name)
+        self._sync_after_change()
+        return removed
+
+    def _unload_source(self, module_name) -> bool:
+        module_instance = self.module_sources.get(module_name)
+        if module_instance is None:
+            return False
+        if not isinstance(module_instance, LazyModule):
+            try:
+                module_instance.on_unload()
+            except Exception as e:
+                log_display(f"Erro no on_unload de {module_instance.name}: {e}")
+        self._unregister(module_instance)
+        log_display(f"  ⏏ {module_instance.name} descarregado.")
+        return True
 
     def scan_new_modules(self):
-        """Re-escaneia módulos (usado pela Singularidade)."""
+        """
+        Re-escaneia /modules (usado pela Singularidade) de forma incremental:
+        carrega arquivos novos, recarrega os editados e descarrega os removidos.
+        Retorna os nomes dos módulos afetados.
+        """
         log_display("Re-escaneando novos módulos...")
-        self.trigger_map = {}
-        self.modules = []
-        self.load_modules()
-        return ["Reloaded"]
+        changed = []
+        with self.load_lock:
+            discovered = dict(self._discover_module_files())
+            for module_name, mod_file in discovered.items():
+                if module_name not in self.module_sources:
+                    module_instance = self._import_and_register(module_name, mod_file)
+                elif self.module_mtimes.get(module_name) != self._file_mtime(mod_file):
+                    self._unload_source(module_name)
+                    module_instance = self._import_and_register(module_name, mod_file)
+                else:
+                    continue
+                if module_instance is not None:
+                    changed.append(module_instance.name)
+
+            for module_name in [n for n in self.module_sources if n not in discovered]:
+                self._unload_source(module_name)
+                changed.append(module_name)
+
+        self._sync_after_change()
+        return changed
+
+    def get_module(self, name):
+        """Retorna o módulo pelo nome (instância real ou LazyModule), ou None."""
+        return self.module_map.get(name.lower())
 
     def _format_history(self):
         """Formata histórico para o LLM de forma segura."""
@@ -96,71 +506,161 @@ class ModuleManager:
                 history_text += f"{role}: {msg['content']}\n"
             return history_text
 
+    def match_intent(self, command: str):
+        """Consulta o roteador semântico; retorna (módulo, score) ou (None, score)."""
+        if self.intent_router is None:
+            return None, 0.0
+        try:
+            with self.intent_lock:
+                if self.intent_router.is_stale(self.fleet_version):
+                    self.intent_router.build(list(self.modules), self.fleet_version)
+            return self.intent_router.route(command)
+        except Exception as e:
+            log_display(f"Roteador semântico indisponível: {e}")
+            return None, 0.0
+
     def get_capabilities_summary(self) -> str:
         """Retorna uma lista de todos os módulos e o que eles fazem para o Brain."""
+        # Só muda quando a frota muda: reaproveita enquanto fleet_version for o mesmo
+        # (id/len cobrem quem troca a lista 'modules' diretamente, ex: testes)
+        version = (self.fleet_version, id(self.modules), len(self.modules))
+        cached = self._capabilities_cache
+        if cached and cached[0] == version:
+            return cached[1]
         summary = "Você tem acesso aos seguintes módulos técnicos:\n"
-        for mod in self.modules:
+        for mod in list(self.modules):
             desc = getattr(mod, 'metadata', {}).get('description', 'Sem descrição.')
             summary += f"- {mod.name}: {desc} (Gatilhos: {', '.join(mod.triggers[:5])})\n"
+        self._capabilities_cache = (version, summary)
         return summary
 
-    def route_command(self, command: str) -> str:
-        """Roteia comando com PRIORIDADE DE TAMANHO."""
+    def _route_to_module(self, command: str):
+        """
+        Estágio 2 do roteamento (gatilho e intenção).
+        Retorna (tratado, resposta, lembrar): erros de carga/dependência
+        são devolvidos como tratados mas não entram no histórico.
+        """
         command_lower = command.lower()
-        response = ""
 
+        # 2. MODO LIVRE (Autômato: o gatilho mais longo vence)
+        trigger = self.match_trigger(command_lower)
+        module = self.trigger_map.get(trigger) if trigger is not None else None
+        reason = f"Trigger '{trigger}'"
+        via_intent = False
+
+        # 2b. INTENÇÃO (Semântico): só quando nenhum gatilho casou
+        if module is None and self.intent_router is not None:
+            module, score = self.match_intent(command)
+            reason = f"Intenção ({score:.2f})"
+            via_intent = module is not None
+
+        if isinstance(module, LazyModule):
+            module = self.materialize(module)
+            if module is None:
+                return True, f"Erro: módulo acionado por {reason} não pôde ser carregado.", False
+
+        if module is None:
+            return False, "", True
+
+        if not module.check_dependencies():
+            return True, f"Erro: Dependência de {module.name} falhou.", False
+
+        log_display(f"{reason} acionou '{module.name}'")
+        response = module.process(command)
+        # Módulo escolhido por intenção que não soube tratar: deixa o Brain responder
+        return bool(response) or not via_intent, response, True
+
+    def _brain_request(self, command: str) -> dict:
+        """Argumentos do fallback para o Brain (histórico, capacidades e memórias)."""
+        hist = self._format_history()
+        caps = self.get_capabilities_summary()
+
+        # Recupera memórias de longo prazo relevantes para a pergunta atual
+        long_term = ""
+        if self.vector_memory:
+            long_term = self.vector_memory.retrieve_relevant(command)
+
+        return dict(prompt=command, historico_txt=hist, system_override=None, capabilities=caps, long_term_context=long_term)
+
+    def _remember(self, command: str, response: str, triggered: bool):
+        """4. MEMÓRIA (Thread-Safe)"""
+        if not response:
+            return
+        with self.history_lock:
+            self.chat_history.append({"role": "user", "content": command})
+            self.chat_history.append({"role": "assistant", "content": response})
+
+            # Salva a interação na memória de longo prazo (apenas se não for comando de módulo)
+            if self.vector_memory and not triggered:
+                self.vector_memory.store_interaction(command, response)
+
+            # Garante que a lista não exceda o tamanho máximo
+            history_len = len(self.chat_history)
+            if history_len > self.max_history * 2:
+                self.chat_history = self.chat_history[history_len - self.max_history * 2:]
+
+    def route_command(self, command: str) -> str:
+        """Roteia comando com PRIORIDADE DE TAMANHO."""
         # 1. MODO FOCO
         if self.focused_module is not None:
             log_display(f"🔒 FOCO: {self.focused_module.name}")
             return self.focused_module.process(command) or ""
-        
-        # 2. MODO LIVRE (Ordenado)
-        triggered = False
-        sorted_triggers = sorted(self.trigger_map.items(), key=lambda x: len(x[0]), reverse=True)
-
-        for trigger, module in sorted_triggers:
-            if trigger in command_lower:
-                if not module.check_dependencies():
-                    return f"Erro: Dependência de {module.name} falhou."
-                
-                log_display(f"Trigger '{trigger}' acionou '{module.name}'")
-                response = module.process(command)
-                triggered = True
-                break 
+
+        triggered, response, remember = self._route_to_module(command)
+        if not remember:
+            return response
 
         # 3. FALLBACK (Brain)
         if not triggered:
             brain = self.core_context.get("brain")
             if brain:
-                hist = self._format_history()
-                caps = self.get_capabilities_summary()
-                
-                # Recupera memórias de longo prazo relevantes para a pergunta atual
-                long_term = ""
-                if self.vector_memory:
-                    long_term = self.vector_memory.retrieve_relevant(command)
-                
-                response = brain.pensar(prompt=command, historico_txt=hist, system_override=None, capabilities=caps, long_term_context=long_term)
+                response = brain.pensar(**self._brain_request(command))
             else:
                 response = "Cérebro indisponível."
 
-        # 4. MEMÓRIA (Thread-Safe)
-        if response:
-            with self.history_lock:
-                self.chat_history.append({"role": "user", "content": command})
-                self.chat_history.append({"role": "assistant", "content": response})
-                
-                # Salva a interação na memória de longo prazo (apenas se não for comando de módulo)
-                if self.vector_memory and not triggered:
-                    self.vector_memory.store_interaction(command, response)
-                
-                # Garante que a lista não exceda o tamanho máximo
-                history_len = len(self.chat_history)
-                if history_len > self.max_history * 2:
-                    self.chat_history = self.chat_history[history_len - self.max_history * 2:]
-
+        self._remember(command, response, triggered)
         return response if response else ""
 
+    def route_command_stream(self, command: str):
+        """
+        Igual a route_command, mas gera a resposta em pedaços.
+        Módulos respondem de uma vez; o fallback do Brain chega token a token
+        (pensar_stream), para a GUI e o TTS começarem antes do fim da geração.
+        """
+        if self.focused_module is not None:
+            log_display(f"🔒 FOCO: {self.focused_module.name}")
+            yield self.focused_module.process(command) or ""
+            return
+
+        triggered, response, remember = self._route_to_module(command)
+        if triggered or not remember:
+            if response:
+                yield response
+            if remember:
+                self._remember(command, response, triggered)
+            return
+
+        brain = self.core_context.get("brain")
+        parts = []
+        try:
+            if not brain:
+                parts.append("Cérebro indisponível.")
+                yield parts[-1]
+            elif hasattr(brain, "pensar_stream"):
+                stream = brain.pensar_stream(**self._brain_request(command))
+                try:
+                    for chunk in stream:
+                        parts.append(chunk)
+                        yield chunk
+                finally:
+                    stream.close()  # Interrompido: encerra a conexão e as métricas já
+            else:
+                parts.append(brain.pensar(**self._brain_request(command)))
+                yield parts[-1]
+        finally:
+            # Mesmo interrompida, a parte já entregue entra no histórico
+            self._remember(command, "".join(parts), False)
+
     # Métodos de Foco
     def lock_focus(self, module, timeout=None):
         with self.focus_lock:
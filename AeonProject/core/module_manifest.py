@@ -0,0 +1,126 @@
+import json
+import threading
+from pathlib import Path
+
+from modules.base_module import AeonModule
+
+MANIFEST_VERSION = 1
+
+
+def log_display(msg):
+    print(f"[MANIFEST] {msg}")
+
+
+class ModuleManifest:
+    """
+    Cache em disco (bagagem/module_manifest.json) do que cada *_mod.py registra:
+    classe, nome, gatilhos e metadados. Permite registrar os gatilhos no boot
+    sem importar o módulo. Cada entrada guarda o mtime do arquivo e se
+    invalida sozinha quando o módulo é editado.
+    """
+    def __init__(self, storage_path):
+        self.path = Path(storage_path) / "module_manifest.json"
+        self.entries = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.load()
+
+    def load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_VERSION:
+                self.entries = data.get("modules", {})
+        except Exception as e:
+            log_display(f"Manifesto ilegível, será recriado: {e}")
+            self.entries = {}
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, "w", encoding="utf-8") as f:
+                    json.dump({"version": MANIFEST_VERSION, "modules": self.entries}, f, indent=2, ensure_ascii=False)
+                self._dirty = False
+            except Exception as e:
+                log_display(f"Erro ao salvar manifesto: {e}")
+
+    def get_valid(self, module_name: str, file_path: Path):
+        """Retorna a entrada se o arquivo não mudou desde que foi gravada."""
+        entry = self.entries.get(module_name)
+        if not entry:
+            return None
+        try:
+            if entry.get("mtime") != file_path.stat().st_mtime:
+                return None
+        except OSError:
+            return None
+        return entry
+
+    def record(self, module_name: str, file_path: Path, instance: AeonModule):
+        """Grava (ou atualiza) a entrada a partir de uma instância já carregada."""
+        try:
+            mtime = file_path.stat().st_mtime
+        except OSError:
+            return
+        with self._lock:
+            self.entries[module_name] = {
+                "path": str(file_path),
+                "mtime": mtime,
+                "class_name": type(instance).__name__,
+                "name": instance.name,
+                "triggers": list(instance.triggers),
+                "dependencies": list(instance.dependencies),
+                "metadata": dict(instance.metadata),
+            }
+            self._dirty = True
+
+    def forget(self, module_name: str):
+        with self._lock:
+            if self.entries.pop(module_name, None) is not None:
+                self._dirty = True
+
+    def prune(self, known_module_names):
+        """Remove entradas de arquivos que não existem mais."""
+        known = set(known_module_names)
+        with self._lock:
+            for name in [n for n in self.entries if n not in known]:
+                del self.entries[name]
+                self._dirty = True
+
+
+class LazyModule(AeonModule):
+    """
+    Substituto leve de um módulo ainda não importado.
+    Expõe nome, gatilhos e metadados do manifesto; o ModuleManager troca
+    este objeto pela instância real quando um gatilho dele dispara.
+    """
+    def __init__(self, core_context, module_name: str, entry: dict):
+        super().__init__(core_context)
+        self.module_name = module_name
+        self.class_name = entry.get("class_name")
+        self.file_path = entry.get("path")
+        self.name = entry.get("name", module_name)
+        self.triggers = list(entry.get("triggers", []))
+        self._metadata = dict(entry.get("metadata", {}))
+
+    @property
+    def metadata(self):
+        return self._metadata
+
+    def check_dependencies(self) -> bool:
+        # As dependências reais são verificadas ao materializar
+        return True
+
+    def process(self, command: str) -> str:
+        manager = self.core_context.get("module_manager")
+        if not manager:
+            return f"Erro: módulo {self.name} não pôde ser carregado."
+        module = manager.materialize(self)
+        if module is None:
+            return f"Erro: módulo {self.name} indisponível."
+        return module.process(command)
@@ -0,0 +1,170 @@
+import datetime
+import math
+import re
+from collections import OrderedDict
+
+
+def log_display(msg):
+    print(f"[PROMPT] {msg}")
+
+
+CHARS_PER_TOKEN = 3.5  # Média para português com tokenizers BPE (llama3)
+
+DEFAULT_BUDGETS = {
+    "default": 3000,
+    "llama-3.3-70b-versatile": 4000,
+    "llama3.2": 2000,
+}
+
+HEADER = """Você é Aeon, um assistente focado em respostas precisas e factuais.
+Data: {data}
+Responda SEMPRE em Português do Brasil, de forma concisa e prestativa.
+Se você não souber uma informação, admita. Não invente dados.
+
+CAPACIDADES DO SISTEMA:
+Você possui controle total sobre o hardware (CÂMERA, MICROFONE) e o sistema operacional Windows através de seus módulos técnicos. Se o usuário pedir para ver algo ou ligar a câmera, utilize o módulo de Gestos.
+"""
+
+_TURN_START = re.compile(r"^(?=(?:Usuário|Aeon): )", re.MULTILINE)
+
+
+def estimate_tokens(text: str) -> int:
+    """Contagem aproximada de tokens (sem depender do tokenizer do modelo)."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+
+def _truncate(text: str, max_tokens: int) -> str:
+    max_chars = int(max_tokens * CHARS_PER_TOKEN)
+    if len(text) <= max_chars:
+        return text
+    return text[:max(0, max_chars - 5)].rstrip() + " [...]"
+
+
+class PromptBuilder:
+    """
+    Monta o prompt de sistema do Brain dentro de um orçamento de tokens por modelo.
+    Seções estáticas (cabeçalho + capacidades) ficam em cache; histórico e
+    memórias são cortados para caber no que sobra: o histórico perde as
+    mensagens mais antigas, as memórias perdem as menos relevantes.
+    """
+    MEMORY_SHARE = 0.4        # Fração do espaço livre reservada às memórias
+    CAPABILITIES_SHARE = 0.4  # Fração máxima do orçamento para a lista de módulos
+
+    def __init__(self, budgets: dict = None):
+        self.budgets = dict(DEFAULT_BUDGETS)
+        self.budgets.update(budgets or {})
+        self._static_cache = OrderedDict()  # (capabilities, orçamento) -> (texto, tokens)
+        self.last_stats = {}
+
+    def budget_for(self, model: str) -> int:
+        """Orçamento do modelo (aceita prefixo: 'llama3.2' vale para 'llama3.2:latest')."""
+        if model in self.budgets:
+            return int(self.budgets[model])
+        for name, budget in self.budgets.items():
+            if name != "default" and model and model.startswith(name):
+                return int(budget)
+        return int(self.budgets.get("default", 3000))
+
+    # --- Seções ---
+    def _compact_capabilities(self, capabilities: str, max_tokens: int) -> str:
+        """Reduz a lista de módulos: primeiro tira os gatilhos, depois corta módulos."""
+        if estimate_tokens(capabilities) <= max_tokens:
+            return capabilities
+        lines = [line.split(" (Gatilhos:")[0] for line in capabilities.splitlines()]
+        kept, used = [], 0
+        for i, line in enumerate(lines):
+            cost = estimate_tokens(line + "\n")
+            if used + cost > max_tokens:
+                kept.append(f"... e mais {len(lines) - i} módulos.")
+                break
+            kept.append(line)
+            used += cost
+        return "\n".join(kept)
+
+    def _static_section(self, capabilities: str, budget: int):
+        key = (capabilities, budget)
+        cached = self._static_cache.get(key)
+        if cached:
+            self._static_cache.move_to_end(key)
+            return cached
+        caps = self._compact_capabilities(capabilities, int(budget * self.CAPABILITIES_SHARE))
+        text = HEADER + caps
+        # A data é preenchida a cada chamada; reserva o espaço dela
+        cached = (text, estimate_tokens(text) + 6)
+        self._static_cache[key] = cached
+        if len(self._static_cache) > 8:
+            self._static_cache.popitem(last=False)
+        return cached
+
+    def _fit_history(self, historico_txt: str, max_tokens: int):
+        """Mantém as mensagens mais recentes que couberem. Retorna (texto, descartadas)."""
+        if estimate_tokens(historico_txt) <= max_tokens:
+            return historico_txt, 0
+        turns = [t for t in _TURN_START.split(historico_txt) if t.strip()]
+        kept, used = [], 0
+        for turn in reversed(turns):
+            cost = estimate_tokens(turn)
+            if used + cost > max_tokens:
+                # A última mensagem é sempre mantida, nem que seja cortada
+                if not kept:
+                    kept.append(_truncate(turn.rstrip("\n"), max_tokens) + "\n")
+                break
+            kept.append(turn)
+            used += cost
+        dropped = len(turns) - len(kept)
+        text = "".join(reversed(kept))
+        if dropped:
+            text = f"[... {dropped} mensagens antigas omitidas]\n" + text
+        return text, dropped
+
+    def _fit_memories(self, long_term_context: str, max_tokens: int):
+        """Mantém as memórias mais relevantes (vêm em ordem) que couberem."""
+        if estimate_tokens(long_term_context) <= max_tokens:
+            return long_term_context, 0
+        memories = long_term_context.split("\n---\n")
+        kept, used = [], 0
+        for memory in memories:
+            cost = estimate_tokens(memory) + 2
+            if used + cost > max_tokens:
+                break
+            kept.append(memory)
+            used += cost
+        return "\n---\n".join(kept), len(memories) - len(kept)
+
+    # --- API ---
+    def build(self, historico_txt: str = "", user_prefs: dict = None, capabilities: str = "",
+              long_term_context: str = "", budget: int = None) -> str:
+        budget = budget or self.budget_for("default")
+        static_text, static_tokens = self._static_section(capabilities or "", budget)
+
+        prefs_str = "\n".join([f"- {k}: {v}" for k, v in user_prefs.items()]) if user_prefs else "Nenhuma preferência definida."
+        fixed_tokens = static_tokens + estimate_tokens(prefs_str) + 40  # 40 ~ títulos das seções
+        free = max(0, budget - fixed_tokens)
+
+        memory_limit = int(free * self.MEMORY_SHARE)
+        memories, mem_dropped = self._fit_memories(long_term_context or "", memory_limit)
+        # O que as memórias não usaram fica para o histórico
+        history, hist_dropped = self._fit_history(historico_txt or "", free - estimate_tokens(memories))
+
+        header = static_text.replace("{data}", datetime.datetime.now().strftime('%d/%m/%Y %H:%M'), 1)
+        prompt = f"""{header}
+
+MEMÓRIAS RELEVANTES DO PASSADO:
+{"Nenhuma memória relevante encontrada." if not memories else memories}
+
+HISTÓRICO RECENTE:
+{history}
+
+Preferências do usuário:
+{prefs_str}"""
+
+        self.last_stats = {
+            "budget": budget,
+            "tokens": estimate_tokens(prompt),
+            "history_dropped": hist_dropped,
+            "memories_dropped": mem_dropped,
+        }
+        if hist_dropped or mem_dropped:
+            log_display(f"Prompt ajustado ao orçamento ({self.last_stats['tokens']}/{budget} tokens): "
+                        f"-{hist_dropped} mensagens, -{mem_dropped} memórias.")
+        return prompt
@@ -0,0 +1,247 @@
+import atexit
+import hashlib
+import json
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+def log_display(msg):
+    print(f"[RESP_CACHE] {msg}")
+
+
+# Perguntas cuja resposta muda com o tempo nunca são servidas do cache
+TIME_SENSITIVE = re.compile(
+    r"\b(hora|horas|hoje|agora|amanha|ontem|data|dia|semana|mes|ano|"
+    r"clima|tempo|previsao|temperatura|noticia|noticias|cotacao|preco|dolar|euro|bitcoin|"
+    r"atual|atualmente|ultimo|ultima|ultimos|ultimas|recente|recentes|ao vivo|placar)\b"
+)
+
+# A conversa não entra na chave: perguntas que dependem dela (ou sobre o próprio usuário) também ficam de fora
+CONVERSATIONAL = re.compile(
+    r"\b(isso|isto|aquilo|disso|disto|daquilo|nisso|ele|ela|eles|elas|dele|dela|deles|delas|"
+    r"anterior|acima|de novo|novamente|continue|continua|continuar|mais detalhes|explique melhor|"
+    r"lembra|lembrar|eu|mim|comigo|meu|minha|meus|minhas)\b"
+)
+
+
+def _fold(text: str) -> str:
+    """Minúsculas, sem acentos e com espaços normalizados."""
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class ResponseCache:
+    """
+    Cache de respostas do Brain (bagagem/response_cache.json).
+    Chave = prompt normalizado + hash das entradas estáveis do prompt de sistema
+    (capacidades, preferências, override) + modelo. Histórico e memórias mudam a
+    cada turno e ficam de fora; perguntas que dependem da conversa não entram.
+    Busca exata primeiro; opcionalmente busca semântica (embeddings) entre
+    entradas com o mesmo contexto e modelo. TTL, LRU e limite de tamanho.
+    A gravação em disco roda numa thread à parte, no máximo a cada save_interval_s.
+    """
+    def __init__(self, storage_path, max_entries: int = 500, ttl_s: float = 86400,
+                 embed_fn=None, semantic_threshold: float = 0.93, save_interval_s: float = 5.0):
+        self.path = Path(storage_path) / "response_cache.json"
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.embed_fn = embed_fn
+        self.semantic_threshold = semantic_threshold
+        self.save_interval_s = save_interval_s
+
+        self.entries = OrderedDict()  # chave -> {prompt, context, response, created_at, vector}
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()    # Uma gravação por vez (timer x encerramento)
+        self._dirty = False
+        self._save_timer = None
+        self.load()
+        atexit.register(self.close)  # Grava o que ficou pendente do intervalo mínimo
+
+    # --- Chaves ---
+    @staticmethod
+    def normalize(prompt: str) -> str:
+        return _fold(prompt).rstrip(" ?!.")
+
+    @staticmethod
+    def context_hash(**inputs) -> str:
+        """Hash estável das entradas do prompt de sistema."""
+        raw = json.dumps(inputs, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def is_time_sensitive(prompt: str) -> bool:
+        return bool(TIME_SENSITIVE.search(_fold(prompt)))
+
+    @staticmethod
+    def should_bypass(prompt: str) -> bool:
+        """Resposta que muda com o tempo ou com a conversa: nunca sai nem entra no cache."""
+        folded = _fold(prompt)
+        return bool(TIME_SENSITIVE.search(folded) or CONVERSATIONAL.search(folded))
+
+    def _key(self, normalized: str, context: str, model: str = "") -> str:
+        return hashlib.sha1(f"{model}|{context}|{normalized}".encode("utf-8")).hexdigest()
+
+    def _expired(self, entry, now) -> bool:
+        return self.ttl_s and now - entry["created_at"] > self.ttl_s
+
+    def _vector(self, text: str):
+        if not (self.embed_fn and NUMPY_AVAILABLE):
+            return None
+        vec = np.asarray(self.embed_fn([text])[0], dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else None
+
+    # --- API ---
+    def get(self, prompt: str, context: str, model: str = ""):
+        """Retorna a resposta em cache gerada por 'model', ou None (miss / bypass)."""
+        if self.should_bypass(prompt):
+            self.bypassed += 1
+            return None
+
+        normalized = self.normalize(prompt)
+        key = self._key(normalized, context, model)
+        now = time.time()
+
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry and self._expired(entry, now):
+                del self.entries[key]
+                self._dirty = True
+                entry = None
+            if entry:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry["response"]
+            candidates = [(k, e) for k, e in self.entries.items()
+                          if e["context"] == context and e.get("model", "") == model
+                          and e.get("vector") is not None and not self._expired(e, now)]
+
+        # Busca semântica (fora do lock: o embedding pode levar alguns ms)
+        if candidates and self.embed_fn:
+            try:
+                query = self._vector(normalized)
+                if query is not None:
+                    matrix = np.asarray([e["vector"] for _, e in candidates], dtype=np.float32)
+                    sims = matrix @ query
+                    best = int(np.argmax(sims))
+                    if sims[best] >= self.semantic_threshold:
+                        best_key, best_entry = candidates[best]
+                        with self._lock:
+                            if best_key in self.entries:
+                                self.entries.move_to_end(best_key)
+                            self.semantic_hits += 1
+                        return best_entry["response"]
+            except Exception as e:
+                log_display(f"Busca semântica falhou: {e}")
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, prompt: str, context: str, response: str, model: str = ""):
+        if not response or self.should_bypass(prompt):
+            return
+        normalized = self.normalize(prompt)
+        vector = None
+        if self.embed_fn:
+            try:
+                vec = self._vector(normalized)
+                vector = vec.tolist() if vec is not None else None
+            except Exception as e:
+                log_display(f"Embedding falhou: {e}")
+
+        with self._lock:
+            key = self._key(normalized, context, model)
+            self.entries[key] = {
+                "prompt": normalized,
+                "context": context,
+                "model": model,
+                "response": response,
+                "created_at": time.time(),
+                "vector": vector,
+            }
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)  # LRU: sai o menos usado
+            self._dirty = True
+            # Persistência fora da thread que responde, agrupando as respostas do intervalo
+            if self._save_timer is None:
+                self._save_timer = threading.Timer(self.save_interval_s, self._flush)
+                self._save_timer.daemon = True
+                self._save_timer.start()
+
+    def _flush(self):
+        with self._lock:
+            self._save_timer = None
+        self.save()
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self._dirty = True
+        self.save()
+
+    def close(self):
+        """Cancela a gravação agendada e grava o que estiver pendente (encerramento)."""
+        with self._lock:
+            timer, self._save_timer = self._save_timer, None
+        if timer is not None:
+            timer.cancel()
+        self.save()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.semantic_hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": round((self.hits + self.semantic_hits) / lookups, 3) if lookups else 0.0,
+        }
+
+    # --- Persistência ---
+    def load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            now = time.time()
+            for key, entry in data.get("entries", []):
+                if not self._expired(entry, now):
+                    self.entries[key] = entry
+        except Exception as e:
+            log_display(f"Cache ilegível, começando vazio: {e}")
+
+    def save(self):
+        with self._io_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                snapshot = list(self.entries.items())
+                self._dirty = False
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self.path.with_suffix(".tmp")
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump({"entries": snapshot}, f, ensure_ascii=False)
+                tmp.replace(self.path)
+            except Exception as e:
+                log_display(f"Erro ao salvar cache: {e}")
@@ -9,6 +9,9 @@ class StatusManager:
         self.operation_mode = "DIRETO"  # DIRETO ou CHAMAR
         self.cloud_online = False
         self.local_online = False
+        self.cloud_breaker_state = "FECHADO"  # FECHADO / ABERTO / SEMIABERTO
+        self.cloud_retry_in = 0.0
+        self.local_models = {}  # modelo -> FRIO / AQUECENDO / PRONTO / DESCARREGADO / ERRO
         self.triggers = ["aeon", "aion", "iron", "filho", "assistente", "computador"]
         
         # Callbacks para atualização da UI
@@ -53,11 +56,27 @@ class StatusManager:
         if self.on_status_change:
             self.on_status_change()
 
+    def update_cloud_breaker(self, state: str, retry_in: float = 0.0):
+        """Atualiza o estado do disjuntor da nuvem (FECHADO, ABERTO, SEMIABERTO)."""
+        self.cloud_breaker_state = state
+        self.cloud_retry_in = retry_in
+        if self.on_status_change:
+            self.on_status_change()
+
+    def update_local_models(self, states: dict):
+        """Atualiza o estado de carga dos modelos do Ollama (keep-alive)."""
+        self.local_models = dict(states)
+        if self.on_status_change:
+            self.on_status_change()
+
     def get_status(self) -> dict:
         """Retorna o status atual como dicionário."""
         return {
             "cloud": self.cloud_online,
             "local": self.local_online,
+            "cloud_breaker": self.cloud_breaker_state,
+            "cloud_retry_in": round(self.cloud_retry_in, 1),
+            "local_models": dict(self.local_models),
             "mode": self.operation_mode
         }
 
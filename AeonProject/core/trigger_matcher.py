@@ -0,0 +1,182 @@
+from collections import deque
+
+
+class TriggerMap(dict):
+    """
+    Dicionário gatilho -> módulo que registra suas próprias mutações.
+    O ModuleManager usa a versão para saber quando o autômato ficou obsoleto,
+    e o log de operações para atualizá-lo de forma incremental (hot reload).
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.version = 0
+        self.ops = []          # ("add" | "del", gatilho) desde a última sincronização
+        self.reset = False     # clear() exige reconstrução completa
+
+    def _touch(self, op=None, key=None):
+        self.version += 1
+        if op:
+            self.ops.append((op, key))
+
+    def __setitem__(self, key, value):
+        new = key not in self
+        super().__setitem__(key, value)
+        self._touch("add" if new else None, key)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._touch("del", key)
+
+    def pop(self, key, *default):
+        had = key in self
+        value = super().pop(key, *default)
+        if had:
+            self._touch("del", key)
+        return value
+
+    def popitem(self):
+        key, value = super().popitem()
+        self._touch("del", key)
+        return key, value
+
+    def clear(self):
+        super().clear()
+        self.ops = []
+        self.reset = True
+        self._touch()
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def mark_synced(self):
+        """Zera o log de mutações (chamado após o autômato ser atualizado)."""
+        self.ops = []
+        self.reset = False
+
+
+class TriggerMatcher:
+    """
+    Autômato Aho-Corasick sobre os gatilhos dos módulos.
+    Uma única passada pelo comando encontra todas as ocorrências de todos os
+    gatilhos, e o resultado preserva a regra antiga do roteador:
+    o gatilho MAIS LONGO vence; empates ficam com o que foi registrado primeiro.
+    """
+    def __init__(self, triggers=()):
+        self._goto = [{}]      # Transições da trie
+        self._fail = [0]       # Links de falha
+        self._best = [-1]      # Melhor padrão terminando em cada estado (-1 = nenhum)
+        self._patterns = []
+        self._index = {}
+        self._compiled = True
+        for trigger in triggers:
+            self.add(trigger)
+
+    def __len__(self):
+        return len(self._index)
+
+    @property
+    def tombstones(self) -> int:
+        """Padrões removidos que ainda ocupam a trie."""
+        return len(self._patterns) - len(self._index)
+
+    def __contains__(self, trigger):
+        return trigger in self._index
+
+    def add(self, trigger: str) -> bool:
+        """Insere um gatilho na trie. Os links de falha são refeitos no próximo match."""
+        if not trigger or trigger in self._index:
+            return False
+
+        state = 0
+        for ch in trigger:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._best.append(-1)
+            state = nxt
+
+        pattern_id = len(self._patterns)
+        self._patterns.append(trigger)
+        self._index[trigger] = pattern_id
+        if self._best[state] == -1:
+            self._best[state] = pattern_id
+        self._compiled = False
+        return True
+
+    def remove(self, trigger: str) -> bool:
+        """Desativa um gatilho. A trie é mantida; só as saídas são recalculadas."""
+        pattern_id = self._index.pop(trigger, None)
+        if pattern_id is None:
+            return False
+        self._patterns[pattern_id] = None
+        self._compiled = False
+        return True
+
+    def _better(self, a: int, b: int) -> int:
+        """Escolhe entre dois padrões: maior comprimento, depois ordem de registro."""
+        if a == -1:
+            return b
+        if b == -1:
+            return a
+        la, lb = len(self._patterns[a]), len(self._patterns[b])
+        if la != lb:
+            return a if la > lb else b
+        return min(a, b)
+
+    def compile(self):
+        """Calcula os links de falha (BFS) e propaga o melhor padrão por sufixo."""
+        # O melhor "próprio" de cada estado é o padrão que termina exatamente nele
+        self._best = [-1] * len(self._goto)
+        for pattern_id, trigger in enumerate(self._patterns):
+            if trigger is None:
+                continue
+            state = 0
+            for ch in trigger:
+                state = self._goto[state][ch]
+            self._best[state] = pattern_id
+
+        self._fail[0] = 0
+        queue = deque()
+        for nxt in self._goto[0].values():
+            self._fail[nxt] = 0
+            queue.append(nxt)
+
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(ch, 0)
+                self._best[nxt] = self._better(self._best[nxt], self._best[self._fail[nxt]])
+                queue.append(nxt)
+
+        self._compiled = True
+
+    def longest_match(self, text: str):
+        """Retorna o gatilho vencedor contido em `text`, ou None."""
+        if not self._index:
+            return None
+        if not self._compiled:
+            self.compile()
+
+        goto, fail, best_of = self._goto, self._fail, self._best
+        state = 0
+        best = -1
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if best_of[state] != -1:
+                best = self._better(best, best_of[state])
+
+        return self._patterns[best] if best != -1 else None
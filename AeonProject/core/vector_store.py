@@ -0,0 +1,315 @@
+import json
+import os
+import threading
+import time
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+def log_display(msg):
+    print(f"[VECTOR_STORE] {msg}")
+
+
+class SentenceTransformerEmbedding:
+    """all-MiniLM-L6-v2 direto do sentence-transformers (sem importar o chromadb)."""
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name)
+
+    def __call__(self, input):
+        return self.model.encode(list(input), normalize_embeddings=True, convert_to_numpy=True)
+
+
+class NumpyVectorStore:
+    """
+    Índice vetorial em arquivos simples, alternativa ao Chroma + SQLite:
+    - vectors.bin: embeddings float32 normalizados, linha a linha, lidos via np.memmap
+    - meta.jsonl:  log de metadados (id, documento, metadata), na mesma ordem dos vetores
+    - index.json:  cabeçalho (dimensão, modelo)
+    A busca é exata (produto matricial sobre o memmap + top-k). Expõe o pedaço da
+    interface de coleção do Chroma que a VectorMemory usa: add / query / get / count.
+
+    Com 'quantize', mantém também uma cópia int8 (vectors.q8 + scales.f32). A partir
+    de 'quantize_min_rows' vetores, a busca faz uma passada grossa nela e reordena só
+    os melhores candidatos com os vetores exatos (lê 1/4 dos bytes).
+    """
+    VECTORS = "vectors.bin"
+    META = "meta.jsonl"
+    HEADER = "index.json"
+    QUANT = "vectors.q8"
+    SCALES = "scales.f32"
+    CHUNK_ROWS = 65536
+
+    def __init__(self, path, embedding_function=None, model_name: str = None, quantize: bool = False,
+                 quantize_min_rows: int = 50000, oversample: int = 10):
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("NumPy não instalado.")
+        self.path = str(path)
+        self.embedding_function = embedding_function
+        self.model_name = model_name
+        self.quantize = quantize
+        self.quantize_min_rows = quantize_min_rows
+        self.oversample = oversample
+
+        self.dim = None
+        self.ids = []
+        self.documents = []
+        self.metadatas = []
+        self._matrix = None     # memmap (n, dim) float32
+        self._q8 = None         # memmap (n, dim) int8
+        self._scales = None     # memmap (n,) float32
+        self._lock = threading.Lock()
+
+        os.makedirs(self.path, exist_ok=True)
+        self._open()
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    # --- Abertura e consistência ---
+    def _open(self):
+        start = time.perf_counter()
+        header_path = self._file(self.HEADER)
+        if os.path.exists(header_path):
+            with open(header_path, "r", encoding="utf-8") as f:
+                header = json.load(f)
+            self.dim = header.get("dim")
+            self.model_name = self.model_name or header.get("model")
+
+        meta_path = self._file(self.META)
+        lines = []
+        if os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        lines.append(json.loads(line))
+                    except ValueError:
+                        break   # Linha cortada por um encerramento no meio da escrita
+
+        rows = 0
+        if self.dim and os.path.exists(self._file(self.VECTORS)):
+            rows = os.path.getsize(self._file(self.VECTORS)) // (self.dim * 4)
+
+        # Vetores e log precisam andar juntos: fica o que os dois têm
+        count = min(rows, len(lines))
+        if rows > count:
+            self._truncate(self.VECTORS, count * self.dim * 4)
+        if len(lines) > count:
+            lines = lines[:count]
+            self._rewrite_meta(lines)
+
+        self.ids = [entry["id"] for entry in lines]
+        self.documents = [entry.get("document", "") for entry in lines]
+        self.metadatas = [entry.get("metadata") or {} for entry in lines]
+        self._remap()
+
+        if self.quantize and count and not self._quant_in_sync(count):
+            self._rebuild_quantized()
+        if count:
+            log_display(f"{count} vetores abertos em {(time.perf_counter() - start) * 1000:.0f}ms.")
+
+    def _truncate(self, name: str, size: int):
+        with open(self._file(name), "r+b") as f:
+            f.truncate(size)
+
+    def _rewrite_meta(self, lines):
+        tmp = self._file(self.META + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            for entry in lines:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        os.replace(tmp, self._file(self.META))
+
+    def _map(self, name: str, dtype, shape):
+        if not shape[0]:
+            return None
+        return np.memmap(self._file(name), dtype=dtype, mode="r", shape=shape)
+
+    def _remap(self):
+        n = len(self.ids)
+        self._matrix = self._map(self.VECTORS, np.float32, (n, self.dim)) if self.dim else None
+        if self.quantize and self.dim and self._quant_in_sync(n):
+            self._q8 = self._map(self.QUANT, np.int8, (n, self.dim))
+            self._scales = self._map(self.SCALES, np.float32, (n,))
+        else:
+            self._q8 = self._scales = None
+
+    def _quant_in_sync(self, n: int) -> bool:
+        q_path, s_path = self._file(self.QUANT), self._file(self.SCALES)
+        return (os.path.exists(q_path) and os.path.exists(s_path)
+                and os.path.getsize(q_path) == n * self.dim and os.path.getsize(s_path) == n * 4)
+
+    @staticmethod
+    def _quantize_rows(rows):
+        scales = np.abs(rows).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        q8 = np.clip(np.rint(rows / scales[:, None]), -127, 127).astype(np.int8)
+        return q8, scales.astype(np.float32)
+
+    def _rebuild_quantized(self):
+        """Recalcula a cópia int8 a partir dos vetores exatos (em blocos)."""
+        self._q8 = self._scales = None
+        with open(self._file(self.QUANT), "wb") as fq, open(self._file(self.SCALES), "wb") as fs:
+            for start in range(0, len(self.ids), self.CHUNK_ROWS):
+                q8, scales = self._quantize_rows(np.asarray(self._matrix[start:start + self.CHUNK_ROWS]))
+                fq.write(q8.tobytes())
+                fs.write(scales.tobytes())
+        self._remap()
+        log_display(f"Índice quantizado reconstruído ({len(self.ids)} vetores).")
+
+    # --- Interface de coleção ---
+    def count(self) -> int:
+        return len(self.ids)
+
+    def _embed(self, texts):
+        if self.embedding_function is None:
+            raise RuntimeError("Sem função de embedding para textos.")
+        return self.embedding_function(texts)
+
+    @staticmethod
+    def _normalize(vectors):
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix[None, :]
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def add(self, documents, ids, metadatas=None, embeddings=None):
+        """Acrescenta vetores ao .bin e as linhas ao log (nessa ordem: o log confirma a escrita)."""
+        if not documents:
+            return
+        if embeddings is None:
+            embeddings = self._embed(documents)
+        matrix = self._normalize(embeddings)
+        metadatas = metadatas or [{} for _ in documents]
+
+        with self._lock:
+            if self.dim is None:
+                self.dim = int(matrix.shape[1])
+                with open(self._file(self.HEADER), "w", encoding="utf-8") as f:
+                    json.dump({"dim": self.dim, "model": self.model_name, "format": 1}, f, indent=4, ensure_ascii=False)
+            elif matrix.shape[1] != self.dim:
+                raise ValueError(f"Dimensão {matrix.shape[1]} diferente do índice ({self.dim}).")
+
+            with open(self._file(self.VECTORS), "ab") as f:
+                f.write(matrix.tobytes())
+            if self.quantize and (self._q8 is not None or not self.ids):
+                q8, scales = self._quantize_rows(matrix)
+                with open(self._file(self.QUANT), "ab") as fq, open(self._file(self.SCALES), "ab") as fs:
+                    fq.write(q8.tobytes())
+                    fs.write(scales.tobytes())
+            with open(self._file(self.META), "a", encoding="utf-8") as f:
+                for doc_id, doc, meta in zip(ids, documents, metadatas):
+                    f.write(json.dumps({"id": doc_id, "document": doc, "metadata": meta}, ensure_ascii=False) + "\n")
+
+            self.ids.extend(ids)
+            self.documents.extend(documents)
+            self.metadatas.extend(metadatas)
+            self._remap()
+
+    def search(self, query_vector, k: int):
+        """Top-k por similaridade de cosseno. Retorna (índices, scores), do melhor ao pior."""
+        with self._lock:
+            matrix, q8, scales = self._matrix, self._q8, self._scales
+        if matrix is None or k <= 0:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float32)
+        query = self._normalize(query_vector)[0]
+        n = matrix.shape[0]
+        k = min(k, n)
+
+        if q8 is not None and n >= self.quantize_min_rows:
+            # Passada grossa no int8, em blocos; reordena os candidatos com os vetores exatos
+            approx = np.empty(n, dtype=np.float32)
+            for start in range(0, n, self.CHUNK_ROWS):
+                block = q8[start:start + self.CHUNK_ROWS].astype(np.float32)
+                approx[start:start + len(block)] = (block @ query) * scales[start:start + len(block)]
+            shortlist = min(n, max(k * self.oversample, 100))
+            candidates = np.argpartition(-approx, shortlist - 1)[:shortlist]
+            candidates.sort()
+            scores = matrix[candidates] @ query
+            order = np.argsort(-scores)[:k]
+            return candidates[order], scores[order]
+
+        scores = np.asarray(matrix @ query)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return top, scores[top]
+
+    def get(self, ids=None, include=None):
+        """Documentos e metadados (todos ou só 'ids'), no formato do collection.get do Chroma."""
+        with self._lock:
+            if ids is None:
+                positions = range(len(self.ids))
+            else:
+                wanted = set(ids)
+                positions = [i for i, doc_id in enumerate(self.ids) if doc_id in wanted]
+            return {
+                "ids": [self.ids[i] for i in positions],
+                "documents": [self.documents[i] for i in positions],
+                "metadatas": [self.metadatas[i] for i in positions],
+            }
+
+    def query(self, query_texts=None, query_embeddings=None, n_results: int = 10):
+        """Mesmo formato de resposta do Chroma (listas por consulta); distância = 1 - cosseno."""
+        if query_embeddings is None:
+            query_embeddings = self._embed(query_texts)
+        result = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        for vector in query_embeddings:
+            top, scores = self.search(vector, n_results)
+            result["ids"].append([self.ids[i] for i in top])
+            result["documents"].append([self.documents[i] for i in top])
+            result["metadatas"].append([self.metadatas[i] for i in top])
+            result["distances"].append([float(1.0 - s) for s in scores])
+        return result
+
+    def close(self):
+        """Solta os mapeamentos (no Windows, arquivo mapeado não pode ser apagado/truncado)."""
+        with self._lock:
+            self._matrix = self._q8 = self._scales = None
+
+
+def migrate_from_chroma(storage_path, embedding_function=None, quantize: bool = False, batch: int = 1000,
+                        collection_name: str = "aeon_long_term_memory") -> int:
+    """
+    Copia bagagem/vector_db (Chroma) para bagagem/vector_np. Reaproveita os embeddings
+    gravados; só recalcula quando o Chroma não os devolve. Pode rodar de novo: ids que
+    já estão no destino são pulados. Retorna quantos vetores foram copiados.
+    """
+    import chromadb
+
+    client = chromadb.PersistentClient(path=os.path.join(str(storage_path), "vector_db"))
+    collection = client.get_collection(name=collection_name)
+    store = NumpyVectorStore(os.path.join(str(storage_path), "vector_np"), embedding_function=embedding_function,
+                             model_name="all-MiniLM-L6-v2", quantize=quantize)
+    known = set(store.ids)
+    total, copied = collection.count(), 0
+    start = time.perf_counter()
+
+    for offset in range(0, total, batch):
+        page = collection.get(limit=batch, offset=offset, include=["documents", "metadatas", "embeddings"])
+        rows = [(i, doc, meta, idx) for idx, (i, doc, meta) in
+                enumerate(zip(page["ids"], page["documents"], page["metadatas"] or [None] * len(page["ids"])))
+                if i not in known]
+        if not rows:
+            continue
+        embeddings = page.get("embeddings")
+        if embeddings is not None and len(embeddings):
+            vectors = [embeddings[idx] for _, _, _, idx in rows]
+        else:
+            vectors = None  # store.add recalcula com a embedding_function
+        store.add(
+            documents=[doc or "" for _, doc, _, _ in rows],
+            ids=[i for i, _, _, _ in rows],
+            metadatas=[meta or {} for _, _, meta, _ in rows],
+            embeddings=vectors,
+        )
+        copied += len(rows)
+        log_display(f"Migração: {min(offset + batch, total)}/{total}")
+
+    log_display(f"Migração concluída: {copied} vetores em {time.perf_counter() - start:.1f}s ({store.count()} no índice).")
+    store.close()
+    return copied
@@ -0,0 +1,111 @@
+import threading
+import time
+from collections import OrderedDict
+
+from PIL import Image
+
+
+def log_display(msg):
+    print(f"[VISION_CACHE] {msg}")
+
+
+def dhash(image: Image.Image, hash_size: int = 64) -> int:
+    """
+    Hash perceptual por diferença (dHash) da imagem reduzida.
+    Quadros quase idênticos (cursor piscando, relógio) dão hashes próximos.
+    Em telas, 64x64 separa janelas/parágrafos diferentes; a troca de um único
+    caractere em fonte pequena pode passar despercebida (use ver(cache=False)).
+    """
+    small = image.convert("L").resize((hash_size + 1, hash_size), Image.BILINEAR, reducing_gap=2.0)
+    pixels = small.tobytes()
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class VisionCache:
+    """
+    Cache das análises de imagem por hash perceptual.
+    Caminho rápido: 'vision_last_result' do ContextManager (último quadro lido);
+    depois um LRU com as últimas análises. Quadro "igual" = distância de Hamming
+    até 'max_distance' bits.
+    """
+    def __init__(self, max_entries: int = 32, max_distance: int = 2, ttl_s: float = 600,
+                 hash_size: int = 64, context=None):
+        self.max_entries = max_entries
+        self.max_distance = max_distance
+        self.ttl_s = ttl_s
+        self.hash_size = hash_size
+        self.context = context          # ContextManager (opcional)
+
+        self.entries = OrderedDict()    # hash -> (resultado, criado_em)
+        self.hits = 0
+        self.context_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def hash_image(self, image: Image.Image) -> int:
+        return dhash(image, self.hash_size)
+
+    def lookup(self, image_hash: int):
+        """Retorna a análise de um quadro quase idêntico, ou None."""
+        # 1. Caminho rápido: o último quadro analisado (compartilhado com os módulos)
+        if self.context is not None:
+            frame = self.context.get("vision_last_frame")
+            last_result = self.context.get("vision_last_result")
+            # Só vale se ninguém sobrescreveu o resultado depois (ex: uma mensagem de erro)
+            if frame and last_result == frame[1] and hamming(frame[0], image_hash) <= self.max_distance:
+                with self._lock:
+                    self.context_hits += 1
+                return last_result
+
+        # 2. LRU das análises recentes
+        now = time.time()
+        with self._lock:
+            best_key, best_dist = None, self.max_distance + 1
+            for key, (_, created_at) in list(self.entries.items()):
+                if now - created_at > self.ttl_s:
+                    del self.entries[key]
+                    continue
+                dist = hamming(key, image_hash)
+                if dist < best_dist:
+                    best_key, best_dist = key, dist
+            if best_key is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(best_key)
+            self.hits += 1
+            return self.entries[best_key][0]
+
+    def store(self, image_hash: int, result: str, last_frame: bool = True):
+        """Guarda a análise. last_frame=False (ex: recorte das mudanças) não vira o 'último quadro lido'."""
+        if not result:
+            return
+        with self._lock:
+            self.entries[image_hash] = (result, time.time())
+            self.entries.move_to_end(image_hash)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+        if self.context is not None and last_frame:
+            self.context.set("vision_last_frame", (image_hash, result), ttl=int(self.ttl_s))
+            self.context.set("vision_last_result", result, ttl=int(self.ttl_s))
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.context_hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "context_hits": self.context_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round((self.hits + self.context_hits) / lookups, 3) if lookups else 0.0,
+        }
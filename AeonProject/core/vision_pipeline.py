@@ -0,0 +1,150 @@
+import base64
+import time
+from io import BytesIO
+
+from PIL import Image
+
+
+def log_display(msg):
+    print(f"[VISION] {msg}")
+
+
+# Resolução/qualidade por modelo e se ele responde bem direto em português.
+# Modelos que só falam inglês (moondream) descrevem em inglês e passam por uma
+# tradução curta; os demais fazem tudo em uma única chamada.
+DEFAULT_PROFILES = {
+    "default": {"max_side": 1024, "quality": 70, "pt_native": True},
+    "llama-3.2-11b-vision": {"max_side": 1120, "quality": 70, "pt_native": True},
+    "llama-3.2-90b-vision": {"max_side": 1120, "quality": 70, "pt_native": True},
+    "llama3.2-vision": {"max_side": 1120, "quality": 75, "pt_native": True},
+    "moondream": {"max_side": 378, "quality": 80, "pt_native": False},
+    "llava": {"max_side": 672, "quality": 75, "pt_native": False},
+    "qwen2.5vl": {"max_side": 896, "quality": 75, "pt_native": True},
+    "minicpm-v": {"max_side": 896, "quality": 75, "pt_native": True},
+    "gemma3": {"max_side": 896, "quality": 75, "pt_native": True},
+}
+
+PROMPT_PT = "Descreva esta imagem em Português do Brasil de forma concisa."
+PROMPT_EN = "Describe this image concisely."
+TRANSLATE_SYSTEM = "Traduza o texto do usuário para Português do Brasil. Responda apenas com a tradução, sem comentários."
+
+
+class VisionProfiles:
+    """Perfis por modelo ('vision_profiles' no system.json sobrescreve/acrescenta)."""
+    def __init__(self, overrides: dict = None):
+        self.profiles = {k: dict(v) for k, v in DEFAULT_PROFILES.items()}
+        for name, profile in (overrides or {}).items():
+            self.profiles.setdefault(name, dict(DEFAULT_PROFILES["default"])).update(profile)
+
+    def max_side(self, models) -> int:
+        """Maior resolução usada pelos modelos dados (base para reduzir a captura uma vez)."""
+        return max(self.profile_for(m)["max_side"] for m in models)
+
+    def profile_for(self, model: str) -> dict:
+        if model in self.profiles:
+            return self.profiles[model]
+        # Aceita tags e prefixos: 'moondream:latest', 'llama-3.2-11b-vision-preview'
+        best = None
+        for name in self.profiles:
+            if name != "default" and model and model.startswith(name) and (best is None or len(name) > len(best)):
+                best = name
+        return self.profiles[best or "default"]
+
+
+class PreparedImage:
+    """
+    Imagem decodificada uma única vez e reaproveitada por todos os backends.
+    Aceita bytes (PNG/JPEG), uma PIL.Image já em memória (ex: pyautogui.screenshot())
+    ou um array NumPy RGB/RGBA (H, W, C). Com 'base_side', a captura é reduzida
+    uma única vez logo na entrada (4K -> maior resolução que algum modelo usa);
+    cada resolução menor sai dessa cópia e é codificada no máximo uma vez.
+    """
+    def __init__(self, source, base_side: int = None):
+        self.raw = source if isinstance(source, (bytes, bytearray)) else None
+        self.timings = {}
+        self._encoded = {}
+        self._scaled = {}
+        start = time.perf_counter()
+        try:
+            self.image = self._to_image(source)
+        except Exception as e:
+            log_display(f"Imagem não decodificada, enviando bytes originais: {e}")
+            self.image = None
+        self._mark("decode", start)
+
+        if self.image is None:
+            return
+        if base_side and max(self.image.size) > base_side:
+            start = time.perf_counter()
+            base = self.image.copy()
+            base.thumbnail((base_side, base_side))
+            self.image = base
+            self._mark("resize", start)
+        # Conversão depois da redução: bem mais barata que sobre a captura inteira
+        if self.image.mode != "RGB":
+            self.image = self.image.convert("RGB")
+
+    @staticmethod
+    def _to_image(source) -> Image.Image:
+        if isinstance(source, Image.Image):
+            image = source                      # Já está em memória: sem PNG intermediário
+        elif hasattr(source, "__array_interface__"):
+            image = Image.fromarray(source)     # Buffer NumPy (sem importar numpy aqui)
+        else:
+            image = Image.open(BytesIO(source))
+            image.load()
+        return image
+
+    def _mark(self, stage: str, start: float):
+        self.timings[stage] = self.timings.get(stage, 0.0) + (time.perf_counter() - start) * 1000
+
+    def downscaled(self, max_side: int) -> Image.Image:
+        """Cópia com o maior lado limitado a max_side (a original se já couber)."""
+        img = self._scaled.get(max_side)
+        if img is None:
+            img = self.image
+            if max(img.size) > max_side:
+                img = img.copy()
+                img.thumbnail((max_side, max_side))
+            self._scaled[max_side] = img
+        return img
+
+    def jpeg(self, max_side: int, quality: int) -> bytes:
+        """JPEG com o maior lado limitado a max_side."""
+        if self.image is None:
+            return self.raw
+        key = (max_side, quality)
+        if key not in self._encoded:
+            start = time.perf_counter()
+            buf = BytesIO()
+            self.downscaled(max_side).save(buf, format="JPEG", quality=quality)
+            self._encoded[key] = buf.getvalue()
+            self._mark(f"encode_{max_side}", start)
+        return self._encoded[key]
+
+    def for_profile(self, profile: dict) -> bytes:
+        return self.jpeg(profile["max_side"], profile["quality"])
+
+    def b64_for_profile(self, profile: dict) -> str:
+        return base64.b64encode(self.for_profile(profile)).decode("utf-8")
+
+    def timed(self, stage: str):
+        """Context manager para cronometrar um estágio (rede, modelo, tradução)."""
+        return _Stage(self, stage)
+
+    def summary(self) -> str:
+        return " | ".join(f"{k} {v:.0f}ms" for k, v in self.timings.items())
+
+
+class _Stage:
+    def __init__(self, prepared: PreparedImage, stage: str):
+        self.prepared = prepared
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.prepared._mark(self.stage, self.start)
+        return False
@@ -0,0 +1,36 @@
+import argparse
+import os
+import sys
+
+# Ajusta caminho para encontrar os módulos
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from core.config_manager import ConfigManager
+from core.vector_store import migrate_from_chroma
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migra a memória de longo prazo do Chroma para o índice NumPy (memmap).")
+    parser.add_argument("--batch", type=int, default=1000, help="Vetores lidos do Chroma por vez")
+    parser.add_argument("--quantize", action="store_true", help="Gera também a cópia int8 para buscas grandes")
+    parser.add_argument("--ativar", action="store_true", help="Ao terminar, define vector_backend = numpy no system.json")
+    args = parser.parse_args()
+
+    config = ConfigManager()
+    storage_path = str(config.storage_path)
+    if not os.path.isdir(os.path.join(storage_path, "vector_db")):
+        print(f"[MIGRAR] Nada para migrar: {os.path.join(storage_path, 'vector_db')} não existe.")
+        return
+
+    copied = migrate_from_chroma(storage_path, quantize=args.quantize, batch=args.batch)
+    print(f"[MIGRAR] {copied} vetores copiados para {os.path.join(storage_path, 'vector_np')}")
+
+    if args.ativar:
+        config.set_system_data("vector_backend", "numpy")
+        if args.quantize:
+            config.set_system_data("vector_quantize", True)
+        print("[MIGRAR] vector_backend = numpy. O Chroma antigo (vector_db) pode ser apagado depois de conferir.")
+
+
+if __name__ == "__main__":
+    main()
@@ -250,7 +250,7 @@ class DevFactory(AeonModule):
             return
 
         plan_prompt = f"Crie um plano conciso para o seguinte objetivo:\n{objective}"
-        initial_plan = brain.pensar(prompt=plan_prompt, historico_txt="", user_prefs={})
+        initial_plan = brain.pensar(prompt=plan_prompt, historico_txt="", user_prefs={}, origem="dev")
         
         gui.after(0, lambda: gui.add_message(f"**Plano:**\n{initial_plan}", "DevFactory"))
         if io_handler: io_handler.falar("Plano criado. Verifique a interface.")
@@ -275,7 +275,7 @@ class DevFactory(AeonModule):
         Não omita nenhum arquivo.
         """
         
-        full_response = brain.pensar(prompt=code_prompt, historico_txt=f"Plano Aprovado:\n{initial_plan}", user_prefs={})
+        full_response = brain.pensar(prompt=code_prompt, historico_txt=f"Plano Aprovado:\n{initial_plan}", user_prefs={}, origem="dev")
         gui.after(0, lambda: gui.add_message(f"**Código Gerado:**\n{full_response}", "DevFactory"))
         
         # 3. Parse e Criação Física
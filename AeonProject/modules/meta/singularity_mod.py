@@ -110,12 +110,15 @@ class SingularityModule(AeonModule):
     def _generate_module_thread(self, prompt, brain, mm):
         gui = self.core_context.get("gui")
         try:
-            resp = brain.pensar(prompt, "")
+            resp = brain.pensar(prompt, "", origem="singularity")
             code = self._extract_code(resp)
             
             if code and self._save_module(code):
-                if mm: mm.scan_new_modules()
-                msg = f"Módulo '{self.temp_data['name']}' CRIADO e CARREGADO com sucesso."
+                # Carrega só o módulo novo, sem reiniciar a frota inteira
+                if mm and mm.load_module(self.temp_data["path"]) is None:
+                    msg = f"Módulo '{self.temp_data['name']}' CRIADO, mas não carregou (veja o log)."
+                else:
+                    msg = f"Módulo '{self.temp_data['name']}' CRIADO e CARREGADO com sucesso."
             else:
                 msg = f"Falha ao gerar código válido para '{self.temp_data['name']}'."
         except Exception as e:
@@ -156,7 +159,8 @@ DIRETRIZES:
             prompt=f"Realize a análise solicitada: {focus}",
             historico_txt="",
             user_prefs={},
-            system_override=system_persona
+            system_override=system_persona,
+            origem="singularity"
         )
         
         if gui:
@@ -196,7 +200,9 @@ DIRETRIZES:
             base = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", name))
             os.makedirs(base, exist_ok=True)
             with open(os.path.join(base, "__init__.py"), "w", encoding='utf-8') as f: f.write("")
-            with open(os.path.join(base, f"{name}_mod.py"), "w", encoding='utf-8') as f: f.write(code)
+            path = os.path.join(base, f"{name}_mod.py")
+            with open(path, "w", encoding='utf-8') as f: f.write(code)
+            self.temp_data["path"] = path
             return True
         except: return False
 
@@ -0,0 +1,191 @@
+import time
+
+from PIL import Image, ImageChops
+
+try:
+    import pyautogui
+    PYAUTOGUI_AVAILABLE = True
+except ImportError:
+    PYAUTOGUI_AVAILABLE = False
+
+try:
+    import pygetwindow
+    WINDOW_AVAILABLE = True
+except ImportError:
+    WINDOW_AVAILABLE = False
+
+
+def log_display(msg):
+    print(f"[CAPTURA] {msg}")
+
+
+def active_window_region():
+    """(x, y, largura, altura) da janela em foco, ou None se não der para saber."""
+    if not WINDOW_AVAILABLE:
+        return None
+    try:
+        win = pygetwindow.getActiveWindow()
+        if win and win.width > 0 and win.height > 0:
+            return (max(0, win.left), max(0, win.top), win.width, win.height)
+    except Exception as e:
+        log_display(f"Janela ativa indisponível: {e}")
+    return None
+
+
+class TileChangeDetector:
+    """
+    Compara a captura atual com a anterior em blocos (tiles) e devolve as
+    regiões que mudaram, já agrupadas em retângulos (blocos vizinhos se juntam).
+    A comparação é feita numa cópia em tons de cinza reduzida ('scale').
+    """
+    def __init__(self, tile: int = 32, scale: int = 4, threshold: int = 24,
+                 margin: int = 8, max_regions: int = 4, full_frame_ratio: float = 0.6):
+        self.tile = tile                    # Tamanho do bloco na imagem reduzida
+        self.scale = scale
+        self.threshold = threshold          # Diferença mínima de pixel (0-255) que conta
+        self.margin = margin                # Folga em pixels (resolução original)
+        self.max_regions = max_regions
+        self.full_frame_ratio = full_frame_ratio
+        self.previous = None
+        self.previous_size = None
+
+    def reset(self):
+        self.previous = None
+        self.previous_size = None
+
+    def _gray(self, image: Image.Image) -> Image.Image:
+        w, h = image.size
+        return image.convert("L").resize((max(1, w // self.scale), max(1, h // self.scale)), Image.BILINEAR)
+
+    def observe(self, image: Image.Image):
+        """Só atualiza a base de comparação (capturas lidas por inteiro)."""
+        self.previous = self._gray(image)
+        self.previous_size = image.size
+
+    def changed_tiles(self, image: Image.Image):
+        """Conjunto de (coluna, linha) dos blocos alterados; None se não há base de comparação."""
+        gray = self._gray(image)
+        previous, self.previous = self.previous, gray
+        same_size = self.previous_size == image.size
+        self.previous_size = image.size
+        if previous is None or not same_size:
+            return None
+
+        mask = ImageChops.difference(previous, gray).point(lambda p: 255 if p > self.threshold else 0)
+        if mask.getbbox() is None:
+            return set()
+        w, h = mask.size
+        changed = set()
+        for row in range(0, (h + self.tile - 1) // self.tile):
+            for col in range(0, (w + self.tile - 1) // self.tile):
+                box = (col * self.tile, row * self.tile, min(w, (col + 1) * self.tile), min(h, (row + 1) * self.tile))
+                if mask.crop(box).getbbox() is not None:
+                    changed.add((col, row))
+        return changed
+
+    def _group(self, tiles):
+        """Agrupa blocos vizinhos (8-conectados) e devolve o retângulo de cada grupo."""
+        remaining, groups = set(tiles), []
+        while remaining:
+            stack = [remaining.pop()]
+            cols, rows = [], []
+            while stack:
+                col, row = stack.pop()
+                cols.append(col)
+                rows.append(row)
+                for dc in (-1, 0, 1):
+                    for dr in (-1, 0, 1):
+                        neighbour = (col + dc, row + dr)
+                        if neighbour in remaining:
+                            remaining.remove(neighbour)
+                            stack.append(neighbour)
+            groups.append((min(cols), min(rows), max(cols) + 1, max(rows) + 1))
+        return groups
+
+    def changed_regions(self, image: Image.Image):
+        """
+        Regiões alteradas em coordenadas da imagem original.
+        None = sem base (primeira captura) ou mudança grande demais: use o quadro inteiro.
+        [] = nada mudou.
+        """
+        tiles = self.changed_tiles(image)
+        if tiles is None:
+            return None
+        if not tiles:
+            return []
+
+        grid_w = (image.size[0] // self.scale + self.tile - 1) // self.tile
+        grid_h = (image.size[1] // self.scale + self.tile - 1) // self.tile
+        if len(tiles) >= grid_w * grid_h * self.full_frame_ratio:
+            return None
+
+        px = self.tile * self.scale
+        regions = []
+        for c0, r0, c1, r1 in self._group(tiles):
+            regions.append((
+                max(0, c0 * px - self.margin),
+                max(0, r0 * px - self.margin),
+                min(image.size[0], c1 * px + self.margin),
+                min(image.size[1], r1 * px + self.margin),
+            ))
+        if len(regions) > self.max_regions:
+            # Muitas manchas soltas: um retângulo só cobrindo todas
+            regions = [(min(r[0] for r in regions), min(r[1] for r in regions),
+                        max(r[2] for r in regions), max(r[3] for r in regions))]
+        return sorted(regions, key=lambda r: (r[1], r[0]))
+
+
+def stitch(image: Image.Image, regions, gap: int = 12) -> Image.Image:
+    """Empilha as regiões recortadas numa única imagem (uma chamada ao modelo)."""
+    crops = [image.crop(r) for r in regions]
+    if len(crops) == 1:
+        return crops[0]
+    width = max(c.size[0] for c in crops)
+    height = sum(c.size[1] for c in crops) + gap * (len(crops) - 1)
+    canvas = Image.new("RGB", (width, height), (128, 128, 128))
+    y = 0
+    for crop in crops:
+        canvas.paste(crop, (0, y))
+        y += crop.size[1] + gap
+    return canvas
+
+
+class ScreenCapture:
+    """
+    Captura da tela inteira, da janela ativa ou de uma região, com detecção
+    de mudanças em relação à captura anterior do mesmo alvo.
+    """
+    def __init__(self, detector: TileChangeDetector = None):
+        self.detector = detector or TileChangeDetector()
+        self.last_target = None     # ("tela" | "janela" | "regiao", região)
+        self.last_capture_ms = 0.0
+
+    def grab(self, mode: str = "tela", region=None) -> Image.Image:
+        """Captura conforme o modo; 'janela' cai para a tela inteira se não achar a janela."""
+        if mode == "janela":
+            region = active_window_region()
+            if region is None:
+                log_display("Janela ativa não encontrada; capturando a tela inteira.")
+                mode = "tela"
+        start = time.perf_counter()
+        image = pyautogui.screenshot(region=region) if region else pyautogui.screenshot()
+        self.last_capture_ms = (time.perf_counter() - start) * 1000
+
+        target = (mode, tuple(region) if region else None)
+        if target != self.last_target:
+            self.detector.reset()   # Outro alvo: não há o que comparar
+        self.last_target = target
+        return image
+
+    def grab_changes(self, mode: str = None, region=None):
+        """
+        Captura o último alvo (ou o indicado) e devolve (imagem_para_análise, regiões).
+        regiões == [] -> nada mudou; None -> quadro inteiro.
+        """
+        if mode is None and self.last_target:
+            mode, region = self.last_target
+        image = self.grab(mode or "tela", region)
+        regions = self.detector.changed_regions(image)
+        if regions:
+            return stitch(image, regions), regions
+        return image, regions
@@ -1,6 +1,9 @@
-from io import BytesIO
+import re
+
 from modules.base_module import AeonModule
 
+from modules.visao.screen_capture import ScreenCapture
+
 # SAFE IMPORT V80
 try:
     import pyautogui
@@ -12,9 +15,22 @@ class VisaoModule(AeonModule):
     def __init__(self, core_context):
         super().__init__(core_context)
         self.name = "Visao"
-        self.triggers = ["veja isso", "leia a tela", "analise a imagem"]
+        self.triggers = [
+            "veja isso", "leia a tela", "analise a imagem",
+            "leia a janela", "veja a janela", "leia a região", "leia a regiao",
+            "o que mudou na tela", "mudanças na tela",
+        ]
         # Removemos dependencia hardcoded para não travar o carregamento
         self.dependencies = ["brain", "context"]
+        self.capture = ScreenCapture() if VISAO_AVAILABLE else None
+
+    @property
+    def metadata(self):
+        return {
+            "version": "1.1.0",
+            "author": "Aeon Core",
+            "description": "Lê a tela, a janela ativa ou uma região e descreve o que mudou desde a última leitura."
+        }
 
     def check_dependencies(self):
         if not VISAO_AVAILABLE:
@@ -22,23 +38,55 @@ class VisaoModule(AeonModule):
             return True # Retorna True para não matar o sistema, apenas fica inativo
         return super().check_dependencies()
 
+    @staticmethod
+    def _parse_region(command: str):
+        """'leia a região 100 200 800 600' -> (x, y, largura, altura)."""
+        nums = [int(n) for n in re.findall(r"\d+", command)]
+        if len(nums) >= 4 and nums[2] > 0 and nums[3] > 0:
+            return tuple(nums[:4])
+        return None
+
     def process(self, command: str) -> str:
         if not VISAO_AVAILABLE:
             return "Erro: Instale 'pyautogui' para usar a visão."
-            
+
         brain = self.core_context.get("brain")
         ctx = self.core_context.get("context")
+        cmd = command.lower()
 
         try:
-            screenshot = pyautogui.screenshot()
-            img_byte_arr = BytesIO()
-            screenshot.save(img_byte_arr, format='PNG')
-            
-            analise = brain.ver(img_byte_arr.getvalue())
-
-            if ctx:
-                ctx.set("vision_last_result", analise, ttl=600)
-            
-            return f"Visão: {analise}"
+            if "mudou" in cmd or "mudanças" in cmd:
+                # Só os blocos que mudaram desde a última captura vão para o modelo
+                image, regions = self.capture.grab_changes()
+                if regions == []:
+                    anterior = ctx.get("vision_last_result") if ctx else None
+                    return "Nada mudou na tela desde a última leitura." + (f" Última leitura: {anterior}" if anterior else "")
+                prefixo = f"Mudanças ({len(regions)} região(ões)): " if regions else ""
+                parcial = bool(regions)     # None: primeira leitura, quadro inteiro
+            else:
+                if "janela" in cmd:
+                    image = self.capture.grab("janela")
+                elif "região" in cmd or "regiao" in cmd:
+                    region = self._parse_region(cmd)
+                    if region is None:
+                        return "Diga a região assim: 'leia a região X Y LARGURA ALTURA'."
+                    image = self.capture.grab("regiao", region)
+                else:
+                    image = self.capture.grab("tela")
+                self.capture.detector.observe(image)  # Base para o próximo "o que mudou"
+                prefixo = ""
+                parcial = False
+
+            # A captura vai direto em memória: o Brain reduz e codifica uma única vez
+            # "de novo"/"novamente" ignora o cache de quadros repetidos
+            nova = any(w in cmd for w in ("de novo", "novamente"))
+            analise = brain.ver(image, cache=not nova, quadro_inteiro=not parcial)
+
+            if ctx and getattr(brain, "last_vision_ok", True):
+                # Análise falha ou sem tradução não vira "última leitura";
+                # o recorte das mudanças fica à parte para não virar resumo parcial da tela
+                ctx.set("vision_last_changes" if parcial else "vision_last_result", analise, ttl=600)
+
+            return f"Visão: {prefixo}{analise}"
         except Exception as e:
-            return f"Erro visual: {e}"
\ No newline at end of file
+            return f"Erro visual: {e}"
@@ -74,7 +74,7 @@ class WebModule(AeonModule):
             if "erro" in contexto.lower(): return contexto
             
             prompt_final = f"Com base no seguinte texto, responda de forma concisa à pergunta: '{query}'\n\nTexto: {contexto}"
-            return brain.pensar(prompt_final)
+            return brain.pensar(prompt_final, origem="web")
 
         # Clima
         if "tempo em" in command or "clima em" in command:
@@ -102,7 +102,7 @@ class WebModule(AeonModule):
                 if "erro" in contexto.lower(): return contexto
 
                 prompt_final = f"Resuma o seguinte texto de forma concisa:\n\n{contexto}"
-                return brain.pensar(prompt_final)
+                return brain.pensar(prompt_final, origem="web")
 
         return ""
 
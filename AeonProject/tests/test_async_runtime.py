@@ -0,0 +1,59 @@
+import unittest
+import sys
+import os
+import asyncio
+import threading
+import time
+
+# Adiciona caminho ao projeto
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from core.async_runtime import AsyncRuntime
+
+
+class TestAsyncRuntime(unittest.TestCase):
+    """Testes para o event loop compartilhado do Brain"""
+
+    def setUp(self):
+        self.runtime = AsyncRuntime(name="test-async")
+
+    def tearDown(self):
+        self.runtime.stop()
+
+    def test_run_returns_result(self):
+        """run() bloqueia a thread chamadora até a corrotina terminar"""
+        async def soma(a, b):
+            await asyncio.sleep(0.01)
+            return a + b
+        self.assertEqual(self.runtime.run(soma(2, 3)), 5)
+
+    def test_threads_multiplex_on_one_loop(self):
+        """Chamadas de várias threads rodam concorrentes no mesmo loop"""
+        loops = []
+
+        async def tarefa():
+            loops.append(asyncio.get_running_loop())
+            await asyncio.sleep(0.2)
+
+        start = time.perf_counter()
+        threads = [threading.Thread(target=self.runtime.run, args=(tarefa(),)) for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertLess(time.perf_counter() - start, 0.6)
+        self.assertEqual(set(loops), {self.runtime.loop})
+
+    def test_run_from_loop_thread_raises(self):
+        """Chamar run() de dentro do loop seria deadlock: falha na hora"""
+        async def chama_run():
+            async def nada():
+                return None
+            with self.assertRaises(RuntimeError):
+                self.runtime.run(nada())
+            return True
+        self.assertTrue(self.runtime.run(chama_run()))
+
+
+if __name__ == "__main__":
+    unittest.main()
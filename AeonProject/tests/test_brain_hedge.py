@@ -0,0 +1,109 @@
+import unittest
+import sys
+import os
+import threading
+import time
+
+# Adiciona caminho ao projeto e aos utilitários de teste da raiz (fake_llm_server)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "tests"))
+
+from fake_llm_server import FakeLLMServer
+from core.brain import AeonBrain
+
+
+class TestBrainHedge(unittest.TestCase):
+    """Hedging nuvem x local contra o servidor falso (modo 'race')"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeLLMServer(latency_s=0.01).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.server.configure(None, fail_next=0, error_rate=0.0, latency_s=0.01)
+        self.server.reset_stats()
+        self.brain = AeonBrain({
+            "GROQ_KEY": "gsk_teste",
+            "groq_base_url": self.server.url,
+            "ollama_host": self.server.url,
+            "local_keepalive": False,
+            "hedge_mode": "race",
+        })
+        # Anota quando cada tentativa termina e com que resultado
+        self.finished = {}
+        self.all_done = threading.Event()
+        consumir = self.brain._consumir
+
+        def spy(backend, *args):
+            result = consumir(backend, *args)
+            self.finished[backend] = (result, time.perf_counter())
+            if len(self.finished) == 2:
+                self.all_done.set()
+            return result
+
+        self.brain._consumir = spy
+
+    def tearDown(self):
+        if self.brain.scheduler:
+            self.brain.scheduler.stop()
+
+    def test_local_wins(self):
+        """Nuvem lenta: o local responde e o pedido registra o hedge como fallback"""
+        self.server.configure("groq", latency_s=2.0)
+        resposta = self.brain.pensar("quem ganha")
+        self.assertTrue(resposta.startswith("[ollama:"))
+        self.assertEqual(self.brain.metrics.recent(1)[0]["fallback"], "hedge")
+
+    def test_cloud_wins(self):
+        self.server.configure("ollama", latency_s=2.0)
+        resposta = self.brain.pensar("quem ganha")
+        self.assertTrue(resposta.startswith("[groq:"))
+        self.assertEqual(self.brain.metrics.recent(1)[0]["backend"], "groq")
+
+    def test_both_fail(self):
+        """Os dois falham no hedge: erro direto, sem repetir a cascata Groq -> Ollama"""
+        self.server.configure("groq", fail_next=1)
+        self.server.configure("ollama", fail_next=1)
+        resposta = self.brain.pensar("ninguém responde")
+        self.assertIn("sem conexão", resposta)
+        stats = self.server.get_stats()
+        self.assertEqual(stats["groq"]["requests"], 1)
+        self.assertEqual(stats["ollama"]["requests"], 1)
+        self.assertFalse(self.brain.metrics.recent(1)[0]["ok"])
+        # As falhas nas threads do hedge caem no pedido certo
+        backends = self.brain.get_llm_metrics()["backends"]
+        self.assertEqual(backends["groq:llama-3.3-70b-versatile"]["errors"], 1)
+        self.assertEqual(backends["ollama:llama3.2:latest"]["errors"], 1)
+
+    def test_saturated_pool_skips_hedge(self):
+        """Sem vaga no pool do hedge, o pedido vai pela cascata normal em vez de esperar na fila"""
+        vagas = int(self.brain.config.get("brain_max_concurrency", 4))
+        for _ in range(vagas):
+            self.assertTrue(self.brain._hedge_vagas.acquire(blocking=False))
+        try:
+            self.assertTrue(self.brain.pensar("sem vaga").startswith("[groq:"))
+        finally:
+            for _ in range(vagas):
+                self.brain._hedge_vagas.release()
+        self.assertEqual(self.server.get_stats()["ollama"]["requests"], 0)
+        self.assertEqual(self.finished, {})
+
+    def test_loser_cancelled_before_first_token(self):
+        """O perdedor parado esperando o primeiro token tem a conexão derrubada na hora"""
+        self.server.configure("groq", latency_s=3.0)
+        start = time.perf_counter()
+        self.assertTrue(self.brain.pensar("corrida").startswith("[ollama:"))
+        self.assertTrue(self.all_done.wait(1.5))
+        result, ended = self.finished["nuvem"]
+        self.assertIsNone(result)
+        self.assertLess(ended - start, 1.5)
+        # Cancelamento não é falha da nuvem: o disjuntor continua fechado
+        self.assertTrue(self.brain._nuvem_disponivel())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,209 @@
+import unittest
+import sys
+import os
+import asyncio
+import tempfile
+from unittest.mock import patch
+
+# Adiciona caminho ao projeto e aos utilitários de teste da raiz (fake_llm_server)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "tests"))
+
+from fake_llm_server import FakeLLMServer
+from core.brain import AeonBrain
+from core.response_cache import ResponseCache
+from PIL import Image
+
+
+class BrainOfflineTestCase(unittest.TestCase):
+    """AeonBrain completo contra o servidor falso (sem rede, sem Ollama)"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeLLMServer(latency_s=0.01).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.server.configure(None, fail_next=0, error_rate=0.0, latency_s=0.01)
+        self.server.reset_stats()
+        self.brain = AeonBrain({
+            "GROQ_KEY": "gsk_teste",
+            "groq_base_url": self.server.url,
+            "ollama_host": self.server.url,
+            "local_keepalive": False,
+        })
+
+    def tearDown(self):
+        if self.brain.scheduler:
+            self.brain.scheduler.stop()
+
+
+class TestBrainOffline(BrainOfflineTestCase):
+    def test_connects_to_both_backends(self):
+        """Nuvem online e modelos locais listados pelo servidor falso"""
+        self.assertTrue(self.brain.online)
+        self.assertTrue(self.brain.local_ready)
+        self.assertIn("llama3.2:latest", self.brain.available_models)
+
+    def test_cloud_answer(self):
+        """Com a nuvem saudável a resposta vem do Groq"""
+        resposta = self.brain.pensar("qual a capital do Brasil")
+        self.assertTrue(resposta.startswith("[groq:"))
+        self.assertIn("capital do Brasil", resposta)
+
+    def test_failover_to_local(self):
+        """Nuvem devolvendo 503: cai para o Ollama e abre o disjuntor"""
+        self.server.configure("groq", fail_next=10, error_status=503)
+        resposta = self.brain.pensar("teste de falha")
+        self.assertTrue(resposta.startswith("[ollama:"))
+        self.assertFalse(self.brain._nuvem_disponivel())
+
+    def test_apensar_from_two_loops(self):
+        """Clientes assíncronos são por loop: um segundo asyncio.run (loop novo) também responde"""
+        for _ in range(2):
+            resposta = asyncio.run(self.brain.apensar("pergunta assíncrona"))
+            self.assertTrue(resposta.startswith("[groq:"))
+        self.assertEqual(self.server.get_stats()["groq"]["requests"], 2)
+
+    def test_streaming(self):
+        """O stream remonta a mesma resposta que o servidor enviou em pedaços"""
+        texto = "".join(self.brain.pensar_stream("conte uma história"))
+        self.assertTrue(texto.startswith("[groq:"))
+        self.assertEqual(self.server.get_stats()["groq"]["streams"], 1)
+
+    def test_stream_goes_through_scheduler(self):
+        """O stream ocupa um worker como pedido interativo e conta na cota da nuvem"""
+        "".join(self.brain.pensar_stream("conte uma história"))
+        scheduler = self.brain.get_scheduler_metrics()
+        self.assertEqual(scheduler["completed"], {"interativo": 1})
+        self.assertEqual(scheduler["cloud_calls_last_min"], 1)
+        self.assertEqual(self.brain.metrics.recent(1)[0]["backend"], "groq")
+
+    def test_retries_count_against_cloud_quota(self):
+        """Cada requisição ao Groq (inclusive as repetidas pelo SDK) entra na cota; o Ollama não"""
+        self.server.configure("groq", fail_next=10, error_status=503)
+        self.brain.pensar("teste de falha")
+        self.assertEqual(self.brain.get_scheduler_metrics()["cloud_calls_last_min"],
+                         self.server.get_stats()["groq"]["requests"])
+
+    def test_stream_failover_records_groq_errors(self):
+        """No stream as falhas do Groq também caem no pedido (que não é o 'atual' entre os yields)"""
+        self.server.configure("groq", fail_next=10, error_status=503)
+        texto = "".join(self.brain.pensar_stream("conte uma história"))
+        self.assertTrue(texto.startswith("[ollama:"))
+        registro = self.brain.metrics.recent(1)[0]
+        self.assertEqual(len(registro["failures"]), self.server.get_stats()["groq"]["errors"])
+        self.assertEqual(registro["failures"][0]["model"], "llama-3.3-70b-versatile")
+
+    def test_metrics_per_request(self):
+        """Cada pedido registra backend, tokens informados pelo servidor e motivo do fallback"""
+        self.brain.pensar("primeira pergunta")
+        self.server.configure("groq", fail_next=10, error_status=503)
+        self.brain.pensar("segunda pergunta")
+
+        nuvem, local = self.brain.metrics.recent(2)
+        self.assertEqual(nuvem["backend"], "groq")
+        self.assertFalse(nuvem["tokens_estimated"])
+        self.assertGreater(nuvem["completion_tokens"], 0)
+        self.assertEqual(local["backend"], "ollama")
+        self.assertEqual(local["fallback"], "servidor")
+        self.assertIn("ollama:llama3.2:latest", self.brain.get_llm_metrics()["backends"])
+        # Cada chamada que falhou (inclusive as repetidas pelo SDK) conta contra o Groq
+        groq = self.brain.get_llm_metrics()["backends"]["groq:llama-3.3-70b-versatile"]
+        servidor = self.server.get_stats()["groq"]
+        self.assertGreater(groq["errors"], 0)
+        self.assertEqual((groq["requests"], groq["errors"]), (servidor["requests"], servidor["errors"]))
+        self.assertEqual(len(local["failures"]), servidor["errors"])
+
+
+class TestBrainResponseCache(BrainOfflineTestCase):
+    """Quem entra no cache de respostas (o Brain de teste não tem ConfigManager: o cache é ligado à mão)"""
+
+    def setUp(self):
+        super().setUp()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.brain.response_cache = ResponseCache(self.tmp.name)
+        self.addCleanup(self.brain.response_cache.close)
+
+    def test_interactive_cached(self):
+        self.brain.pensar("qual a capital do Brasil")
+        self.brain.pensar("qual a capital do Brasil")
+        self.assertEqual(self.server.get_stats()["groq"]["requests"], 1)
+        self.assertEqual(self.brain.metrics.recent(1)[0]["backend"], "cache")
+        # Resposta do cache não gasta a cota da nuvem no scheduler
+        self.assertEqual(self.brain.get_scheduler_metrics()["cloud_calls_last_min"], 1)
+
+    def test_hit_across_turns(self):
+        """Histórico e memórias mudam a cada turno e não entram na chave"""
+        self.brain.pensar("qual a capital do Brasil", historico_txt="", long_term_context="")
+        self.brain.pensar("qual a capital do Brasil", historico_txt="Usuário: oi\nAeon: Olá!\n",
+                          long_term_context="Usuário perguntou: qual a capital do Brasil")
+        self.assertEqual(self.server.get_stats()["groq"]["requests"], 1)
+        self.assertEqual(self.brain.metrics.recent(1)[0]["backend"], "cache")
+
+    def test_follow_up_not_cached(self):
+        self.brain.pensar("explique isso melhor", historico_txt="Usuário: o que é DNS?\n")
+        self.brain.pensar("explique isso melhor", historico_txt="Usuário: o que é TCP?\n")
+        self.assertEqual(self.server.get_stats()["groq"]["requests"], 2)
+        self.assertEqual(len(self.brain.response_cache.entries), 0)
+
+    def test_background_origin_not_cached(self):
+        """Pedidos de fundo (web, dev, singularity) não leem nem gravam o cache"""
+        self.brain.pensar("qual a capital do Brasil", origem="web")
+        self.assertEqual(len(self.brain.response_cache.entries), 0)
+        self.brain.pensar("qual a capital do Brasil")
+        self.brain.pensar("qual a capital do Brasil", origem="web")
+        self.assertEqual(self.server.get_stats()["groq"]["requests"], 3)
+        self.assertEqual(self.brain.metrics.recent(1)[0]["cache"], "bypass")
+
+    def test_system_override_not_cached(self):
+        self.brain.pensar("traduza isto", system_override="Traduza para português.")
+        self.brain.pensar("traduza isto", system_override="Traduza para português.")
+        self.assertEqual(len(self.brain.response_cache.entries), 0)
+        self.assertEqual(self.server.get_stats()["groq"]["requests"], 2)
+
+    def test_answer_keyed_by_model(self):
+        """Resposta do local (nuvem fora) não é servida quando a nuvem volta"""
+        self.server.configure("groq", fail_next=10, error_status=503)
+        self.assertTrue(self.brain.pensar("quem é você").startswith("[ollama:"))
+        self.assertEqual(next(iter(self.brain.response_cache.entries.values()))["model"], "llama3.2:latest")
+        self.server.configure("groq", fail_next=0)
+        self.brain.reconectar()
+        self.assertTrue(self.brain.pensar("quem é você").startswith("[groq:"))
+
+
+class TestBrainVisionTranslation(BrainOfflineTestCase):
+    """Visão local só em inglês (moondream): a tradução falha sem virar resposta boa"""
+
+    def setUp(self):
+        super().setUp()
+        self.brain.online = False   # Sem nuvem: a visão cai no modelo local
+        self.image = Image.new("RGB", (640, 360), (30, 60, 90))
+
+    def test_translated_and_cached(self):
+        resposta = self.brain.ver(self.image)
+        self.assertTrue(resposta.startswith("[ollama:llama3.2"))   # Tradução feita pelo modelo de texto
+        self.assertTrue(self.brain.last_vision_ok)
+        self.assertEqual(len(self.brain.vision_cache.entries), 1)
+
+    def test_failed_translation_not_cached(self):
+        """Os dois LLMs fora na tradução: devolve o inglês com ok=False e não grava no cache de visão"""
+        erro = ("Desculpe, estou sem conexão e sem um cérebro local funcional.", False)
+        with patch.object(self.brain, "_gerar", return_value=erro) as gerar:
+            resposta = self.brain.ver(self.image)
+        self.assertTrue(resposta.startswith("[ollama:moondream"))
+        self.assertNotIn("sem conexão", resposta)
+        self.assertFalse(self.brain.last_vision_ok)
+        self.assertEqual(len(self.brain.vision_cache.entries), 0)
+        traducao, visao = self.brain.metrics.recent(2)
+        self.assertEqual((traducao["kind"], traducao["ok"]), ("traducao", False))
+        self.assertEqual((visao["kind"], visao["ok"]), ("visao", False))
+        self.assertEqual(gerar.call_args[0][1], resposta)
+
+
+if __name__ == "__main__":
+    unittest.main()
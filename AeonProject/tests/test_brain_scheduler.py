@@ -0,0 +1,129 @@
+import unittest
+import sys
+import os
+import threading
+import time
+
+# Adiciona caminho ao projeto
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from core.brain_scheduler import BrainScheduler
+
+
+class TestBrainScheduler(unittest.TestCase):
+    """Testes para a fila de prioridade na frente do Brain"""
+
+    def tearDown(self):
+        self.scheduler.stop()
+
+    def test_interactive_jumps_the_queue(self):
+        """Com o worker ocupado, o interativo sai antes dos pedidos de segundo plano"""
+        self.scheduler = BrainScheduler(workers=1, source_limits={"dev": 5})
+        gate = threading.Event()
+        order = []
+
+        self.scheduler.submit(gate.wait, origem="dev")
+        time.sleep(0.05)
+        tickets = [self.scheduler.submit(order.append, f"dev{i}", origem="dev") for i in range(3)]
+        tickets.append(self.scheduler.submit(order.append, "usuario"))
+        gate.set()
+        for t in tickets:
+            t.wait(2)
+        self.assertEqual(order[0], "usuario")
+
+    def test_source_limit_leaves_room_for_user(self):
+        """Limite por origem: duas gerações longas não ocupam os dois workers"""
+        self.scheduler = BrainScheduler(workers=2, source_limits={"dev": 1})
+        gate = threading.Event()
+        self.scheduler.submit(gate.wait, origem="dev")
+        self.scheduler.submit(gate.wait, origem="dev")
+        start = time.perf_counter()
+        self.assertEqual(self.scheduler.run(lambda: "ok"), "ok")
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertEqual(self.scheduler.get_metrics()["queue_by_source"], {"dev": 1})
+        gate.set()
+
+    def test_supersede_cancels_queued_interactive(self):
+        """Novo comando interativo cancela o anterior que ainda estava na fila"""
+        self.scheduler = BrainScheduler(workers=1)
+        gate = threading.Event()
+        self.scheduler.submit(gate.wait, origem="dev")
+        time.sleep(0.05)
+        old = self.scheduler.submit(lambda: "velho")
+        new = self.scheduler.submit(lambda: "novo", supersede=True)
+        gate.set()
+        self.assertIsNone(old.wait(1))
+        self.assertTrue(old.cancelled)
+        self.assertEqual(new.wait(1), "novo")
+        self.assertEqual(self.scheduler.get_metrics()["cancelled"], {"interativo": 1})
+
+    def test_slot_holds_worker_and_supersedes(self):
+        """slot(): entra na fila como interativo, cancela o comando velho e segura o worker até o bloco sair"""
+        self.scheduler = BrainScheduler(workers=1, cloud_available=lambda: True)
+        gate = threading.Event()
+        self.scheduler.submit(gate.wait, origem="dev")
+        time.sleep(0.05)
+        old = self.scheduler.submit(lambda: "velho")
+        threading.Timer(0.1, gate.set).start()
+
+        with self.scheduler.slot(supersede=True) as admitido:
+            self.assertTrue(admitido)
+            self.assertTrue(old.cancelled)
+            self.assertEqual(self.scheduler.get_metrics()["running"], {"interativo": 1})
+            waiting = self.scheduler.submit(lambda: "depois")
+            self.assertIsNone(waiting.wait(0.1))      # O único worker está com o bloco
+        self.assertEqual(waiting.wait(1), "depois")
+        metrics = self.scheduler.get_metrics()
+        self.assertEqual(metrics["completed"]["interativo"], 2)
+        self.assertEqual(metrics["cloud_calls_last_min"], 0)     # Ninguém chamou a nuvem
+
+    def test_slot_cancelled_in_queue(self):
+        """Substituído antes de começar: o bloco recebe False"""
+        self.scheduler = BrainScheduler(workers=1)
+        gate = threading.Event()
+        self.scheduler.submit(gate.wait, origem="dev")
+        time.sleep(0.05)
+        results = []
+
+        def stream():
+            with self.scheduler.slot() as admitido:
+                results.append(admitido)
+
+        t = threading.Thread(target=stream)
+        t.start()
+        time.sleep(0.05)
+        self.scheduler.submit(lambda: "novo", supersede=True)
+        t.join(1)
+        gate.set()
+        self.assertEqual(results, [False])
+
+    def test_cloud_quota_holds_background(self):
+        """Sem cota sobrando na nuvem, o segundo plano espera; o interativo passa"""
+        self.scheduler = BrainScheduler(workers=2, cloud_rpm=5, cloud_reserve=0.4, cloud_available=lambda: True)
+        for _ in range(3):
+            self.scheduler.run(self.scheduler.note_cloud_call)
+        held = self.scheduler.submit(lambda: "dev", origem="dev")
+        self.assertIsNone(held.wait(0.3))
+        self.assertIsNone(held.started_at)
+        self.assertEqual(self.scheduler.run(lambda: "usuario"), "usuario")
+        self.assertEqual(self.scheduler.get_metrics()["cloud_calls_last_min"], 3)
+
+    def test_dequeue_without_cloud_spends_no_quota(self):
+        """Só a chamada de fato ao Groq conta: pedidos que não saem para a nuvem não seguram o segundo plano"""
+        self.scheduler = BrainScheduler(workers=1, cloud_rpm=5, cloud_reserve=0.4, cloud_available=lambda: True)
+        for _ in range(5):
+            self.scheduler.run(lambda: "cache")
+        self.assertEqual(self.scheduler.run(lambda: "dev", origem="dev"), "dev")
+        self.assertEqual(self.scheduler.get_metrics()["cloud_calls_last_min"], 0)
+
+    def test_errors_propagate_to_caller(self):
+        """Exceção dentro do worker chega a quem esperava"""
+        self.scheduler = BrainScheduler(workers=1)
+        def falha():
+            raise ValueError("boom")
+        with self.assertRaises(ValueError):
+            self.scheduler.run(falha)
+
+
+if __name__ == "__main__":
+    unittest.main()
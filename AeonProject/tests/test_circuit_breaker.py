@@ -0,0 +1,80 @@
+import unittest
+import sys
+import os
+import time
+import threading
+
+# Adiciona caminho ao projeto
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from core.circuit_breaker import CircuitBreaker
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Testes para o disjuntor da nuvem"""
+
+    def test_starts_closed(self):
+        """Circuito novo deixa passar requisições"""
+        breaker = CircuitBreaker("teste")
+        self.assertTrue(breaker.allow_request())
+        self.assertEqual(breaker.get_status()["state"], CircuitBreaker.CLOSED)
+
+    def test_failure_opens_without_blocking(self):
+        """Falha abre o circuito e as próximas chamadas são recusadas na hora"""
+        breaker = CircuitBreaker("teste", base_delay=60)
+        breaker.record_failure("timeout")
+        self.assertFalse(breaker.allow_request())
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertGreater(breaker.retry_in(), 0)
+        breaker.stop()
+
+    def test_threshold(self):
+        """Só abre após N falhas consecutivas"""
+        breaker = CircuitBreaker("teste", failure_threshold=3)
+        breaker.record_failure()
+        breaker.record_failure()
+        self.assertTrue(breaker.allow_request())
+        breaker.record_failure()
+        self.assertFalse(breaker.allow_request())
+        breaker.stop()
+
+    def test_probe_recovers_in_background(self):
+        """Sonda em segundo plano fecha o circuito quando o backend volta"""
+        recovered = threading.Event()
+        states = []
+
+        def on_change(state, retry_in):
+            states.append(state)
+            if state == CircuitBreaker.CLOSED:
+                recovered.set()
+
+        breaker = CircuitBreaker("teste", probe=lambda: True, base_delay=0.05, on_state_change=on_change)
+        breaker.record_failure("fora do ar")
+        self.assertTrue(recovered.wait(2), "A sonda deveria ter fechado o circuito")
+        self.assertTrue(breaker.allow_request())
+        self.assertEqual(states, [CircuitBreaker.OPEN, CircuitBreaker.HALF_OPEN, CircuitBreaker.CLOSED])
+
+    def test_backoff_grows_on_failed_probe(self):
+        """Sonda que falha dobra o intervalo até o máximo"""
+        probes = []
+        breaker = CircuitBreaker("teste", probe=lambda: probes.append(time.time()) or False,
+                                 base_delay=0.02, max_delay=0.08)
+        breaker.record_failure()
+        time.sleep(0.5)
+        breaker.stop()
+        self.assertGreaterEqual(len(probes), 2)
+        self.assertEqual(breaker.current_delay, 0.08)
+        self.assertFalse(breaker.allow_request())
+
+    def test_manual_success_resets(self):
+        """Reconexão manual fecha o circuito e zera o backoff"""
+        breaker = CircuitBreaker("teste", base_delay=60)
+        breaker.record_failure()
+        breaker.record_success()
+        self.assertTrue(breaker.allow_request())
+        self.assertEqual(breaker.current_delay, 60)
+        breaker.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
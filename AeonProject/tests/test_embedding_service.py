@@ -0,0 +1,162 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import threading
+import time
+from unittest.mock import patch
+
+# Adiciona caminho ao projeto
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from core import embedding_service
+from core.embedding_service import EmbeddingService, get_embedding_service
+from core.memory_vector import VectorMemory
+
+
+class CountingModel:
+    """Modelo falso: vetor = [tamanho do texto, 1]; registra cada lote recebido."""
+    def __init__(self, gate=None):
+        self.batches = []
+        self.gate = gate
+        self.entered = threading.Event()
+
+    def __call__(self, texts):
+        self.batches.append(list(texts))
+        self.entered.set()
+        if self.gate is not None:
+            self.gate.wait(5)
+        return [[float(len(t)), 1.0] for t in texts]
+
+
+class TestEmbeddingService(unittest.TestCase):
+    """Testes para o serviço de embeddings compartilhado (cache LRU + lotes)"""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, True)
+
+    def _service(self, model=None, **kwargs):
+        service = EmbeddingService(**kwargs)
+        service.set_model(model or CountingModel(), "fake")
+        self.addCleanup(service.close, 1)
+        return service
+
+    def test_requires_model(self):
+        with self.assertRaises(RuntimeError):
+            EmbeddingService().encode(["oi"])
+
+    def test_cache_hit_skips_model(self):
+        """O mesmo texto é calculado uma vez; repetidos na mesma chamada também"""
+        model = CountingModel()
+        service = self._service(model)
+        first = service.encode(["bom dia", "bom dia", "boa noite"])
+        second = service.encode(["bom dia"])
+        self.assertEqual(first.shape, (3, 2))
+        self.assertEqual(second.tolist(), [[7.0, 1.0]])
+        self.assertEqual(model.batches, [["bom dia", "boa noite"]])
+        stats = service.get_stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 2)
+
+    def test_lru_eviction(self):
+        """Acima de max_entries, o menos usado sai do cache"""
+        model = CountingModel()
+        service = self._service(model, max_entries=2)
+        service.encode(["a1"])
+        service.encode(["b2"])
+        service.encode(["a1"])
+        service.encode(["c3"])      # Expulsa b2
+        service.encode(["b2"])
+        self.assertEqual([b[0] for b in model.batches], ["a1", "b2", "c3", "b2"])
+
+    def test_concurrent_callers_share_batch(self):
+        """Pedidos que chegam durante um lote viram um lote só; texto em cálculo não é repetido"""
+        gate = threading.Event()
+        model = CountingModel(gate)
+        service = self._service(model)
+        results = {}
+
+        def call(name, texts):
+            results[name] = service.encode(texts).tolist()
+
+        first = threading.Thread(target=call, args=("primeiro", ["alpha"]))
+        first.start()
+        self.assertTrue(model.entered.wait(2))
+        others = [threading.Thread(target=call, args=(f"t{i}", [f"texto {i}"])) for i in range(4)]
+        others.append(threading.Thread(target=call, args=("repetido", ["alpha"])))
+        for t in others:
+            t.start()
+        time.sleep(0.1)
+        gate.set()
+        for t in [first] + others:
+            t.join(2)
+
+        self.assertEqual(len(model.batches), 2)
+        self.assertEqual(sorted(model.batches[1]), [f"texto {i}" for i in range(4)])
+        self.assertEqual(results["repetido"], [[5.0, 1.0]])
+        stats = service.get_stats()
+        self.assertEqual(stats["coalesced"], 1)
+        self.assertEqual(stats["batch_size_max"], 4)
+        self.assertIsNotNone(stats["encode_p95_ms"])
+
+    def test_model_error_reaches_all_callers(self):
+        """Falha do modelo vira exceção para quem pediu e não entra no cache"""
+        def broken(texts):
+            raise ValueError("sem memória")
+
+        service = self._service(broken)
+        with self.assertRaises(ValueError):
+            service.encode(["oi"])
+        self.assertEqual(service.get_stats()["errors"], 1)
+        self.assertEqual(service.get_stats()["cache_size"], 0)
+
+    def test_disk_persistence(self):
+        """Cache salvo em disco volta na próxima sessão, só para o mesmo modelo"""
+        path = os.path.join(self.tmp, "embedding_cache.npz")
+        service = self._service(cache_path=path)
+        service.encode(["persistente"])
+        service.close(1)
+        self.assertTrue(os.path.exists(path))
+
+        model = CountingModel()
+        reopened = self._service(model, cache_path=path)
+        self.assertEqual(reopened.encode(["persistente"]).tolist(), [[11.0, 1.0]])
+        self.assertEqual(model.batches, [])
+
+        other = EmbeddingService(cache_path=path)
+        other.set_model(CountingModel(), "outro-modelo")
+        self.assertEqual(other.get_stats()["cache_size"], 0)
+
+    def test_vector_memory_uses_service(self):
+        """VectorMemory registra o modelo no serviço; embed_fn repetido não recalcula"""
+        model = CountingModel()
+        service = EmbeddingService()
+        self.addCleanup(service.close, 1)
+
+        with patch.object(VectorMemory, "_open", lambda memory: (model, object(), object())):
+            memory = VectorMemory(self.tmp, embeddings=service)
+            memory.wait_ready(2)
+            memory.embed_fn(["que horas são"])
+            memory.embed_fn(["que horas são"])
+        self.assertEqual(model.batches, [["que horas são"]])
+        self.assertIs(service.model, model)
+
+    def test_singleton_warns_on_different_options(self):
+        """Opções diferentes depois da primeira chamada são ignoradas com aviso"""
+        with patch.object(embedding_service, "_service", None), \
+                patch.object(embedding_service, "_service_options", None), \
+                patch.object(embedding_service, "log_display") as log:
+            first = get_embedding_service(max_entries=10)
+            self.addCleanup(first.close, 1)
+            self.assertIs(get_embedding_service(), first)
+            self.assertIs(get_embedding_service(max_entries=10), first)
+            log.assert_not_called()
+            self.assertIs(get_embedding_service(max_entries=20), first)
+            log.assert_called_once()
+            self.assertEqual(first.max_entries, 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
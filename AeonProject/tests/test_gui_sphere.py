@@ -0,0 +1,61 @@
+import unittest
+import sys
+import os
+from types import SimpleNamespace
+
+# Adiciona caminho ao projeto
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+try:
+    from core.gui_sphere import AeonSphere
+    GUI_AVAILABLE = True
+except ImportError:
+    GUI_AVAILABLE = False
+
+
+class StreamManager:
+    """ModuleManager falso: route_command_stream devolve os pedaços dados ou explode."""
+    def __init__(self, chunks=(), error=None):
+        self.chunks = chunks
+        self.error = error
+
+    def route_command_stream(self, txt):
+        if self.error is not None:
+            raise self.error    # Falha antes de existir gerador (ex: roteamento)
+        return (chunk for chunk in self.chunks)
+
+
+@unittest.skipUnless(GUI_AVAILABLE, "PyQt6/pynput não instalados")
+class TestStreamToDisplay(unittest.TestCase):
+    """A esfera sempre sai de PROCESSING quando o stream termina, mesmo sem resposta"""
+
+    def sphere(self, manager):
+        # Só o necessário para _stream_to_display; 'after' roda na hora
+        fake = SimpleNamespace(state="PROCESSING", module_manager=manager, shown=[])
+        fake.after = lambda ms, func, *args: func(*args)
+        fake.show_response = fake.shown.append
+        return fake
+
+    def consume(self, fake):
+        return list(AeonSphere._stream_to_display(fake, "conte algo"))
+
+    def test_chunks_go_idle(self):
+        fake = self.sphere(StreamManager(["Olá. ", "Tudo bem?"]))
+        self.assertEqual(self.consume(fake), ["Olá. ", "Tudo bem?"])
+        self.assertEqual(fake.state, "IDLE")
+        self.assertEqual(fake.shown[-1], "Olá. Tudo bem?")
+
+    def test_empty_stream_goes_idle(self):
+        fake = self.sphere(StreamManager([]))
+        self.assertEqual(self.consume(fake), [])
+        self.assertEqual(fake.state, "IDLE")
+
+    def test_raising_stream_goes_idle(self):
+        fake = self.sphere(StreamManager(error=RuntimeError("sem módulo")))
+        with self.assertRaises(RuntimeError):
+            self.consume(fake)
+        self.assertEqual(fake.state, "IDLE")
+
+
+if __name__ == "__main__":
+    unittest.main()
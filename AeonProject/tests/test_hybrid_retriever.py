@@ -0,0 +1,89 @@
+import unittest
+import sys
+import os
+import time
+
+# Adiciona caminho ao projeto
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from core.hybrid_retriever import BM25Index, HybridRetriever, tokenize
+
+
+DOCS = [
+    "Usuário: meu cachorro se chama Biscoito | Aeon: que nome fofo",
+    "Usuário: toque uma música calma | Aeon: tocando música calma",
+    "Usuário: qual a previsão do tempo | Aeon: sol com nuvens",
+    "Usuário: me lembre de comprar pão | Aeon: lembrete criado",
+    "Usuário: toque música de rock | Aeon: tocando rock",
+]
+
+
+class TestBM25Index(unittest.TestCase):
+    """Testes para o índice invertido BM25 da memória de longo prazo"""
+
+    def setUp(self):
+        self.index = BM25Index()
+        self.index.add([f"id{i}" for i in range(len(DOCS))], DOCS,
+                       [{"timestamp": 1000.0 + i} for i in range(len(DOCS))])
+
+    def test_tokenize_folds_accents_and_stopwords(self):
+        """Acentos, maiúsculas e o prefixo Usuário/Aeon não viram termos"""
+        self.assertEqual(tokenize("Usuário: Qual a PREVISÃO? | Aeon: sol"), ["previsao", "sol"])
+
+    def test_proper_noun_ranks_first(self):
+        """Nome próprio raro acha a interação exata com nota alta"""
+        hits = self.index.search("como está o Biscoito", 3)
+        self.assertEqual(hits[0][0], "id0")
+        self.assertEqual(hits[0][2], 1000.0)
+        self.assertGreater(hits[0][3], 0.5)
+        self.assertEqual(len(hits), 1)
+
+    def test_common_term_scores_lower(self):
+        """Termo repetido em várias memórias pontua menos que um termo raro"""
+        comum = self.index.search("musica", 5)[0][3]
+        raro = self.index.search("pao", 5)[0][3]
+        self.assertLess(comum, raro)
+
+    def test_duplicate_ids_ignored(self):
+        """Recarregar o que já está no índice não duplica documentos"""
+        self.index.add(["id0"], [DOCS[0]])
+        self.assertEqual(len(self.index), len(DOCS))
+
+    def test_no_match(self):
+        self.assertEqual(self.index.search("astronomia", 3), [])
+
+
+class TestHybridRetriever(unittest.TestCase):
+    """Testes para a fusão vetor + BM25 com recência e nota mínima"""
+
+    def test_cutoff_drops_irrelevant(self):
+        """Vizinho vetorial fraco fica de fora mesmo sendo o mais próximo"""
+        retriever = HybridRetriever(min_score=0.3)
+        ranked = retriever.rank([("a", "doc a", None, 0.2)], [], 3)
+        self.assertEqual(ranked, [])
+
+    def test_lexical_only_hit_survives(self):
+        """Casamento exato forte passa mesmo fora dos vizinhos do embedding"""
+        retriever = HybridRetriever(alpha=0.6, min_score=0.3)
+        ranked = retriever.rank([("a", "doc a", None, 0.3)], [("b", "doc b", None, 0.9)], 3)
+        self.assertEqual([hit["id"] for hit in ranked], ["b"])
+
+    def test_both_sides_combine(self):
+        """Documento que aparece nos dois lados soma as duas notas"""
+        retriever = HybridRetriever(alpha=0.5, min_score=0.0, recency_weight=0.0)
+        ranked = retriever.rank([("a", "doc a", None, 0.6), ("b", "doc b", None, 0.7)],
+                                [("a", "doc a", None, 0.8)], 3)
+        self.assertEqual(ranked[0]["id"], "a")
+        self.assertAlmostEqual(ranked[0]["score"], 0.7)
+
+    def test_recency_breaks_ties(self):
+        """Com a mesma relevância, a memória mais nova vem primeiro"""
+        now = time.time()
+        retriever = HybridRetriever(min_score=0.0, recency_weight=0.5, half_life_days=7)
+        ranked = retriever.rank([("velha", "v", now - 60 * 86400, 0.8), ("nova", "n", now - 3600, 0.8)], [], 2, now=now)
+        self.assertEqual([hit["id"] for hit in ranked], ["nova", "velha"])
+        self.assertLess(ranked[1]["score"], ranked[0]["score"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+import sys
+import os
+import re
+
+# Adiciona caminho ao projeto
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from modules.base_module import AeonModule
+from core.intent_router import IntentRouter, NUMPY_AVAILABLE
+
+VOCAB = ["musica", "tocar", "spotify", "janela", "minimizar", "fechar", "clima", "tempo", "previsao"]
+
+
+def bag_of_words(texts):
+    """Embedding falso: contagem de palavras do vocabulário (determinístico, sem modelo)."""
+    vectors = []
+    for text in texts:
+        words = re.findall(r"\w+", text.lower())
+        vectors.append([float(words.count(v)) for v in VOCAB])
+    return vectors
+
+
+class FakeModule(AeonModule):
+    def __init__(self, core_context, name, triggers, description):
+        super().__init__(core_context)
+        self.name = name
+        self.triggers = triggers
+        self._description = description
+
+    @property
+    def metadata(self):
+        return {"description": self._description}
+
+    def process(self, command):
+        return f"{self.name}: {command}"
+
+
+@unittest.skipUnless(NUMPY_AVAILABLE, "numpy não instalado")
+class TestIntentRouter(unittest.TestCase):
+    """Testes para o roteador semântico de intenções"""
+
+    def setUp(self):
+        self.midia = FakeModule({}, "Midia", ["tocar musica"], "Toca musica no spotify")
+        self.sistema = FakeModule({}, "Sistema", ["minimizar janela", "fechar janela"], "Controla janela")
+        self.router = IntentRouter(bag_of_words, threshold=0.5)
+        self.router.build([self.midia, self.sistema], version=1)
+
+    def test_routes_to_best_module(self):
+        """Comando sem gatilho exato vai para o módulo mais parecido"""
+        module, score = self.router.route("quero ouvir musica no spotify")
+        self.assertIs(module, self.midia)
+        self.assertGreaterEqual(score, 0.5)
+
+    def test_below_threshold_returns_none(self):
+        """Nada parecido: não despacha (cai no Brain)"""
+        module, _ = self.router.route("qual a previsao do clima")
+        self.assertIsNone(module)
+
+    def test_ranking_covers_all_modules(self):
+        """score() devolve todos os módulos, do mais ao menos provável"""
+        ranked = self.router.score("fechar essa janela")
+        self.assertEqual([m.name for m, _ in ranked], ["Sistema", "Midia"])
+
+    def test_staleness_follows_version(self):
+        """Índice fica obsoleto quando a frota de módulos muda"""
+        self.assertFalse(self.router.is_stale(1))
+        self.assertTrue(self.router.is_stale(2))
+
+
+if __name__ == "__main__":
+    unittest.main()
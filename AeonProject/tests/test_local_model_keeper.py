@@ -0,0 +1,78 @@
+import unittest
+import sys
+import os
+import time
+from unittest.mock import Mock
+
+# Adiciona caminho ao projeto
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from core.local_model_keeper import LocalModelKeeper
+from core.status_manager import StatusManager
+
+
+class TestLocalModelKeeper(unittest.TestCase):
+    """Testes para o aquecimento e keep-alive dos modelos do Ollama"""
+
+    def setUp(self):
+        self.client = Mock()
+        self.status = StatusManager()
+        self.keeper = LocalModelKeeper(self.client, ["llama3.2", "moondream", "llama3.2"],
+                                       ping_interval_s=60, idle_unload_s=300,
+                                       on_state_change=self.status.update_local_models)
+
+    def test_warms_each_model_once_per_tick(self):
+        """Com atividade recente, cada modelo recebe um ping com keep_alive"""
+        self.keeper.tick()
+        self.assertEqual(self.client.generate.call_count, 2)
+        self.client.generate.assert_any_call(model="llama3.2", prompt="", keep_alive="120s")
+        self.assertEqual(self.status.get_status()["local_models"], {"llama3.2": "PRONTO", "moondream": "PRONTO"})
+
+    def test_unloads_when_idle(self):
+        """Sem atividade além do limite, os modelos são descarregados"""
+        self.keeper.tick()
+        self.keeper.last_activity = time.time() - 301
+        self.keeper.tick()
+        self.client.generate.assert_any_call(model="moondream", prompt="", keep_alive=0)
+        self.assertEqual(set(self.keeper.states.values()), {LocalModelKeeper.UNLOADED})
+
+    def test_touch_wakes_after_unload(self):
+        """Atividade depois do descarregamento acorda o laço para recarregar"""
+        self.keeper.states = {m: LocalModelKeeper.UNLOADED for m in self.keeper.models}
+        self.keeper.touch()
+        self.assertTrue(self.keeper._wake.is_set())
+
+    def test_warm_failure_marks_error(self):
+        """Modelo que não carrega fica em ERRO e não é tentado a cada rodada"""
+        self.client.generate.side_effect = RuntimeError("model not found")
+        self.keeper.tick()
+        self.keeper.tick()
+        self.assertEqual(self.keeper.states["llama3.2"], LocalModelKeeper.ERROR)
+        self.assertEqual(self.client.generate.call_count, 2)
+
+    def test_recovers_from_error_with_backoff(self):
+        """ERRO volta a ser tentado depois da espera, que dobra a cada falha; o sucesso zera a conta"""
+        self.client.generate.side_effect = RuntimeError("ollama fora do ar")
+        self.keeper.tick()
+        self.assertAlmostEqual(self.keeper.retry_at["llama3.2"] - time.time(), 30, delta=1)
+        self.keeper.touch()
+        self.assertFalse(self.keeper._wake.is_set())    # Ainda dentro da espera
+
+        self.keeper.retry_at = {m: 0.0 for m in self.keeper.models}
+        self.keeper.tick()
+        self.assertEqual(self.client.generate.call_count, 4)
+        self.assertEqual(self.keeper.failures["llama3.2"], 2)
+        self.assertAlmostEqual(self.keeper.retry_at["llama3.2"] - time.time(), 60, delta=1)
+
+        self.client.generate.side_effect = None
+        self.keeper.retry_at = {m: 0.0 for m in self.keeper.models}
+        self.keeper.touch()
+        self.assertTrue(self.keeper._wake.is_set())
+        self.keeper.tick()
+        self.assertEqual(self.keeper.states, {"llama3.2": LocalModelKeeper.READY, "moondream": LocalModelKeeper.READY})
+        self.assertEqual(self.keeper.failures, {})
+        self.assertEqual(self.status.get_status()["local_models"]["llama3.2"], "PRONTO")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+import unittest
+import sys
+import os
+import tempfile
+import threading
+import time
+from unittest.mock import patch
+
+# Adiciona caminho ao projeto
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from core.memory_vector import VectorMemory
+
+
+class FakeCollection:
+    def __init__(self):
+        self.documents = []
+        self.ids = []
+        self.metadatas = []
+        self.add_calls = 0
+
+    def add(self, documents, ids, metadatas, embeddings=None):
+        self.add_calls += 1
+        self.documents.extend(documents)
+        self.ids.extend(ids)
+        self.metadatas.extend(metadatas)
+        self.embeddings = embeddings
+
+    def get(self, include=None):
+        return {"ids": list(self.ids), "documents": list(self.documents), "metadatas": list(self.metadatas)}
+
+    def query(self, query_texts=None, query_embeddings=None, n_results=10):
+        # Todos os documentos como vizinhos perfeitos (distância 0)
+        return {
+            "ids": [self.ids[:n_results]],
+            "documents": [self.documents[:n_results]],
+            "metadatas": [self.metadatas[:n_results]],
+            "distances": [[0.0] * len(self.documents[:n_results])],
+        }
+
+
+class TestVectorMemoryLazy(unittest.TestCase):
+    """Testes para a carga preguiçosa da memória de longo prazo"""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.gate = threading.Event()
+        self.collection = FakeCollection()
+        self.opened = 0
+        self.encode_calls = 0
+
+        def model(texts):
+            self.encode_calls += 1
+            return [[1.0, 0.0] for _ in texts]
+
+        def slow_open(memory):
+            self.opened += 1
+            self.gate.wait(5)
+            return model, object(), self.collection
+
+        patcher = patch.object(VectorMemory, "_open", slow_open)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.gate.set)
+
+    def test_constructor_does_not_load(self):
+        """Criar a memória no boot não abre nada"""
+        memory = VectorMemory(self.tmp)
+        time.sleep(0.05)
+        self.assertEqual(self.opened, 0)
+        self.assertEqual(memory.get_status()["state"], "nao_iniciada")
+
+    def test_retrieval_respects_deadline(self):
+        """Primeira busca com o modelo ainda carregando volta vazia dentro do prazo"""
+        memory = VectorMemory(self.tmp, deadline_s=0.1)
+        start = time.perf_counter()
+        self.assertEqual(memory.retrieve_relevant("oi"), "")
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertEqual(memory.get_status()["state"], "carregando")
+
+        self.gate.set()
+        self.assertTrue(memory.wait_ready(2))
+        self.assertEqual(self.opened, 1)
+
+    def test_pending_interactions_flushed_after_load(self):
+        """Interações guardadas durante a carga entram no banco num único add"""
+        memory = VectorMemory(self.tmp, deadline_s=0.05, flush_interval_s=0.05)
+        memory.store_interaction("pergunta 1", "resposta 1")
+        memory.store_interaction("pergunta 2", "resposta 2")
+        self.assertEqual(memory.queue_depth, 2)
+
+        self.gate.set()
+        self.assertTrue(memory.flush(2))
+        self.assertEqual(self.collection.add_calls, 1)
+        self.assertEqual(len(self.collection.documents), 2)
+        self.assertIn("pergunta 1", memory.retrieve_relevant("pergunta"))
+
+    def test_write_behind_batches(self):
+        """Várias interações: um embedding em lote e um add por lote, sem bloquear quem grava"""
+        self.gate.set()
+        memory = VectorMemory(self.tmp, batch_size=8, flush_interval_s=5.0)
+        memory.wait_ready(2)
+        aquecimento = self.encode_calls
+
+        start = time.perf_counter()
+        for i in range(20):
+            memory.store_interaction(f"pergunta {i}", f"resposta {i}")
+        self.assertLess(time.perf_counter() - start, 0.5)
+
+        self.assertTrue(memory.flush(2))
+        self.assertEqual(len(self.collection.documents), 20)
+        self.assertEqual(self.collection.add_calls, 3)          # 8 + 8 + 4
+        self.assertEqual(self.encode_calls - aquecimento, 3)
+        self.assertEqual(memory.get_status()["queue_depth"], 0)
+        self.assertEqual(memory.get_status()["written"], 20)
+
+    def test_close_flushes_queue(self):
+        """Encerrar grava o que ainda estava na fila e recusa novas gravações"""
+        self.gate.set()
+        memory = VectorMemory(self.tmp, batch_size=100, flush_interval_s=30.0)
+        memory.store_interaction("pergunta", "resposta")
+        memory.close(2)
+        self.assertEqual(len(self.collection.documents), 1)
+        memory.store_interaction("depois", "do fim")
+        self.assertEqual(memory.queue_depth, 0)
+
+    def test_embed_waits_for_model(self):
+        """embed_fn (roteador/cache) falha rápido enquanto carrega e funciona depois"""
+        memory = VectorMemory(self.tmp, deadline_s=0.05, preload=True)
+        with self.assertRaises(RuntimeError):
+            memory.embed_fn(["oi"])
+        self.gate.set()
+        memory.wait_ready(2)
+        self.assertEqual(memory.embed_fn(["oi"]), [[1.0, 0.0]])
+
+
+if __name__ == "__main__":
+    unittest.main()
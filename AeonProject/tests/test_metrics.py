@@ -0,0 +1,104 @@
+import unittest
+import sys
+import os
+import threading
+
+# Adiciona caminho ao projeto
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from core.metrics import MetricsRegistry, current_request, classify_error
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    """Testes para o registro de métricas por pedido do Brain"""
+
+    def setUp(self):
+        self.registry = MetricsRegistry(window=50)
+
+    def test_track_records_request(self):
+        """O bloco medido vira um registro com backend, tokens e latência"""
+        with self.registry.track("texto", "interativo") as medida:
+            self.assertIs(current_request(), medida)
+            medida.set_backend("groq", "llama-3.3-70b-versatile")
+            medida.set_usage(120, 40)
+        self.assertIsNone(current_request())
+
+        registro = self.registry.recent(1)[0]
+        self.assertEqual(registro["backend"], "groq")
+        self.assertEqual(registro["prompt_tokens"], 120)
+        self.assertTrue(registro["ok"])
+        self.assertIsNotNone(registro["latency_ms"])
+        resumo = self.registry.summary()["backends"]["groq:llama-3.3-70b-versatile"]
+        self.assertEqual(resumo["requests"], 1)
+        self.assertEqual(resumo["completion_tokens"], 40)
+
+    def test_reuse_keeps_outer_request(self):
+        """reuse=True anota no pedido de quem chamou em vez de abrir outro"""
+        with self.registry.track("visao", "visao") as externo:
+            with self.registry.track("texto", reuse=True) as interno:
+                self.assertIs(interno, externo)
+            with self.registry.track("traducao", "visao") as traducao:
+                self.assertIsNot(traducao, externo)
+        self.assertEqual([r["kind"] for r in self.registry.recent()], ["traducao", "visao"])
+
+    def test_exception_marks_error(self):
+        """Exceção dentro do bloco conta como erro"""
+        with self.assertRaises(RuntimeError):
+            with self.registry.track("texto") as medida:
+                medida.set_backend("ollama", "llama3.2")
+                raise RuntimeError("falhou")
+        self.assertFalse(self.registry.recent(1)[0]["ok"])
+
+    def test_bind_across_threads(self):
+        """bind() leva o pedido para outra thread (ex: loop do runtime)"""
+        medida = self.registry.begin("texto")
+
+        def worker():
+            with self.registry.bind(medida):
+                current_request().set_fallback("timeout")
+
+        t = threading.Thread(target=worker)
+        t.start()
+        t.join()
+        self.assertEqual(medida.fallback, "timeout")
+
+    def test_failed_attempt_counts_for_its_backend(self):
+        """Groq que falhou e caiu para o Ollama aparece como erro do Groq, não só como motivo de fallback"""
+        with self.registry.track("texto") as medida:
+            medida.add_failure("groq", "llama-3.3-70b-versatile", "servidor")
+            medida.set_fallback("servidor")
+            medida.set_backend("ollama", "llama3.2")
+        backends = self.registry.summary()["backends"]
+        self.assertEqual(backends["groq:llama-3.3-70b-versatile"]["requests"], 1)
+        self.assertEqual(backends["groq:llama-3.3-70b-versatile"]["errors"], 1)
+        self.assertEqual(backends["ollama:llama3.2"]["errors"], 0)
+        self.assertEqual(self.registry.recent(1)[0]["failures"],
+                         [{"backend": "groq", "model": "llama-3.3-70b-versatile", "reason": "servidor"}])
+        self.assertIn('aeon_llm_backend_errors_total{kind="texto",backend="groq",model="llama-3.3-70b-versatile",reason="servidor"} 1',
+                      self.registry.prometheus_text())
+
+    def test_classify_error(self):
+        """Motivos de fallback agrupados em poucos valores"""
+        self.assertEqual(classify_error(Exception("Error code: 429 - rate limit")), "rate_limit")
+        self.assertEqual(classify_error(Exception("Error code: 401")), "auth")
+        self.assertEqual(classify_error(TimeoutError("timed out")), "timeout")
+        self.assertEqual(classify_error(Exception("Error code: 503")), "servidor")
+        self.assertEqual(classify_error(Exception("???")), "erro")
+
+    def test_prometheus_text(self):
+        """Formato texto do Prometheus, com coletores externos"""
+        with self.registry.track("texto") as medida:
+            medida.set_backend("ollama", "llama3.2")
+            medida.set_fallback("circuito_aberto")
+            medida.cache = "miss"
+        self.registry.add_collector("scheduler", lambda: {"queue_depth": 2, "wait_times": {"web": {"p50_ms": 1.5}}})
+        texto = self.registry.prometheus_text()
+        self.assertIn('aeon_llm_requests_total{kind="texto",backend="ollama",model="llama3.2",status="ok"} 1', texto)
+        self.assertIn('aeon_llm_fallbacks_total{reason="circuito_aberto"} 1', texto)
+        self.assertIn('aeon_llm_cache_total{status="miss"} 1', texto)
+        self.assertIn("aeon_scheduler_queue_depth 2", texto)
+        self.assertIn("aeon_scheduler_wait_times_web_p50_ms 1.5", texto)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,293 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import importlib
+import uuid
+from pathlib import Path
+
+# Adiciona caminho ao projeto
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import modules
+from core.brain import iter_sentences
+from core.module_manager import ModuleManager
+from core.module_manifest import ModuleManifest, LazyModule
+
+
+MODULE_TEMPLATE = '''from modules.base_module import AeonModule
+
+
+class {cls}(AeonModule):
+    def __init__(self, core_context):
+        super().__init__(core_context)
+        if {fail!r}:
+            raise RuntimeError("falha no construtor")
+        self.name = "{name}"
+        self.triggers = {triggers!r}
+
+    def on_unload(self):
+        self.core_context.setdefault("unloaded", []).append(self.name)
+
+    def process(self, command):
+        return "{name}: " + command
+'''
+
+
+class TempModules:
+    """Pacote 'modules.<aleatório>' num diretório temporário, para o ModuleManager escanear."""
+    def __init__(self):
+        self._bytecode = sys.dont_write_bytecode
+        sys.dont_write_bytecode = True  # Reescritas no mesmo segundo não podem vir de .pyc antigo
+        self.root = Path(tempfile.mkdtemp(prefix="aeon_mods_"))
+        self.package = f"teste_{uuid.uuid4().hex[:8]}"
+        self.package_dir = self.root / self.package
+        self.package_dir.mkdir()
+        (self.package_dir / "__init__.py").write_text("", encoding="utf-8")
+        modules.__path__.append(str(self.root))
+
+    def write(self, stem, name, triggers, fail=False) -> Path:
+        mod_file = self.package_dir / f"{stem}_mod.py"
+        cls = "".join(part.title() for part in stem.split("_")) + "Module"
+        mod_file.write_text(MODULE_TEMPLATE.format(cls=cls, name=name, triggers=triggers, fail=fail), encoding="utf-8")
+        importlib.invalidate_caches()
+        return mod_file
+
+    def module_name(self, stem) -> str:
+        return f"modules.{self.package}.{stem}_mod"
+
+    def close(self):
+        modules.__path__.remove(str(self.root))
+        prefix = f"modules.{self.package}"
+        for name in [n for n in sys.modules if n == prefix or n.startswith(prefix + ".")]:
+            del sys.modules[name]
+        shutil.rmtree(self.root, ignore_errors=True)
+        sys.dont_write_bytecode = self._bytecode
+
+
+class ModuleManagerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.fleet = TempModules()
+        self.addCleanup(self.fleet.close)
+
+    def make_manager(self):
+        context = {}
+        manager = ModuleManager(context)
+        manager.modules_dir = self.fleet.root
+        context["module_manager"] = manager
+        return manager
+
+
+class TestParallelBoot(ModuleManagerTestCase):
+    """Boot paralelo (parallel_boot) x serial: mesmo resultado, erros isolados"""
+
+    def setUp(self):
+        super().setUp()
+        self.fleet.write("alfa", "Alfa", ["abrir", "abrir janela"])
+        self.fleet.write("beta", "Beta", ["abrir", "tocar musica"])     # "abrir" repetido: o último registro vence
+        self.fleet.write("gama", "Gama", ["tocar"])
+        self.fleet.write("quebrado", "Quebrado", ["quebrar"], fail=True)
+        self.fleet.write("zeta", "Zeta", ["zerar"])
+
+    @staticmethod
+    def snapshot(manager):
+        return ([m.name for m in manager.modules],
+                [(trigger, module.name) for trigger, module in manager.trigger_map.items()])
+
+    def test_parallel_matches_serial(self):
+        """Mesma ordem de registro e mesmo mapa de gatilhos nos dois modos"""
+        serial = self.make_manager()
+        serial.load_modules(parallel=False)
+        parallel = self.make_manager()
+        parallel.load_modules(parallel=True)
+
+        self.assertEqual(self.snapshot(parallel), self.snapshot(serial))
+        self.assertEqual([m.name for m in parallel.modules], ["Alfa", "Beta", "Gama", "Zeta"])
+        self.assertEqual(parallel.trigger_map["abrir"].name, "Beta")
+        for manager in (serial, parallel):
+            self.assertEqual(manager.route_command("abrir janela agora"), "Alfa: abrir janela agora")
+            self.assertEqual(manager.route_command("tocar musica"), "Beta: tocar musica")
+
+    def test_constructor_error_is_skipped(self):
+        """Módulo que explode no construtor fica de fora; o boot segue com os outros"""
+        for parallel in (False, True):
+            manager = self.make_manager()
+            manager.load_modules(parallel=parallel)
+            self.assertIsNone(manager.get_module("Quebrado"))
+            self.assertNotIn("quebrar", manager.trigger_map)
+            self.assertEqual(len(manager.modules), 4)
+            self.assertEqual(manager.route_command("zerar contador"), "Zeta: zerar contador")
+
+    def test_boot_timings_recorded(self):
+        manager = self.make_manager()
+        manager.load_modules(parallel=True)
+        timings = manager.get_boot_timings()
+        self.assertIn(self.fleet.module_name("alfa"), timings)
+        self.assertIn("on_load", timings[self.fleet.module_name("alfa")])
+
+
+
+class TestHotReload(ModuleManagerTestCase):
+    """load_module / reload_module / unload_module sem recarregar a frota"""
+
+    def setUp(self):
+        super().setUp()
+        self.fleet.write("fixo", "Fixo", ["status"])
+        self.manager = self.make_manager()
+        self.manager.load_modules(parallel=False)
+
+    def test_load_reload_unload(self):
+        """Gatilhos novos passam a rotear, os antigos somem e o resto da frota fica intacto"""
+        mod_file = self.fleet.write("clima", "Clima", ["previsao", "vai chover"])
+        module = self.manager.load_module(mod_file)
+        self.assertEqual(module.name, "Clima")
+        self.assertEqual(self.manager.route_command("vai chover hoje"), "Clima: vai chover hoje")
+        fixo = self.manager.get_module("Fixo")
+
+        self.fleet.write("clima", "Clima", ["temperatura lá fora"])
+        reloaded = self.manager.reload_module(self.fleet.module_name("clima"))
+        self.assertIsNot(reloaded, module)
+        self.assertEqual(self.manager.core_context["unloaded"], ["Clima"])
+        self.assertEqual(self.manager.route_command("temperatura lá fora"), "Clima: temperatura lá fora")
+        self.assertNotIn("previsao", self.manager.trigger_map)
+        self.assertIsNone(self.manager.match_trigger("previsao do tempo"))
+        self.assertIs(self.manager.get_module("Fixo"), fixo)
+
+        self.assertTrue(self.manager.unload_module(mod_file))
+        self.assertFalse(self.manager.unload_module(mod_file))
+        self.assertIsNone(self.manager.get_module("Clima"))
+        self.assertIsNone(self.manager.match_trigger("temperatura lá fora"))
+        self.assertEqual(self.manager.route_command("status"), "Fixo: status")
+
+    def test_load_existing_reloads(self):
+        """load_module num módulo já carregado vira reload"""
+        mod_file = self.fleet.write("clima", "Clima", ["previsao"])
+        first = self.manager.load_module(mod_file)
+        second = self.manager.load_module(mod_file)
+        self.assertIsNot(first, second)
+        self.assertEqual([m.name for m in self.manager.modules].count("Clima"), 1)
+
+    def test_matcher_incremental_then_rebuilt(self):
+        """Reload pequeno atualiza o autômato no lugar; lápides demais forçam reconstrução"""
+        grande = self.fleet.write("grande", "Grande", [f"comando {i}" for i in range(100)])
+        pequeno = self.fleet.write("pequeno", "Pequeno", ["ping", "pong"])
+        self.manager.load_module(grande)
+        self.manager.load_module(pequeno)
+        matcher = self.manager.trigger_matcher
+
+        # Reload troca todos os gatilhos do módulo: os antigos viram lápides
+        self.fleet.write("pequeno", "Pequeno", ["ping", "pang"])
+        self.manager.reload_module(pequeno)
+        self.assertIs(self.manager.trigger_matcher, matcher)
+        self.assertEqual(matcher.tombstones, 2)
+        self.assertEqual(self.manager.route_command("pang"), "Pequeno: pang")
+        self.assertIsNone(self.manager.match_trigger("pong"))
+
+        # Lápides passam de max(64, ativos): reconstrói a partir do trigger_map
+        self.fleet.write("grande", "Grande", ["comando unico"])
+        self.manager.reload_module(grande)
+        self.assertIsNot(self.manager.trigger_matcher, matcher)
+        self.assertEqual(self.manager.trigger_matcher.tombstones, 0)
+        self.assertEqual(len(self.manager.trigger_matcher), 4)
+        self.assertIsNone(self.manager.match_trigger("comando 5"))
+        self.assertEqual(self.manager.route_command("comando unico"), "Grande: comando unico")
+        self.assertEqual(self.manager.route_command("ping"), "Pequeno: ping")
+
+    def test_path_outside_modules_dir(self):
+        """Arquivo fora de /modules não levanta exceção: load/reload devolvem None, unload False"""
+        outside = Path(tempfile.mkdtemp(prefix="aeon_fora_"))
+        self.addCleanup(shutil.rmtree, outside, True)
+        mod_file = outside / "solto_mod.py"
+        mod_file.write_text("", encoding="utf-8")
+        self.assertIsNone(self.manager.load_module(mod_file))
+        self.assertIsNone(self.manager.reload_module(str(mod_file)))
+        self.assertFalse(self.manager.unload_module(mod_file))
+        self.assertEqual(self.manager.route_command("status"), "Fixo: status")
+
+    def test_modules_dir_through_symlink(self):
+        """modules_dir apontado por um symlink: o caminho real do arquivo ainda resolve"""
+        link = Path(tempfile.mkdtemp(prefix="aeon_link_")) / "mods"
+        self.addCleanup(shutil.rmtree, link.parent, True)
+        link.symlink_to(self.fleet.root, target_is_directory=True)
+        self.manager.modules_dir = link
+        module = self.manager.load_module(self.fleet.write("clima", "Clima", ["previsao"]))
+        self.assertEqual(module.name, "Clima")
+
+    def test_scan_new_modules(self):
+        """Re-escaneamento: arquivo novo entra, arquivo apagado sai"""
+        self.fleet.write("novo", "Novo", ["novidade"])
+        self.assertEqual(self.manager.scan_new_modules(), ["Novo"])
+        self.assertEqual(self.manager.route_command("novidade"), "Novo: novidade")
+
+        (self.fleet.package_dir / "novo_mod.py").unlink()
+        self.assertEqual(self.manager.scan_new_modules(), [self.fleet.module_name("novo")])
+        self.assertIsNone(self.manager.match_trigger("novidade"))
+
+
+
+class TestMaterialize(ModuleManagerTestCase):
+    """Stub do manifesto trocado pela instância real: vale a lista de gatilhos atual do módulo"""
+
+    def test_stale_manifest_triggers_replaced(self):
+        self.fleet.write("fixo", "Fixo", ["status"])
+        mod_file = self.fleet.write("clima", "Clima", ["previsao", "status"])
+        manager = self.make_manager()
+        manager.load_modules(parallel=False)
+        manager.unload_module(mod_file)
+        manager.manifest = ModuleManifest(self.fleet.root)
+
+        # Entrada gravada por uma versão antiga do módulo
+        module_name = self.fleet.module_name("clima")
+        stub = LazyModule(manager.core_context, module_name, {
+            "class_name": "ClimaModule", "path": str(mod_file), "name": "Clima",
+            "triggers": ["vai chover", "previsao"],
+        })
+        manager._register(stub, module_name)
+
+        self.assertEqual(manager.route_command("vai chover hoje"), "Clima: vai chover hoje")
+        module = manager.get_module("Clima")
+        self.assertNotIsInstance(module, LazyModule)
+        self.assertIsNone(manager.match_trigger("vai chover amanha"))
+        self.assertIs(manager.trigger_map["previsao"], module)
+        self.assertEqual(manager.route_command("status"), "Fixo: status")     # Não toma gatilho de outro módulo
+        self.assertEqual(manager.manifest.entries[module_name]["triggers"], ["previsao", "status"])
+
+
+class StreamingBrain:
+    """Brain falso com pensar_stream; anota quando o gerador é fechado."""
+    def __init__(self):
+        self.closed = False
+
+    def pensar_stream(self, prompt, **kwargs):
+        try:
+            for part in ["Primeira frase completa aqui. ", "Segunda frase ", "completa também. ", "Terceira."]:
+                yield part
+        finally:
+            self.closed = True
+
+
+class TestRouteCommandStream(ModuleManagerTestCase):
+    """Fechar o stream (calar_boca) encerra o Brain e grava o histórico na hora"""
+
+    def setUp(self):
+        super().setUp()
+        self.brain = StreamingBrain()
+        self.manager = ModuleManager({"brain": self.brain})
+
+    def test_close_propagates_to_brain(self):
+        frases = iter_sentences(self.manager.route_command_stream("conte algo"))
+        self.assertEqual(next(frases), "Primeira frase completa aqui.")
+        frases.close()
+        self.assertTrue(self.brain.closed)
+        self.assertEqual(self.manager.chat_history[-1],
+                         {"role": "assistant", "content": "Primeira frase completa aqui. "})
+
+    def test_full_stream_remembered(self):
+        self.assertEqual(len(list(iter_sentences(self.manager.route_command_stream("conte algo")))), 3)
+        self.assertTrue(self.brain.closed)
+        self.assertTrue(self.manager.chat_history[-1]["content"].endswith("Terceira."))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+import sys
+import os
+import tempfile
+from pathlib import Path
+from unittest.mock import Mock
+
+# Adiciona caminho ao projeto
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from modules.base_module import AeonModule
+from core.module_manifest import ModuleManifest, LazyModule
+
+
+class FakeModule(AeonModule):
+    def __init__(self, core_context):
+        super().__init__(core_context)
+        self.name = "Fake"
+        self.triggers = ["faz algo", "algo"]
+
+    @property
+    def metadata(self):
+        return {"version": "1.0.0", "author": "test", "description": "Módulo falso"}
+
+    def process(self, command):
+        return f"Fake: {command}"
+
+
+class TestModuleManifest(unittest.TestCase):
+    """Testes para o manifesto de módulos (carga preguiçosa)"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = Path(self.tmp.name)
+        self.mod_file = self.storage / "fake_mod.py"
+        self.mod_file.write_text("# módulo falso\n", encoding="utf-8")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_record_and_reload(self):
+        """Entrada gravada sobrevive a um novo processo (novo manifesto)"""
+        manifest = ModuleManifest(self.storage)
+        manifest.record("modules.fake.fake_mod", self.mod_file, FakeModule({}))
+        manifest.save()
+
+        reloaded = ModuleManifest(self.storage)
+        entry = reloaded.get_valid("modules.fake.fake_mod", self.mod_file)
+        self.assertIsNotNone(entry)
+        self.assertEqual(entry["class_name"], "FakeModule")
+        self.assertEqual(entry["triggers"], ["faz algo", "algo"])
+        self.assertEqual(entry["metadata"]["description"], "Módulo falso")
+
+    def test_invalidates_on_mtime_change(self):
+        """Editar o arquivo do módulo invalida a entrada"""
+        manifest = ModuleManifest(self.storage)
+        manifest.record("modules.fake.fake_mod", self.mod_file, FakeModule({}))
+        stat = self.mod_file.stat()
+        os.utime(self.mod_file, (stat.st_atime, stat.st_mtime + 10))
+        self.assertIsNone(manifest.get_valid("modules.fake.fake_mod", self.mod_file))
+
+    def test_prune_removes_deleted_modules(self):
+        """Módulos que sumiram do disco saem do manifesto"""
+        manifest = ModuleManifest(self.storage)
+        manifest.record("modules.fake.fake_mod", self.mod_file, FakeModule({}))
+        manifest.prune([])
+        self.assertEqual(manifest.entries, {})
+
+    def test_lazy_module_exposes_manifest_data(self):
+        """LazyModule expõe nome, gatilhos e metadados sem importar nada"""
+        manifest = ModuleManifest(self.storage)
+        manifest.record("modules.fake.fake_mod", self.mod_file, FakeModule({}))
+        entry = manifest.get_valid("modules.fake.fake_mod", self.mod_file)
+
+        stub = LazyModule({}, "modules.fake.fake_mod", entry)
+        self.assertEqual(stub.name, "Fake")
+        self.assertIn("algo", stub.triggers)
+        self.assertEqual(stub.metadata["description"], "Módulo falso")
+        self.assertFalse(stub.is_loaded())
+
+    def test_lazy_module_materializes_on_process(self):
+        """process() no stub pede ao ModuleManager a instância real"""
+        manager = Mock()
+        manager.materialize.return_value = FakeModule({})
+        entry = {"class_name": "FakeModule", "name": "Fake", "triggers": ["algo"]}
+        stub = LazyModule({"module_manager": manager}, "modules.fake.fake_mod", entry)
+
+        self.assertEqual(stub.process("faz algo"), "Fake: faz algo")
+        manager.materialize.assert_called_once_with(stub)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+import sys
+import os
+
+# Adiciona caminho ao projeto
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from core.prompt_builder import PromptBuilder, estimate_tokens
+
+
+def make_history(turns):
+    lines = []
+    for i in range(turns):
+        lines.append(f"Usuário: pergunta número {i} " + "bla " * 30)
+        lines.append(f"Aeon: resposta número {i} " + "ble " * 30)
+    return "\n".join(lines) + "\n"
+
+
+class TestPromptBuilder(unittest.TestCase):
+    """Testes para a montagem do prompt de sistema com orçamento de tokens"""
+
+    def setUp(self):
+        self.builder = PromptBuilder({"default": 1500, "llama3.2": 800})
+
+    def test_small_inputs_untouched(self):
+        """Entradas pequenas passam inteiras"""
+        prompt = self.builder.build("Usuário: oi\nAeon: olá\n", {"nome": "Ana"}, "- Sistema: faz coisas\n", "memória antiga", 1500)
+        self.assertIn("Usuário: oi", prompt)
+        self.assertIn("memória antiga", prompt)
+        self.assertIn("- nome: Ana", prompt)
+        self.assertEqual(self.builder.last_stats["history_dropped"], 0)
+
+    def test_history_trimmed_keeps_newest(self):
+        """Histórico longo perde as mensagens antigas e respeita o orçamento"""
+        prompt = self.builder.build(make_history(40), None, "", "", 800)
+        self.assertLessEqual(estimate_tokens(prompt), 800)
+        self.assertIn("resposta número 39", prompt)
+        self.assertNotIn("pergunta número 0 ", prompt)
+        self.assertIn("mensagens antigas omitidas", prompt)
+
+    def test_memories_trimmed_by_relevance_order(self):
+        """Memórias excedentes saem a partir das menos relevantes (fim da lista)"""
+        memories = "\n---\n".join(f"memória {i} " + "x " * 200 for i in range(10))
+        prompt = self.builder.build("", None, "", memories, 800)
+        self.assertIn("memória 0", prompt)
+        self.assertNotIn("memória 9", prompt)
+        self.assertGreater(self.builder.last_stats["memories_dropped"], 0)
+
+    def test_capabilities_compacted_and_cached(self):
+        """Lista de módulos grande é compactada e a seção estática reaproveitada"""
+        caps = "".join(f"- Mod{i}: descrição do módulo {i} (Gatilhos: a{i}, b{i}, c{i})\n" for i in range(300))
+        self.builder.build("", None, caps, "", 800)
+        self.builder.build("", None, caps, "", 800)
+        self.assertEqual(len(self.builder._static_cache), 1)
+        prompt = self.builder.build("", None, caps, "", 800)
+        self.assertNotIn("Gatilhos", prompt)
+        self.assertIn("módulos.", prompt)
+        self.assertLessEqual(estimate_tokens(prompt), 800)
+
+    def test_budget_for_model_prefix(self):
+        """Orçamento por modelo aceita tags (llama3.2:latest)"""
+        self.assertEqual(self.builder.budget_for("llama3.2:latest"), 800)
+        self.assertEqual(self.builder.budget_for("desconhecido"), 1500)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import unittest
+import sys
+import os
+import tempfile
+import time
+
+# Adiciona caminho ao projeto
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from core.response_cache import ResponseCache, NUMPY_AVAILABLE
+
+
+def fake_embed(texts):
+    """Embedding de brinquedo: 'cachorro' e 'cão' caem no mesmo eixo."""
+    vectors = []
+    for text in texts:
+        vectors.append([
+            1.0 if ("cachorro" in text or "cao" in text) else 0.0,
+            1.0 if "gato" in text else 0.0,
+            0.1,
+        ])
+    return vectors
+
+
+class TestResponseCache(unittest.TestCase):
+    """Testes para o cache de respostas do Brain"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.ctx = ResponseCache.context_hash(historico="", capabilities="x")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_exact_hit_ignores_case_and_accents(self):
+        """Prompt normalizado: caixa, acentos e pontuação final não importam"""
+        cache = ResponseCache(self.tmp.name)
+        cache.put("O que é fotossíntese?", self.ctx, "Processo das plantas.")
+        self.assertEqual(cache.get("o que e FOTOSSINTESE", self.ctx), "Processo das plantas.")
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_context_change_misses(self):
+        """Mesmo prompt com outro contexto de sistema não reaproveita a resposta"""
+        cache = ResponseCache(self.tmp.name)
+        cache.put("quem é você", self.ctx, "Sou o Aeon.")
+        other = ResponseCache.context_hash(historico="outra conversa", capabilities="x")
+        self.assertIsNone(cache.get("quem é você", other))
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_model_in_key(self):
+        """Resposta de um modelo não é servida quando outro modelo atenderia"""
+        cache = ResponseCache(self.tmp.name)
+        cache.put("quem é você", self.ctx, "Sou o Aeon (local).", model="llama3.2")
+        self.assertIsNone(cache.get("quem é você", self.ctx, model="llama-3.3-70b-versatile"))
+        self.assertEqual(cache.get("quem é você", self.ctx, model="llama3.2"), "Sou o Aeon (local).")
+
+    def test_time_sensitive_bypass(self):
+        """Perguntas dependentes de tempo nunca são gravadas nem servidas"""
+        cache = ResponseCache(self.tmp.name)
+        cache.put("Que horas são?", self.ctx, "10h")
+        self.assertEqual(len(cache.entries), 0)
+        self.assertIsNone(cache.get("Que horas são?", self.ctx))
+        self.assertEqual(cache.stats()["bypassed"], 1)
+
+    def test_conversational_bypass(self):
+        """Sem o histórico na chave, perguntas que dependem da conversa ou do usuário ficam de fora"""
+        cache = ResponseCache(self.tmp.name)
+        for prompt in ("Explique isso melhor", "E dela, o que você sabe?", "Qual é o meu nome?"):
+            cache.put(prompt, self.ctx, "depende da conversa")
+            self.assertIsNone(cache.get(prompt, self.ctx))
+        self.assertEqual(len(cache.entries), 0)
+        self.assertEqual(cache.stats()["bypassed"], 3)
+
+    def test_ttl_and_lru(self):
+        """Entradas expiram pelo TTL e o limite descarta a menos usada"""
+        cache = ResponseCache(self.tmp.name, max_entries=2, ttl_s=60)
+        cache.put("a", self.ctx, "1")
+        cache.put("b", self.ctx, "2")
+        cache.get("a", self.ctx)          # 'a' vira a mais recente
+        cache.put("c", self.ctx, "3")     # sai 'b'
+        self.assertIsNone(cache.get("b", self.ctx))
+        self.assertEqual(cache.get("a", self.ctx), "1")
+
+        for entry in cache.entries.values():
+            entry["created_at"] = time.time() - 120
+        self.assertIsNone(cache.get("a", self.ctx))
+
+    def test_persistence(self):
+        """O cache sobrevive a um novo processo"""
+        cache = ResponseCache(self.tmp.name)
+        cache.put("capital da frança", self.ctx, "Paris.")
+        cache.save()
+        self.assertEqual(ResponseCache(self.tmp.name).get("capital da França", self.ctx), "Paris.")
+
+    def test_put_saves_in_background(self):
+        """put() não grava no disco na thread que responde; o timer grava o intervalo inteiro de uma vez"""
+        cache = ResponseCache(self.tmp.name, save_interval_s=0.2)
+        self.addCleanup(cache.close)
+        cache.put("capital da frança", self.ctx, "Paris.")
+        cache.put("capital da itália", self.ctx, "Roma.")
+        self.assertFalse(cache.path.exists())
+        deadline = time.time() + 2
+        while not cache.path.exists() and time.time() < deadline:
+            time.sleep(0.05)
+        self.assertEqual(ResponseCache(self.tmp.name).get("capital da Itália", self.ctx), "Roma.")
+
+    def test_close_flushes_pending(self):
+        cache = ResponseCache(self.tmp.name, save_interval_s=60)
+        cache.put("capital da frança", self.ctx, "Paris.")
+        cache.close()
+        self.assertIsNone(cache._save_timer)
+        self.assertEqual(ResponseCache(self.tmp.name).get("capital da França", self.ctx), "Paris.")
+
+    @unittest.skipUnless(NUMPY_AVAILABLE, "numpy não instalado")
+    def test_semantic_hit(self):
+        """Paráfrase com embedding próximo é servida pela busca semântica"""
+        cache = ResponseCache(self.tmp.name, embed_fn=fake_embed, semantic_threshold=0.9)
+        cache.put("fale sobre cachorro", self.ctx, "Cães são mamíferos.")
+        self.assertEqual(cache.get("me fale do cão", self.ctx), "Cães são mamíferos.")
+        self.assertIsNone(cache.get("fale sobre gato", self.ctx))
+        self.assertEqual(cache.stats()["semantic_hits"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+import sys
+import os
+from unittest.mock import patch
+
+# Adiciona caminho ao projeto
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from PIL import Image, ImageDraw
+from core.context_manager import ContextManager
+from modules.visao import visao_mod
+from modules.visao.screen_capture import TileChangeDetector, stitch
+
+
+def desktop(dialog=None, toast=False):
+    img = Image.new("RGB", (1920, 1080), (30, 30, 30))
+    draw = ImageDraw.Draw(img)
+    if dialog:
+        draw.rectangle(dialog, fill=(240, 240, 240))
+        draw.text((dialog[0] + 20, dialog[1] + 20), "Erro: arquivo não encontrado", fill=(200, 0, 0))
+    if toast:
+        draw.rectangle([1600, 950, 1900, 1060], fill=(0, 120, 215))
+    return img
+
+
+class TestTileChangeDetector(unittest.TestCase):
+    """Testes para a detecção de blocos alterados entre capturas"""
+
+    def setUp(self):
+        self.detector = TileChangeDetector()
+
+    def test_first_capture_has_no_baseline(self):
+        """Sem captura anterior, o quadro inteiro deve ser analisado"""
+        self.assertIsNone(self.detector.changed_regions(desktop()))
+
+    def test_unchanged_frame(self):
+        """Quadro idêntico: nada a enviar"""
+        self.detector.observe(desktop())
+        self.assertEqual(self.detector.changed_regions(desktop()), [])
+
+    def test_dialog_region_detected(self):
+        """Uma caixa de erro nova vira uma região pequena que a contém"""
+        self.detector.observe(desktop())
+        regions = self.detector.changed_regions(desktop(dialog=(600, 400, 1100, 600)))
+        self.assertEqual(len(regions), 1)
+        x0, y0, x1, y1 = regions[0]
+        self.assertTrue(x0 <= 600 and y0 <= 400 and x1 >= 1100 and y1 >= 600)
+        self.assertLess((x1 - x0) * (y1 - y0), 1920 * 1080 * 0.25)
+
+    def test_separate_changes_are_stitched(self):
+        """Duas mudanças distantes viram duas regiões empilhadas numa imagem"""
+        before = desktop()
+        after = desktop(dialog=(100, 100, 500, 300), toast=True)
+        self.detector.observe(before)
+        regions = self.detector.changed_regions(after)
+        self.assertEqual(len(regions), 2)
+        combined = stitch(after, regions)
+        heights = sum(r[3] - r[1] for r in regions)
+        self.assertEqual(combined.size[1], heights + 12)
+
+    def test_large_change_uses_full_frame(self):
+        """Troca de tela inteira (outra janela): manda o quadro completo"""
+        self.detector.observe(desktop())
+        self.assertIsNone(self.detector.changed_regions(Image.new("RGB", (1920, 1080), (250, 250, 250))))
+
+
+class FakeCapture:
+    """Captura falsa: 'regions' é o que grab_changes devolve ([] = nada mudou)."""
+    def __init__(self):
+        self.regions = None
+        self.detector = TileChangeDetector()
+
+    def grab(self, mode="tela", region=None):
+        return desktop()
+
+    def grab_changes(self, mode=None, region=None):
+        return desktop(), self.regions
+
+
+class FakeBrain:
+    def __init__(self):
+        self.last_vision_ok = True
+        self.calls = []
+
+    def ver(self, image, cache=True, quadro_inteiro=True):
+        self.calls.append(quadro_inteiro)
+        return "tela inteira" if quadro_inteiro else "só o diálogo"
+
+
+@patch.object(visao_mod, "VISAO_AVAILABLE", True)
+class TestVisaoModule(unittest.TestCase):
+    """'o que mudou' não transforma o recorte das mudanças na última leitura da tela"""
+
+    def setUp(self):
+        self.ctx = ContextManager()
+        self.brain = FakeBrain()
+        self.module = visao_mod.VisaoModule({"brain": self.brain, "context": self.ctx})
+        self.module.capture = FakeCapture()
+
+    def test_changes_stored_apart(self):
+        self.module.process("leia a tela")
+        self.module.capture.regions = [(100, 100, 200, 200)]
+        self.assertEqual(self.module.process("o que mudou na tela"), "Visão: Mudanças (1 região(ões)): só o diálogo")
+        self.assertEqual(self.brain.calls, [True, False])
+        self.assertEqual(self.ctx.get("vision_last_result"), "tela inteira")
+        self.assertEqual(self.ctx.get("vision_last_changes"), "só o diálogo")
+
+        self.module.capture.regions = []
+        self.assertIn("Última leitura: tela inteira", self.module.process("o que mudou na tela"))
+
+    def test_first_change_read_is_full_frame(self):
+        """Sem base anterior (regiões None) a leitura é do quadro inteiro"""
+        self.module.process("o que mudou na tela")
+        self.assertEqual(self.brain.calls, [True])
+        self.assertEqual(self.ctx.get("vision_last_result"), "tela inteira")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+import sys
+import os
+
+# Adiciona caminho ao projeto
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from core.trigger_matcher import TriggerMap, TriggerMatcher
+
+
+class TestTriggerMatcher(unittest.TestCase):
+    """Testes para o autômato Aho-Corasick dos gatilhos"""
+
+    def test_longest_match_wins(self):
+        """Entre gatilhos contidos no comando, o mais longo vence"""
+        matcher = TriggerMatcher(["abrir", "abrir navegador", "navegador"])
+        self.assertEqual(matcher.longest_match("por favor abrir navegador agora"), "abrir navegador")
+        self.assertEqual(matcher.longest_match("abrir o arquivo"), "abrir")
+        self.assertIsNone(matcher.longest_match("fechar tudo"))
+
+    def test_tie_break_registration_order(self):
+        """Mesmo comprimento: fica o que foi registrado primeiro, não o que aparece antes no texto"""
+        matcher = TriggerMatcher(["tocar", "pausa"])
+        self.assertEqual(matcher.longest_match("pausa e depois tocar"), "tocar")
+        matcher = TriggerMatcher(["pausa", "tocar"])
+        self.assertEqual(matcher.longest_match("pausa e depois tocar"), "pausa")
+
+    def test_overlapping_patterns(self):
+        """Padrões que se sobrepõem e sufixos de outros são achados pelos links de falha"""
+        matcher = TriggerMatcher(["he", "she", "his", "hers"])
+        self.assertEqual(matcher.longest_match("ushers"), "hers")
+        self.assertEqual(matcher.longest_match("ushe"), "she")
+        matcher = TriggerMatcher(["abc", "bcd"])
+        self.assertEqual(matcher.longest_match("abcd"), "abc")
+        # Gatilho só alcançável como sufixo de um caminho mais longo da trie
+        matcher = TriggerMatcher(["tempo agora", "agora"])
+        self.assertEqual(matcher.longest_match("tempo ag agora"), "agora")
+
+    def test_remove_and_recompile(self):
+        """Remover deixa lápide na trie; o match recompila e ignora o gatilho removido"""
+        matcher = TriggerMatcher(["abrir", "abrir navegador"])
+        self.assertEqual(matcher.longest_match("abrir navegador"), "abrir navegador")
+
+        self.assertTrue(matcher.remove("abrir navegador"))
+        self.assertFalse(matcher.remove("abrir navegador"))
+        self.assertEqual(matcher.tombstones, 1)
+        self.assertEqual(len(matcher), 1)
+        self.assertNotIn("abrir navegador", matcher)
+        self.assertEqual(matcher.longest_match("abrir navegador"), "abrir")
+
+        matcher.remove("abrir")
+        self.assertIsNone(matcher.longest_match("abrir navegador"))
+
+    def test_readd_after_remove_goes_last(self):
+        """Gatilho removido e adicionado de novo perde a prioridade de registro"""
+        matcher = TriggerMatcher(["tocar", "pausa"])
+        matcher.remove("tocar")
+        self.assertTrue(matcher.add("tocar"))
+        self.assertFalse(matcher.add("tocar"))
+        self.assertEqual(matcher.longest_match("tocar pausa"), "pausa")
+
+    def test_empty_trigger_ignored(self):
+        matcher = TriggerMatcher(["", "oi"])
+        self.assertEqual(len(matcher), 1)
+        self.assertIsNone(TriggerMatcher().longest_match("qualquer coisa"))
+
+
+class TestTriggerMap(unittest.TestCase):
+    """Testes para o dicionário de gatilhos que registra as mutações"""
+
+    def test_version_and_ops(self):
+        """Inclusões e remoções incrementam a versão e entram no log"""
+        tmap = TriggerMap()
+        tmap["abrir"] = "mod_a"
+        tmap["abrir"] = "mod_b"        # Troca de dono: versão muda, mas não é gatilho novo
+        tmap.setdefault("fechar", "mod_a")
+        tmap.setdefault("fechar", "mod_b")
+        del tmap["abrir"]
+        tmap.pop("inexistente", None)
+        self.assertEqual(tmap.version, 4)
+        self.assertEqual(tmap.ops, [("add", "abrir"), ("add", "fechar"), ("del", "abrir")])
+        self.assertEqual(tmap["fechar"], "mod_a")
+
+    def test_clear_requires_reset(self):
+        """clear() descarta o log e pede reconstrução completa"""
+        tmap = TriggerMap({"abrir": "mod_a"})
+        version = tmap.version
+        tmap.clear()
+        self.assertTrue(tmap.reset)
+        self.assertEqual(tmap.ops, [])
+        self.assertGreater(tmap.version, version)
+
+    def test_mark_synced(self):
+        tmap = TriggerMap()
+        tmap.update({"a": 1, "b": 2})
+        tmap.clear()
+        tmap["c"] = 3
+        tmap.mark_synced()
+        self.assertEqual(tmap.ops, [])
+        self.assertFalse(tmap.reset)
+        self.assertEqual(dict(tmap), {"c": 3})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+
+# Adiciona caminho ao projeto
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np
+
+from core.vector_store import NumpyVectorStore
+from core.memory_vector import VectorMemory
+
+
+def fake_embedding(texts):
+    """Embedding determinístico: um vetor por texto, derivado do hash das palavras."""
+    vectors = []
+    for text in texts:
+        vec = np.zeros(16, dtype=np.float32)
+        for word in text.lower().split():
+            vec[sum(map(ord, word)) % 16] += 1.0
+        vectors.append(vec)
+    return np.array(vectors)
+
+
+class TestNumpyVectorStore(unittest.TestCase):
+    """Testes para o índice vetorial em memmap"""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, True)
+
+    def _store(self, **kwargs):
+        store = NumpyVectorStore(self.tmp, embedding_function=fake_embedding, model_name="fake", **kwargs)
+        self.addCleanup(store.close)
+        return store
+
+    def _fill(self, store, n=20):
+        docs = [f"documento numero {i} assunto{i % 5}" for i in range(n)]
+        store.add(documents=docs, ids=[f"id{i}" for i in range(n)], metadatas=[{"timestamp": i} for i in range(n)])
+        return docs
+
+    def test_add_and_query(self):
+        """Busca devolve o documento idêntico primeiro, no formato do Chroma"""
+        store = self._store()
+        docs = self._fill(store)
+        result = store.query(query_texts=[docs[7]], n_results=3)
+        self.assertEqual(result["documents"][0][0], docs[7])
+        self.assertEqual(result["metadatas"][0][0], {"timestamp": 7})
+        self.assertAlmostEqual(result["distances"][0][0], 0.0, places=5)
+        self.assertEqual(len(result["ids"][0]), 3)
+
+    def test_reopen_persists(self):
+        """Reabrir a pasta recupera vetores e metadados"""
+        store = self._store()
+        docs = self._fill(store)
+        store.close()
+
+        reopened = self._store()
+        self.assertEqual(reopened.count(), 20)
+        self.assertEqual(reopened.query(query_texts=[docs[3]], n_results=1)["ids"][0], ["id3"])
+
+    def test_reconciles_interrupted_write(self):
+        """Vetores sem linha no log (ou linha cortada) são descartados ao abrir"""
+        store = self._store()
+        self._fill(store, 10)
+        store.close()
+        with open(os.path.join(self.tmp, NumpyVectorStore.VECTORS), "ab") as f:
+            f.write(np.ones((2, 16), dtype=np.float32).tobytes())
+        with open(os.path.join(self.tmp, NumpyVectorStore.META), "a", encoding="utf-8") as f:
+            f.write('{"id": "cortad')
+
+        reopened = self._store()
+        self.assertEqual(reopened.count(), 10)
+        self.assertEqual(os.path.getsize(os.path.join(self.tmp, NumpyVectorStore.VECTORS)), 10 * 16 * 4)
+        reopened.add(documents=["novo"], ids=["novo"])
+        self.assertEqual(reopened.count(), 11)
+
+    def test_quantized_search_matches_exact(self):
+        """Passada int8 + reordenação exata acha o mesmo top-1 que a busca exata"""
+        store = self._store(quantize=True, quantize_min_rows=10)
+        docs = self._fill(store, 50)
+        self.assertIsNotNone(store._q8)
+        for i in (0, 17, 42):
+            self.assertEqual(store.query(query_texts=[docs[i]], n_results=1)["documents"][0][0], docs[i])
+
+    def test_quantized_rebuilt_when_missing(self):
+        """Ligar a quantização num índice existente gera a cópia int8"""
+        store = self._store()
+        self._fill(store, 10)
+        store.close()
+        reopened = self._store(quantize=True)
+        self.assertTrue(os.path.exists(os.path.join(self.tmp, NumpyVectorStore.QUANT)))
+        self.assertEqual(reopened._q8.shape, (10, 16))
+
+    def test_vector_memory_numpy_backend(self):
+        """VectorMemory grava e busca no backend numpy sem Chroma"""
+        def open_numpy(memory):
+            store = NumpyVectorStore(memory.db_path, embedding_function=fake_embedding, model_name="fake")
+            return fake_embedding, None, store
+
+        with patch.object(VectorMemory, "_open", open_numpy):
+            memory = VectorMemory(self.tmp, backend="numpy", flush_interval_s=0.05)
+            memory.store_interaction("qual o clima hoje", "ensolarado")
+            memory.store_interaction("toque uma música", "tocando")
+            self.assertTrue(memory.flush(2))
+            self.assertIn("clima", memory.retrieve_relevant("qual o clima", n_results=1))
+            self.assertTrue(memory.db_path.endswith("vector_np"))
+            memory.close(2)
+            memory.collection.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
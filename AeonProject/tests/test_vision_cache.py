@@ -0,0 +1,69 @@
+import unittest
+import sys
+import os
+
+# Adiciona caminho ao projeto
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from PIL import Image, ImageDraw
+from core.vision_cache import VisionCache, dhash, hamming
+from core.context_manager import ContextManager
+
+
+def screen(text="Erro na linha 42", cursor=False):
+    img = Image.new("RGB", (1280, 720), (255, 255, 255))
+    draw = ImageDraw.Draw(img)
+    draw.rectangle([100, 100, 900, 400], fill=(40, 40, 40))
+    draw.text((120, 120), text, fill=(255, 0, 0))
+    if cursor:
+        draw.rectangle([1270, 710, 1272, 712], fill=(0, 0, 0))
+    return img
+
+
+class TestVisionCache(unittest.TestCase):
+    """Testes para o cache de análises de imagem por hash perceptual"""
+
+    def test_near_identical_frames_share_hash(self):
+        """Cursor piscando não muda o quadro; outra janela muda"""
+        base = dhash(screen())
+        self.assertLessEqual(hamming(base, dhash(screen(cursor=True))), 2)
+        other = Image.new("RGB", (1280, 720), (0, 90, 0))
+        self.assertGreater(hamming(base, dhash(other)), 2)
+
+    def test_lru_hit_and_eviction(self):
+        """Hit para quadro repetido; o limite descarta o mais antigo"""
+        cache = VisionCache(max_entries=2)
+        cache.store(0b0, "a")
+        cache.store(0b1111 << 200, "b")
+        self.assertEqual(cache.lookup(0b1), "a")
+        cache.store(0b1111 << 100, "c")   # sai 'b'
+        self.assertIsNone(cache.lookup(0b1111 << 200))
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_context_fast_path(self):
+        """O último quadro fica no ContextManager junto com vision_last_result"""
+        ctx = ContextManager()
+        cache = VisionCache(context=ctx)
+        cache.store(123, "Tela com erro")
+        cache.entries.clear()
+        self.assertEqual(ctx.get("vision_last_result"), "Tela com erro")
+        self.assertEqual(cache.lookup(123), "Tela com erro")
+        self.assertEqual(cache.stats()["context_hits"], 1)
+
+        # Outro módulo sobrescreveu o resultado: o caminho rápido não vale mais
+        ctx.set("vision_last_result", "Erro visual", ttl=600)
+        self.assertIsNone(cache.lookup(123))
+
+    def test_partial_frame_keeps_last_result(self):
+        """Recorte (last_frame=False) entra no LRU mas não substitui o último quadro lido"""
+        ctx = ContextManager()
+        cache = VisionCache(context=ctx)
+        cache.store(123, "Tela inteira")
+        cache.store(0b1111 << 200, "Só o recorte", last_frame=False)
+        self.assertEqual(ctx.get("vision_last_result"), "Tela inteira")
+        self.assertEqual(cache.lookup(0b1111 << 200), "Só o recorte")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+import sys
+import os
+from io import BytesIO
+
+# Adiciona caminho ao projeto
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from PIL import Image
+from core.vision_pipeline import PreparedImage, VisionProfiles
+
+
+def png_bytes(size=(3840, 2160)):
+    buf = BytesIO()
+    Image.new("RGB", size, (30, 120, 200)).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+class TestVisionPipeline(unittest.TestCase):
+    """Testes para o pré-processamento único de imagens da visão"""
+
+    def test_profiles_match_model_tags(self):
+        """Perfil por prefixo: 'moondream:latest' usa o perfil do moondream"""
+        profiles = VisionProfiles({"meu-modelo": {"max_side": 512}})
+        self.assertEqual(profiles.profile_for("moondream:latest")["max_side"], 378)
+        self.assertFalse(profiles.profile_for("moondream")["pt_native"])
+        self.assertTrue(profiles.profile_for("llama-3.2-11b-vision-preview")["pt_native"])
+        self.assertEqual(profiles.profile_for("meu-modelo")["max_side"], 512)
+        self.assertEqual(profiles.profile_for("desconhecido")["max_side"], 1024)
+
+    def test_resizes_per_profile_and_encodes_once(self):
+        """Cada resolução é codificada uma vez e respeita o maior lado do perfil"""
+        prepared = PreparedImage(png_bytes())
+        small = prepared.jpeg(378, 80)
+        self.assertIs(prepared.jpeg(378, 80), small)
+        self.assertEqual(max(Image.open(BytesIO(small)).size), 378)
+        self.assertEqual(max(Image.open(BytesIO(prepared.jpeg(1024, 70))).size), 1024)
+        self.assertIn("decode", prepared.timings)
+        self.assertIn("encode_378", prepared.timings)
+
+    def test_accepts_pil_image_and_numpy(self):
+        """Screenshot em memória (PIL) ou buffer NumPy entram sem PNG intermediário"""
+        screenshot = Image.new("RGBA", (3840, 2160), (10, 20, 30, 255))
+        prepared = PreparedImage(screenshot, base_side=1120)
+        self.assertEqual(prepared.image.mode, "RGB")
+        self.assertEqual(max(prepared.image.size), 1120)
+        self.assertIn("resize", prepared.timings)
+        self.assertEqual(max(Image.open(BytesIO(prepared.jpeg(378, 80))).size), 378)
+
+        try:
+            import numpy as np
+        except ImportError:
+            return
+        frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+        self.assertEqual(PreparedImage(frame).image.size, (1280, 720))
+
+    def test_invalid_bytes_fall_back_to_raw(self):
+        """Bytes que não são imagem seguem como vieram"""
+        prepared = PreparedImage(b"nao sou imagem")
+        self.assertEqual(prepared.jpeg(1024, 70), b"nao sou imagem")
+
+    def test_timed_stage(self):
+        """Estágios cronometrados entram no resumo"""
+        prepared = PreparedImage(png_bytes((64, 64)))
+        with prepared.timed("nuvem"):
+            pass
+        self.assertIn("nuvem", prepared.summary())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+"""
+bench_brain.py
+==============
+Teste de carga do AeonBrain contra o servidor falso (fake_llm_server.py).
+
+Dispara N pedidos concorrentes por cenário e mede latência (p50/p95/max),
+vazão, qual backend respondeu e o pico de chamadas simultâneas no servidor:
+- nuvem:    Groq saudável
+- falha:    Groq com taxa de erro (fallback para o Ollama + disjuntor)
+- cache:    poucos prompts repetidos muitas vezes (cache de respostas, interativo e sequencial)
+
+Roda sem rede: nada sai de 127.0.0.1.
+
+    python tests/bench_brain.py
+    python tests/bench_brain.py --requests 200 --concurrency 16 --latency 0.2 --error-rate 0.3
+    python tests/bench_brain.py --async --json resultados.json
+"""
+
+import sys
+import os
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'AeonProject'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fake_llm_server import FakeLLMServer
+from core.brain import AeonBrain
+from core.brain_scheduler import INTERACTIVE
+
+
+class BenchConfig:
+    """ConfigManager mínimo: o Brain só lê/escreve system_data (liga o cache de respostas)."""
+    def __init__(self, data: dict, storage_path: str):
+        self.system_data = data
+        self.storage_path = storage_path
+
+    def get_system_data(self, key, default=None):
+        return self.system_data.get(key, default)
+
+    def set_system_data(self, key, value):
+        self.system_data[key] = value
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def run_scenario(brain, server, name, prompts, concurrency, origem):
+    server.reset_stats()
+    latencies, backends = [], {"groq": 0, "ollama": 0, "outro": 0}
+
+    def one(prompt):
+        start = time.perf_counter()
+        resposta = brain.pensar(prompt, origem=origem)
+        latencies.append((time.perf_counter() - start) * 1000)
+        backend = resposta[1:resposta.find(":")] if resposta.startswith("[") else "outro"
+        backends[backend if backend in backends else "outro"] += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, prompts))
+    elapsed = time.perf_counter() - start
+
+    stats = server.get_stats()
+    return {
+        "cenario": name,
+        "pedidos": len(prompts),
+        "p50_ms": round(statistics.median(latencies), 1),
+        "p95_ms": round(percentile(latencies, 0.95), 1),
+        "max_ms": round(max(latencies), 1),
+        "vazao_rps": round(len(prompts) / elapsed, 1),
+        "respostas": backends,
+        "chamadas_servidor": {b: stats[b]["requests"] for b in ("groq", "ollama")},
+        "pico_simultaneo": {b: stats[b]["max_in_flight"] for b in ("groq", "ollama")},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Carga no AeonBrain com backends falsos")
+    parser.add_argument("--requests", type=int, default=60)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--error-rate", type=float, default=0.5)
+    # "interativo" substitui o pedido anterior na fila (só o último sobrevive): para carga, outra origem
+    parser.add_argument("--origem", default="web", help="Origem na fila do Brain (prioridade/limites)")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="Usa a API assíncrona (async_brain)")
+    parser.add_argument("--json", help="Salva os resultados neste arquivo")
+    args = parser.parse_args()
+
+    server = FakeLLMServer(latency_s=args.latency, seed=42).start()
+    storage = tempfile.mkdtemp(prefix="aeon_bench_")
+    brain = AeonBrain(BenchConfig({
+        "GROQ_KEY": "gsk_bench",
+        "groq_base_url": server.url,
+        "ollama_host": server.url,
+        "local_keepalive": False,
+        "async_brain": args.use_async,
+        "groq_rpm": 100000,
+    }, storage))
+
+    unique = [f"pergunta {i} sobre o tema {i % 7}" for i in range(args.requests)]
+    results = [run_scenario(brain, server, "nuvem", unique, args.concurrency, args.origem)]
+
+    server.configure("groq", error_rate=args.error_rate)
+    results.append(run_scenario(brain, server, "falha", [p + " (falha)" for p in unique], args.concurrency, args.origem))
+    server.configure("groq", error_rate=0.0)
+    brain.reconectar()
+
+    # Prompts repetidos: depois da primeira rodada tudo sai do cache de respostas.
+    # Só a conversa interativa usa o cache, e interativo substitui o anterior na fila:
+    # um pedido por vez, como o usuário falando
+    repeated = [unique[i % 10] for i in range(args.requests)]
+    results.append(run_scenario(brain, server, "cache", repeated, 1, INTERACTIVE))
+
+    print(f"\n{'cenário':<8} {'p50':>8} {'p95':>8} {'max':>8} {'req/s':>7}  respostas / chamadas / pico")
+    for r in results:
+        print(f"{r['cenario']:<8} {r['p50_ms']:>7.1f}ms {r['p95_ms']:>7.1f}ms {r['max_ms']:>7.1f}ms {r['vazao_rps']:>7.1f}  "
+              f"{r['respostas']} / {r['chamadas_servidor']} / {r['pico_simultaneo']}")
+    if brain.response_cache is not None:
+        print(f"cache: {brain.get_cache_stats()}")
+    for backend, dados in brain.get_llm_metrics()["backends"].items():
+        print(f"{backend}: {dados}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4, ensure_ascii=False)
+
+    if brain.scheduler:
+        brain.scheduler.stop()
+    server.stop()
+    shutil.rmtree(storage, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
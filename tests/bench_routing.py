@@ -0,0 +1,223 @@
+"""
+bench_routing.py
+================
+Benchmark do roteador do ModuleManager com frotas sintéticas de módulos.
+
+Escreve N arquivos *_mod.py sintéticos (M gatilhos cada) num pacote temporário
+anexado a modules.__path__ e mede, sempre pelos métodos reais do ModuleManager:
+- Latência de route_command (p50/p95/p99) para acertos e para falhas (fallback)
+- Tempo de boot da frota: load_modules (import + instância + registro + autômato)
+- Tempo de hot reload: reload_module de um arquivo com gatilhos alterados
+  (remove os antigos + adiciona os novos + sincroniza o autômato)
+- Tempo de load_module de um módulo novo entrando na frota já carregada
+
+Roda headless: Brain é um stub instantâneo, sem VectorMemory e sem IO.
+
+    python tests/bench_routing.py
+    python tests/bench_routing.py --sizes 10,100,500 --triggers 12 --queries 5000
+    python tests/bench_routing.py --json resultados.json
+"""
+
+import sys
+import os
+import json
+import time
+import random
+import shutil
+import argparse
+import importlib
+import statistics
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'AeonProject'))
+sys.dont_write_bytecode = True  # Arquivos reescritos no hot reload não podem vir de .pyc antigo
+
+import modules
+import core.module_manager as module_manager
+from core.module_manager import ModuleManager
+
+
+class StubBrain:
+    """Brain falso: responde na hora, sem rede."""
+    online = False
+    local_ready = False
+
+    def pensar(self, prompt, historico_txt="", **kwargs):
+        return "stub"
+
+
+MODULE_TEMPLATE = '''from modules.base_module import AeonModule
+
+
+class SynthModule{index}(AeonModule):
+    def __init__(self, core_context):
+        super().__init__(core_context)
+        self.name = "Synth{index}"
+        self.triggers = {triggers!r}
+
+    @property
+    def metadata(self):
+        return {{"version": "1.0.0", "author": "bench", "description": "Sintético {index}"}}
+
+    def process(self, command):
+        return f"{{self.name}}: ok"
+'''
+
+
+def synth_triggers(index: int, num_triggers: int, revision: int = 0):
+    suffix = f" v{revision}" if revision else ""
+    return [f"acao{index}x{t} alvo{t}{suffix}" for t in range(num_triggers)]
+
+
+def write_module(package_dir: Path, index: int, triggers) -> Path:
+    """Escreve modules/<pacote>/synthNNNNN_mod.py."""
+    mod_file = package_dir / f"synth{index:05d}_mod.py"
+    mod_file.write_text(MODULE_TEMPLATE.format(index=index, triggers=triggers), encoding="utf-8")
+    return mod_file
+
+
+class SyntheticFleet:
+    """Pacote temporário 'modules.<nome>' com os módulos sintéticos (removido no fim)."""
+    def __init__(self, num_modules, num_triggers):
+        self.root = Path(tempfile.mkdtemp(prefix="aeon_bench_"))
+        self.package = f"bench_fleet_{num_modules}_{os.getpid()}"
+        self.package_dir = self.root / self.package
+        self.package_dir.mkdir()
+        (self.package_dir / "__init__.py").write_text("", encoding="utf-8")
+        for i in range(num_modules):
+            write_module(self.package_dir, i, synth_triggers(i, num_triggers))
+        modules.__path__.append(str(self.root))
+        importlib.invalidate_caches()
+
+    def close(self):
+        if str(self.root) in modules.__path__:
+            modules.__path__.remove(str(self.root))
+        prefix = f"modules.{self.package}"
+        for name in [n for n in sys.modules if n == prefix or n.startswith(prefix + ".")]:
+            del sys.modules[name]
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {
+        "p50_us": pick(0.50) * 1e6,
+        "p95_us": pick(0.95) * 1e6,
+        "p99_us": pick(0.99) * 1e6,
+        "mean_us": statistics.fmean(ordered) * 1e6,
+    }
+
+
+def build_queries(classes_triggers, count, rng):
+    """Mistura comandos que acertam gatilhos com frases livres (fallback)."""
+    hits, misses = [], []
+    for _ in range(count):
+        trig = rng.choice(rng.choice(classes_triggers))
+        hits.append(f"por favor {trig} agora mesmo")
+        misses.append(f"me conte algo sobre o assunto numero {rng.randint(0, 10**6)}")
+    return hits, misses
+
+
+def time_routes(manager, queries):
+    samples = []
+    for q in queries:
+        start = time.perf_counter()
+        manager.route_command(q)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def run_fleet(num_modules, num_triggers, num_queries, seed=42):
+    rng = random.Random(seed)
+    fleet = SyntheticFleet(num_modules, num_triggers)
+    try:
+        core_context = {"brain": StubBrain()}
+        manager = ModuleManager(core_context)
+        manager.modules_dir = fleet.root
+        core_context["module_manager"] = manager
+
+        # 1. Boot da frota pelo caminho real (descoberta + import + registro + autômato)
+        start = time.perf_counter()
+        manager.load_modules(parallel=False)
+        build_s = time.perf_counter() - start
+
+        # 2. Latência de roteamento
+        hits, misses = build_queries([m.triggers for m in manager.modules], num_queries, rng)
+        time_routes(manager, hits[:50])  # Aquecimento
+        hit_samples = time_routes(manager, hits)
+        miss_samples = time_routes(manager, misses)
+
+        # 3. Hot reload: um arquivo editado com gatilhos novos (sai o conjunto antigo, entra o novo)
+        target = num_modules // 2
+        new_triggers = synth_triggers(target, num_triggers, revision=1)
+        mod_file = write_module(fleet.package_dir, target, new_triggers)
+        start = time.perf_counter()
+        manager.reload_module(mod_file)
+        reload_s = time.perf_counter() - start
+        assert manager.route_command(new_triggers[0]) == f"Synth{target}: ok"
+
+        # 4. Módulo novo entrando na frota carregada
+        new_file = write_module(fleet.package_dir, num_modules, synth_triggers(num_modules, num_triggers))
+        importlib.invalidate_caches()
+        start = time.perf_counter()
+        manager.load_module(new_file)
+        load_one_s = time.perf_counter() - start
+
+        return {
+            "modules": num_modules,
+            "triggers_per_module": num_triggers,
+            "total_triggers": len(manager.trigger_map),
+            "build_ms": build_s * 1e3,
+            "hot_reload_ms": reload_s * 1e3,
+            "load_module_ms": load_one_s * 1e3,
+            "route_hit": percentiles(hit_samples),
+            "route_miss": percentiles(miss_samples),
+        }
+    finally:
+        fleet.close()
+
+
+def print_report(results):
+    print("\n" + "=" * 108)
+    print("BENCHMARK: Roteamento do ModuleManager")
+    print("=" * 108)
+    header = (f"{'mods':>5} {'trig':>6} {'boot ms':>9} {'reload ms':>10} {'load ms':>8} | "
+              f"{'hit p50':>8} {'p95':>8} {'p99':>8} | {'miss p50':>8} {'p95':>8} {'p99':>8}")
+    print(header + "   (µs)")
+    print("-" * 108)
+    for r in results:
+        h, m = r["route_hit"], r["route_miss"]
+        print(f"{r['modules']:>5} {r['total_triggers']:>6} {r['build_ms']:>9.2f} {r['hot_reload_ms']:>10.2f} "
+              f"{r['load_module_ms']:>8.2f} | "
+              f"{h['p50_us']:>8.1f} {h['p95_us']:>8.1f} {h['p99_us']:>8.1f} | "
+              f"{m['p50_us']:>8.1f} {m['p95_us']:>8.1f} {m['p99_us']:>8.1f}")
+    print("=" * 108)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark do roteador de módulos do Aeon")
+    parser.add_argument("--sizes", default="10,50,100,250,500", help="Tamanhos de frota (N módulos), separados por vírgula")
+    parser.add_argument("--triggers", type=int, default=8, help="Gatilhos por módulo (M)")
+    parser.add_argument("--queries", type=int, default=2000, help="Comandos medidos por tipo (acerto/falha)")
+    parser.add_argument("--json", help="Salva os resultados neste arquivo")
+    parser.add_argument("--verbose", action="store_true", help="Mantém os logs do ModuleManager (distorce as medidas)")
+    args = parser.parse_args(argv)
+
+    if not args.verbose:
+        module_manager.log_display = lambda msg: None
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    results = [run_fleet(n, args.triggers, args.queries) for n in sizes]
+    print_report(results)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Resultados salvos em {args.json}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
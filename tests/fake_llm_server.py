@@ -0,0 +1,386 @@
+"""
+fake_llm_server.py
+==================
+Servidor local que imita o Groq (API de chat completions no formato OpenAI) e o
+Ollama (/api/chat) para exercitar o AeonBrain sem rede: concorrência, fallback
+nuvem -> local, cache e streaming.
+
+Rotas:
+- Groq/OpenAI: GET  /openai/v1/models, POST /openai/v1/chat/completions (também em /v1/...)
+               stream=true -> SSE ("data: {...}" ... "data: [DONE]")
+- Ollama:      GET  /api/tags, POST /api/chat, POST /api/generate
+               stream=true (padrão do Ollama) -> NDJSON, uma linha por pedaço
+- Controle:    GET  /_stats (contadores), POST /_control (muda a injeção em tempo real),
+               POST /_reset (zera contadores)
+
+Injeção de latência/erros (por backend, "groq" ou "ollama", ou para os dois):
+- latency_s:     atraso antes da resposta (sem stream) ou do primeiro pedaço (stream)
+- token_delay_s: atraso entre pedaços do stream
+- error_rate:    fração (0-1) das chamadas de chat que falham com error_status
+- error_status:  código HTTP do erro injetado (503, 429, 401...)
+- fail_next:     as próximas N chamadas de chat falham (determinístico, bom para testes)
+- reply_words:   tamanho da resposta simulada
+
+Uso (o Aeon aponta para cá pelo system.json):
+
+    python tests/fake_llm_server.py --port 8765 --latency 0.3 --error-rate 0.1
+    # system.json: "groq_base_url": "http://127.0.0.1:8765", "ollama_host": "http://127.0.0.1:8765"
+
+    curl -X POST localhost:8765/_control -d '{"groq": {"fail_next": 3}}'
+
+Em testes, suba em uma thread:
+
+    server = FakeLLMServer(port=0, latency_s=0.05).start()
+    ... server.url ...
+    server.stop()
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BACKENDS = ("groq", "ollama")
+
+DEFAULT_MODELS = {
+    "groq": ["llama-3.3-70b-versatile", "llama-3.1-8b-instant", "llama-3.2-11b-vision-preview"],
+    "ollama": ["llama3.2:latest", "moondream:latest"],
+}
+
+
+def log_display(msg):
+    print(f"[FAKE_LLM] {msg}")
+
+
+def _last_user_text(messages) -> str:
+    """Texto da última mensagem do usuário (aceita conteúdo em partes, como na visão)."""
+    for msg in reversed(messages or []):
+        if msg.get("role") != "user":
+            continue
+        content = msg.get("content")
+        if isinstance(content, list):
+            return " ".join(p.get("text", "") for p in content if isinstance(p, dict) and p.get("type") == "text")
+        return content or ""
+    return ""
+
+
+def _has_image(messages) -> bool:
+    for msg in messages or []:
+        if msg.get("images"):
+            return True
+        content = msg.get("content")
+        if isinstance(content, list) and any(isinstance(p, dict) and p.get("type") == "image_url" for p in content):
+            return True
+    return False
+
+
+class FakeLLMServer:
+    """Estado compartilhado (injeção + contadores) e o ThreadingHTTPServer."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_s: float = 0.0,
+                 token_delay_s: float = 0.0, error_rate: float = 0.0, error_status: int = 503,
+                 reply_words: int = 12, seed: int = None, quiet: bool = True):
+        base = {
+            "latency_s": latency_s,
+            "token_delay_s": token_delay_s,
+            "error_rate": error_rate,
+            "error_status": error_status,
+            "fail_next": 0,
+            "reply_words": reply_words,
+        }
+        self.settings = {name: dict(base) for name in BACKENDS}
+        self.models = {name: list(models) for name, models in DEFAULT_MODELS.items()}
+        self.quiet = quiet
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.reset_stats()
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.fake = self
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    # --- Ciclo de vida ---
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="fake-llm", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    # --- Injeção e contadores ---
+    def configure(self, backend: str = None, **settings):
+        """Atualiza a injeção de um backend (ou dos dois, com backend=None)."""
+        with self._lock:
+            for name in ([backend] if backend else BACKENDS):
+                unknown = set(settings) - set(self.settings[name])
+                if unknown:
+                    raise ValueError(f"Opções desconhecidas: {', '.join(sorted(unknown))}")
+                self.settings[name].update(settings)
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats = {name: {"requests": 0, "streams": 0, "errors": 0, "in_flight": 0, "max_in_flight": 0}
+                          for name in BACKENDS}
+            self.stats["calls"] = []    # (backend, modelo, prompt) de cada chamada de chat
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return json.loads(json.dumps(self.stats))
+
+    def _begin(self, backend: str, model: str, prompt: str, stream: bool):
+        """Conta a chamada e decide se ela falha. Retorna (settings, status_de_erro|None)."""
+        with self._lock:
+            settings = dict(self.settings[backend])
+            stats = self.stats[backend]
+            stats["requests"] += 1
+            stats["streams"] += int(bool(stream))
+            stats["in_flight"] += 1
+            stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+            self.stats["calls"].append((backend, model, prompt))
+            error = None
+            if self.settings[backend]["fail_next"] > 0:
+                self.settings[backend]["fail_next"] -= 1
+                error = settings["error_status"]
+            elif settings["error_rate"] and self._random.random() < settings["error_rate"]:
+                error = settings["error_status"]
+            if error:
+                stats["errors"] += 1
+        return settings, error
+
+    def _end(self, backend: str):
+        with self._lock:
+            self.stats[backend]["in_flight"] -= 1
+
+    @staticmethod
+    def reply_for(backend: str, model: str, prompt: str, words: int, image: bool = False) -> str:
+        """Resposta determinística: dá para conferir no teste quem respondeu e a quê."""
+        head = f"[{backend}:{model}] " + ("Imagem analisada. " if image else "") + f"Resposta para: {prompt[:60]}"
+        filler = " ".join(f"palavra{i}" for i in range(max(0, words - len(head.split()))))
+        return f"{head} {filler}".strip() + "."
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def fake(self) -> FakeLLMServer:
+        return self.server.fake
+
+    def log_message(self, fmt, *args):
+        if not self.fake.quiet:
+            log_display(fmt % args)
+
+    # --- Utilitários HTTP ---
+    def _body(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return {}
+
+    def _json(self, payload, status: int = 200):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _error(self, backend: str, status: int):
+        if backend == "ollama":
+            self._json({"error": f"erro simulado ({status})"}, status)
+        else:
+            self._json({"error": {"message": f"erro simulado ({status})", "type": "fake_error",
+                                  "code": str(status)}}, status)
+
+    def _start_stream(self, content_type: str):
+        # Sem Content-Length: a conexão fecha no fim do stream
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+    # --- Rotas ---
+    def do_GET(self):
+        path = self.path.split("?")[0].rstrip("/")
+        if path in ("/openai/v1/models", "/v1/models"):
+            self._json({"object": "list", "data": [
+                {"id": m, "object": "model", "created": 0, "owned_by": "fake"} for m in self.fake.models["groq"]
+            ]})
+        elif path == "/api/tags":
+            self._json({"models": [
+                {"name": m, "model": m, "modified_at": "2024-01-01T00:00:00Z", "size": 0, "digest": "fake",
+                 "details": {}} for m in self.fake.models["ollama"]
+            ]})
+        elif path in ("", "/"):
+            self._json({"status": "ok"})
+        elif path == "/_stats":
+            self._json(self.fake.get_stats())
+        else:
+            self._json({"error": "not found"}, 404)
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_POST(self):
+        path = self.path.split("?")[0].rstrip("/")
+        body = self._body()
+        if path in ("/openai/v1/chat/completions", "/v1/chat/completions"):
+            self._openai_chat(body)
+        elif path == "/api/chat":
+            self._ollama_chat(body)
+        elif path == "/api/generate":
+            self._ollama_generate(body)
+        elif path == "/_control":
+            try:
+                for name in BACKENDS:
+                    if isinstance(body.get(name), dict):
+                        self.fake.configure(name, **body[name])
+                common = {k: v for k, v in body.items() if k not in BACKENDS}
+                if common:
+                    self.fake.configure(None, **common)
+            except ValueError as e:
+                self._json({"error": str(e)}, 400)
+                return
+            self._json(self.fake.settings)
+        elif path == "/_reset":
+            self.fake.reset_stats()
+            self._json({"status": "ok"})
+        else:
+            self._json({"error": "not found"}, 404)
+
+    def _openai_chat(self, body: dict):
+        model = body.get("model", "fake")
+        messages = body.get("messages", [])
+        prompt = _last_user_text(messages)
+        stream = bool(body.get("stream"))
+        settings, error = self.fake._begin("groq", model, prompt, stream)
+        try:
+            time.sleep(settings["latency_s"])
+            if error:
+                self._error("groq", error)
+                return
+            text = self.fake.reply_for("groq", model, prompt, settings["reply_words"], _has_image(messages))
+            created = int(time.time())
+            completion_id = f"chatcmpl-fake{created}{random.randint(0, 9999)}"
+            usage = {"prompt_tokens": len(prompt.split()), "completion_tokens": len(text.split()),
+                     "total_tokens": len(prompt.split()) + len(text.split())}
+            if not stream:
+                self._json({
+                    "id": completion_id, "object": "chat.completion", "created": created, "model": model,
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": text},
+                                 "finish_reason": "stop", "logprobs": None}],
+                    "usage": usage,
+                })
+                return
+
+            self._start_stream("text/event-stream")
+            base = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model}
+            for i, word in enumerate(text.split(" ")):
+                if i:
+                    time.sleep(settings["token_delay_s"])
+                delta = {"role": "assistant", "content": word} if i == 0 else {"content": " " + word}
+                self._sse(dict(base, choices=[{"index": 0, "delta": delta, "finish_reason": None}]))
+            self._sse(dict(base, choices=[{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                           x_groq={"usage": usage}))
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass    # Cliente cancelou (hedging): normal
+        finally:
+            self.fake._end("groq")
+
+    def _sse(self, payload: dict):
+        self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+    def _ollama_chat(self, body: dict):
+        model = body.get("model", "fake")
+        messages = body.get("messages", [])
+        prompt = _last_user_text(messages)
+        stream = body.get("stream", True)   # No Ollama o padrão é stream
+        settings, error = self.fake._begin("ollama", model, prompt, stream)
+        try:
+            time.sleep(settings["latency_s"])
+            if error:
+                self._error("ollama", error)
+                return
+            text = self.fake.reply_for("ollama", model, prompt, settings["reply_words"], _has_image(messages))
+            created_at = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+            final = {"model": model, "created_at": created_at, "done": True, "done_reason": "stop",
+                     "total_duration": int(settings["latency_s"] * 1e9), "load_duration": 0,
+                     "prompt_eval_count": len(prompt.split()), "eval_count": len(text.split())}
+            if not stream:
+                self._json(dict(final, message={"role": "assistant", "content": text}))
+                return
+
+            self._start_stream("application/x-ndjson")
+            for i, word in enumerate(text.split(" ")):
+                if i:
+                    time.sleep(settings["token_delay_s"])
+                chunk = {"model": model, "created_at": created_at, "done": False,
+                         "message": {"role": "assistant", "content": word if i == 0 else " " + word}}
+                self._ndjson(chunk)
+            self._ndjson(dict(final, message={"role": "assistant", "content": ""}))
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.fake._end("ollama")
+
+    def _ndjson(self, payload: dict):
+        self.wfile.write((json.dumps(payload) + "\n").encode("utf-8"))
+        self.wfile.flush()
+
+    def _ollama_generate(self, body: dict):
+        # Usado pelo LocalModelKeeper para aquecer/descarregar (prompt vazio)
+        model = body.get("model", "fake")
+        self._json({"model": model, "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                    "response": "", "done": True,
+                    "done_reason": "unload" if body.get("keep_alive") in (0, "0") else "load"})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Groq/Ollama falsos para testes e benchmarks offline")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Segundos até a resposta / primeiro pedaço")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="Segundos entre pedaços do stream")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fração de chamadas de chat que falham")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--words", type=int, default=12, help="Tamanho da resposta simulada")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    server = FakeLLMServer(args.host, args.port, latency_s=args.latency, token_delay_s=args.token_delay,
+                           error_rate=args.error_rate, error_status=args.error_status,
+                           reply_words=args.words, seed=args.seed, quiet=not args.verbose)
+    log_display(f"Ouvindo em {server.url}")
+    log_display(f'system.json: "groq_base_url": "{server.url}", "ollama_host": "{server.url}"')
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        log_display(json.dumps({k: v for k, v in server.get_stats().items() if k != "calls"}))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -133,6 +133,16 @@ def test_routing():
     assert rotinas.check_dependencies(), "Rotinas deveria ter deps OK"
     print("  ✓ PASSOU")
     
+    # ===== TESTE 6: Gatilho mais longo vence (autômato) =====
+    print("\n✓ Teste 5.6: Gatilho mais longo vence, mesmo registrado depois")
+    manager.trigger_map["criar rotina"] = sistema
+    result = manager.route_command("criar rotina de estudos")
+    assert "SistemaTest" in result, f"'criar rotina' deveria vencer 'rotina', mas: {result}"
+    del manager.trigger_map["criar rotina"]
+    result = manager.route_command("criar rotina de estudos")
+    assert "RotinasTest" in result, f"Após remover o gatilho, deveria voltar a 'rotina', mas: {result}"
+    print("  ✓ PASSOU")
+    
     print("\n" + "="*60)
     print("✅ TODOS OS TESTES DE ROTEAMENTO PASSARAM!")
     print("="*60)